@@ -1,4 +1,4 @@
-"""Custom DRF camel case renderer for API responses."""
+"""Custom DRF camel case renderers for API responses."""
 
 from __future__ import annotations
 
@@ -69,3 +69,25 @@ class CamelCaseJSONRenderer(JSONRenderer):
 			accepted_media_type=accepted_media_type, 
 			renderer_context=renderer_context
 		)
+
+
+class JsonLdRenderer(CamelCaseJSONRenderer):
+	"""
+	Renders JSON-LD as application/ld+json. Documents that are already 
+	rendered, like the stored JSON-LD of software, are passed through as is.
+	"""
+
+	media_type = "application/ld+json"
+	format = "jsonld"
+
+	def render(
+		self, 
+		data: Any, accepted_media_type: str | None = None, 
+		renderer_context: Any | None = None
+	) -> bytes:
+		if isinstance(data, bytes): return data
+		return super().render(
+			data, 
+			accepted_media_type=accepted_media_type, 
+			renderer_context=renderer_context
+		)
@@ -1,11 +1,16 @@
 from django.conf import settings
 
+from website.forms.payload import get_structures_url
+
 def export_vars(request):
 	data = {}
 
 	data['SITE_DOMAIN'] = settings.SITE_DOMAIN 
 	data['SITE_PROTOCOL'] = settings.SITE_PROTOCOL
 
+	# versioned so the structures are only downloaded once per release
+	data['MODEL_STRUCTURES_URL'] = get_structures_url()
+
 	# Only emit the Google Analytics tag in production so local/dev traffic
 	# doesn't pollute the real analytics data.
 	if not settings.DEBUG:
@@ -26,11 +26,32 @@ SUPERUSER_PWD = None if 'SUPERUSER_PWD' not in os.environ else os.environ.get('S
 # When unset, the update endpoint denies every request.
 HSSI_UPDATE_TOKEN = os.environ.get("HSSI_UPDATE_TOKEN")
 
+# Ranking strategy for /api/search/, see website.search.engines. "ranked"
+# computes every relevance tier in one query; "tiered" runs one query per tier;
+# "document" scans the SoftwareSearchDocument table, which must be populated
+# with the rebuild_search_documents management command before it is enabled;
+# "postgres" is the document search using full text and pg_trgm indexes, which
+# also returns stemmed and similar word matches after the ranked tiers; "index"
+# searches an in-process index rebuilt whenever the catalog generation changes.
+HSSI_SEARCH_ENGINE = os.environ.get("HSSI_SEARCH_ENGINE", "ranked")
+
 # Google Analytics (GA4) Measurement ID, e.g. "G-XXXXXXXXXX". When unset, the
 # analytics tag is not rendered. Only emitted in production (see
 # context_processors.export_vars) so dev traffic doesn't pollute the data.
 GA_MEASUREMENT_ID = os.environ.get("GA_MEASUREMENT_ID")
 
+# Optional API tokens used when fetching repository metadata, see 
+# website.metadata. Unauthenticated GitHub requests are limited to 60 per hour.
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITLAB_TOKEN = os.environ.get("GITLAB_TOKEN")
+# The GitLab token is only sent to these comma separated hosts, repositories on
+# any other GitLab instance are requested without it.
+GITLAB_TOKEN_HOSTS = [
+	host.strip().lower() 
+	for host in os.environ.get("GITLAB_TOKEN_HOSTS", "gitlab.com").split(",")
+	if host.strip()
+]
+
 ADMIN_EMAIL = "admin@my-site.com"
 DEFAULT_FROM_EMAIL = "noreply@hssi.hsdcloud.org"
 
@@ -164,6 +185,22 @@ DATABASES = {
 	}
 }
 
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# repository descriptions are shared by the app server and the job workers,
+# the table is created by 'manage.py createcachetable'
+
+CACHES = {
+	'default': {
+		'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+	},
+	'describe': {
+		'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+		'LOCATION': 'website_describe_cache',
+		'OPTIONS': {'MAX_ENTRIES': 2000},
+	},
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
 
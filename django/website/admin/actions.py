@@ -8,6 +8,11 @@ from django.contrib import admin
 
 from ..models import *
 from ..metadata import get_metadata
+from ..crawler import HttpCrawler
+from ..jobs import (
+	JOB_FETCH_VOCAB, JOB_FETCH_HELIOPHYSICS_API, 
+	enqueue_job, get_latest_jobs, serialize_job,
+)
 from .csv_export import export_db_csv, import_db_csv, remove_all_model_entries
 from .parse_ttl import parse_ttl
 from .fetch_vocab import (
@@ -16,8 +21,12 @@ from .fetch_vocab import (
 )
 
 ## HSSI Admin Site
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import ManyToManyField
-from django.http import HttpResponse, HttpRequest, HttpResponseBadRequest
+from django.contrib import messages
+from django.http import (
+	HttpResponse, HttpRequest, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse,
+)
 from django.shortcuts import redirect
 from django.contrib import admin
 from django.urls import path
@@ -56,8 +65,14 @@ def view_get_metadata(request: HttpRequest) -> HttpResponse:
 		return HttpResponse("No URL provided", content_type="text/plain", status=400)
 	
 	# get the metadata from the URL as a json object and respond with it
-	data = get_metadata(url)
-	return HttpResponse(json.dumps(data.__dict__), content_type="application/json")
+	try: data = get_metadata(url)
+	except ValueError as e: return HttpResponse(str(e), content_type="text/plain", status=400)
+	if data is None:
+		return HttpResponse("No metadata found", content_type="text/plain", status=404)
+	return HttpResponse(
+		json.dumps(data.__dict__, cls=DjangoJSONEncoder), 
+		content_type="application/json"
+	)
 
 def view_export_db_new(request: HttpRequest) -> HttpResponse:
 
@@ -83,11 +98,37 @@ def view_import_db_new(request: HttpRequest) -> HttpResponse:
 	return redirect('admin:index')
 
 def fetch_vocab(request: HttpRequest) -> HttpResponse:
-	if not request.user.is_superuser: return
+	if request.method == 'POST' and request.user.is_superuser:
+		job = enqueue_job(JOB_FETCH_VOCAB)
+		messages.info(request, f"Vocab fetch queued as job {job.id}")
+	return redirect('admin:index')
 
+def fetch_heliophysics_api(request: HttpRequest) -> HttpResponse:
+	if request.method == 'POST' and request.user.is_superuser:
+		job = enqueue_job(JOB_FETCH_HELIOPHYSICS_API)
+		messages.info(request, f"heliophysics.net vocab fetch queued as job {job.id}")
+	return redirect('admin:index')
+
+def view_job_status(request: HttpRequest) -> HttpResponse:
+	""" the latest job of each kind, polled by the admin index page """
+	if not request.user.is_superuser: return HttpResponseForbidden()
+	return JsonResponse({
+		kind: serialize_job(job) for kind, job in get_latest_jobs().items()
+	})
+
+## HSSI Background Jobs
+
+def run_fetch_vocab(job: BackgroundJob) -> dict[str, int]:
+	"""
+	fetch the controlled vocab lists and function categories, returns the 
+	number of terms fetched for each model
+	"""
+	fetched: dict[str, int] = {}
+	steps = len(MODEL_URL_MAP) + 1
 	app_label = ControlledList._meta.app_label
-	for model_name, url in MODEL_URL_MAP.items():
+	for step, (model_name, url) in enumerate(MODEL_URL_MAP.items()):
 		print(f"fetching vocab for {model_name}..")
+		job.report(f"fetching vocab for {model_name}", step, steps)
 
 		data = get_data(url)
 		concept_data = get_concepts(data)
@@ -103,7 +144,8 @@ def fetch_vocab(request: HttpRequest) -> HttpResponse:
 		old_objs = [x for x in model.objects.all()]
 		matched_old_objs: list[ControlledList] = []
 
-		print(f"found {len(concepts)} vocab terms from {request.get_full_path()}")
+		print(f"found {len(concepts)} vocab terms from {url}")
+		fetched[model_name] = len(concepts)
 		for concept in concepts:
 			new_obj = concept.to_model_entry(model)
 			matched_obj: HssiModel = None
@@ -163,8 +205,10 @@ def fetch_vocab(request: HttpRequest) -> HttpResponse:
 	
 	# function categories are handled differently because they have a more 
 	# complicated structure
+	job.report(f"fetching vocab for {FunctionCategory.__name__}", steps - 1, steps)
 	parse_ttl(FunctionCategory, URL_FUNCTIONCATEGORIES)
 	FunctionCategory.post_fetch()
+	fetched[FunctionCategory.__name__] = FunctionCategory.objects.count()
 	
 	# We are now fetching region data from a JSON url, no longer ttl
 	#parse_ttl(Region, URL_REGIONS_TTL, remove_only_matched=True, kill_single_root=True)
@@ -174,9 +218,22 @@ def fetch_vocab(request: HttpRequest) -> HttpResponse:
 	# parse_ttl(Phenomena, URL_PHENOMENA, remove_only_matched=True, kill_single_root=False)
 	# Phenomena.post_fetch()
 
-	return redirect('admin:index')
-
-def fetch_heliophysics_api(request: HttpRequest) -> HttpResponse:
-	fetch_heliophysnet_vocab(InstrumentObservatory, "observatories")
-	fetch_heliophysnet_vocab(InstrumentObservatory, "instruments")
-	return HttpResponse()
\ No newline at end of file
+	job.report("done", steps, steps)
+	return fetched
+
+def run_fetch_heliophysics_api(job: BackgroundJob) -> dict[str, int]:
+	"""
+	fetch the observatories and instruments from heliophysics.net, returns 
+	the number of entries saved from each list
+	"""
+	saved: dict[str, int] = {}
+	with HttpCrawler() as crawler:
+		for api_slug in ("observatories", "instruments"):
+			saved[api_slug] = fetch_heliophysnet_vocab(
+				InstrumentObservatory, 
+				api_slug, 
+				lambda current, total: job.report(f"fetching {api_slug}", current, total),
+				crawler,
+			)
+	job.report("done")
+	return saved
\ No newline at end of file
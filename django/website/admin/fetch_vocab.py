@@ -9,13 +9,19 @@ from __future__ import annotations
 import requests
 import json
 
+from django.db import transaction
+
 from ..models import (
 	ControlledList, ControlledGraphList, DataInput, License, 
 	OperatingSystem, ProgrammingLanguage, FileFormat, RepoStatus, 
-	CpuArchitecture, Region, InstrumentObservatory, InstrObsType
+	CpuArchitecture, Region, InstrumentObservatory, InstrObsType,
+	GENERATION_CATALOG,
 )
+from ..models.pending import defer_work
+from ..signals import get_jsonld_software_ids, get_software_ids_referencing
+from ..crawler import CRAWLER_TIMEOUT, HttpCrawler
 
-from typing import Type, Any
+from typing import Type, Any, Callable
 
 URL_REPOSTATUS = "https://www.repostatus.org/badges/latest/ontology.jsonld"
 URL_HSSIBASE = "https://raw.githubusercontent.com/Heliophysics-Software-Search-Interface/HSSI-vocab/main/"
@@ -55,14 +61,20 @@ HELIODATA_MISSION_URL = "https://helio.data.nasa.gov/mission/"
 # route returns mission JSON including datasetCount, or 404
 # {"Error": "region missing"} when the page is absent.
 HELIODATA_LOAD_MISSION_URL = "https://helio.data.nasa.gov/heliodata/app/load_mission_page/"
+HELIODATA_PROBE_TIMEOUT = 5
 HELIOPHYS_API_URL = "https://api.heliophysics.net/api/"
 HELIOPHYS_PROP_NAME = "long_name"
 HELIOPHYS_PROP_NAME_2 = "short_name"
 HELIOPHYS_PROP_DEFINITION = "description"
 HELIOPHYS_PROP_SPASEID = "spase_id"
 
-def get_data(url: str) -> dict | list:
-	req = requests.get(url)
+# number of items fetched between progress reports
+HELIOPHYS_REPORT_INTERVAL = 25
+HELIOPHYS_WRITE_BATCH_SIZE = 500
+
+def get_data(url: str, crawler: HttpCrawler | None = None) -> dict | list:
+	if crawler: req = crawler.get(url)
+	else: req = requests.get(url, timeout=CRAWLER_TIMEOUT)
 	try:
 		return req.json()
 	except Exception:
@@ -71,7 +83,7 @@ def get_data(url: str) -> dict | list:
 		str_data = str_data.replace('“', '"').replace('”', '"')
 	return json.loads(str_data)
 
-def heliodata_mission_has_datasets(uid: str) -> bool | None:
+def heliodata_mission_has_datasets(uid: str, crawler: HttpCrawler | None = None) -> bool | None:
 	"""
 	Whether HelioData has a data-backed mission landing page for `uid`.
 
@@ -88,7 +100,9 @@ def heliodata_mission_has_datasets(uid: str) -> bool | None:
 		        clobbering a previously-good link during a transient outage.
 	"""
 	try:
-		req = requests.get(f"{HELIODATA_LOAD_MISSION_URL}{uid}/1", timeout=5)
+		url = f"{HELIODATA_LOAD_MISSION_URL}{uid}/1"
+		if crawler: req = crawler.get(url, timeout=HELIODATA_PROBE_TIMEOUT)
+		else: req = requests.get(url, timeout=HELIODATA_PROBE_TIMEOUT)
 	except Exception as e:
 		print(f"  HelioData probe failed for '{uid}', leaving landing_url unchanged: {e}")
 		return None
@@ -225,98 +239,170 @@ def link_concept_children(
 			print(f"Linked '{parent_obj.name}' with child '{obj.name}'")
 	for obj in objs: obj.save()
 
-def fetch_heliophysnet_list(api_slug: str) -> list[dict[str, Any]]:
+def fetch_heliophysnet_list(api_slug: str, crawler: HttpCrawler | None = None) -> list[dict[str, Any]]:
 	url = HELIOPHYS_API_URL + api_slug + "/"
 	print(f"fetching heliophysics data list '{api_slug}' from '{url}'")
-	data = get_data(url)
+	data = get_data(url, crawler)
 	return data
 
-def fetch_heliophysnet_detail(api_slug: str, uid: str) -> dict[str, Any]:
+def fetch_heliophysnet_detail(
+	api_slug: str, 
+	uid: str, 
+	crawler: HttpCrawler | None = None
+) -> dict[str, Any]:
 	url = HELIOPHYS_API_URL + f"{api_slug}/{uid}/"
-	print(f"fetching heliophysics item '{uid}' from '{url}'")
-	data = get_data(url)
+	data = get_data(url, crawler)
 	return data
 
-def fetch_heliophysnet_vocab(model: type[ControlledList], api_slug: str):
+def fetch_heliophysnet_entry(
+	model: type[ControlledList], 
+	api_slug: str, 
+	uid: str, 
+	crawler: HttpCrawler | None = None,
+) -> dict[str, Any] | None:
 	"""
-	fetch all vocab from the heliophysics api list at the given api slug 
-	(e.g. "observatories"), creates model objects for the specified model 
-	of them, and inserts them into the corresponding table
+	fetch the details of a heliophysics api item and convert them to the 
+	field values of its model entry, None if the item can't be stored
 	"""
-	datalist = fetch_heliophysnet_list(api_slug)
-	item_count = len(datalist)
-	i = 0
-	print(f"found {item_count} items for {api_slug}")
-	for item in datalist:
-		assert isinstance(item, dict)
-		uid = item.get("id")
-		if uid is None:
-			print(f"ERROR - item has no ID:")
-			print(item)
-			continue
+	details = fetch_heliophysnet_detail(api_slug, uid, crawler)
+
+	# choose the more descriptive title
+	name = details.get(HELIOPHYS_PROP_NAME) or ""
+	name2 = details.get(HELIOPHYS_PROP_NAME_2) or ""
+	name = name if len(name) > len(name2) else name2
+	if len(name) > 128: name = name[:128]
+
+	spase_id = details.get(HELIOPHYS_PROP_SPASEID)
+	if not spase_id: 
+		print(f"no spase id found for '{name}', skipping")
+		return None
+
+	fields: dict[str, Any] = {
+		"name": name,
+		"definition": details.get(HELIOPHYS_PROP_DEFINITION),
+		"identifier": f"{SPASE_URL}{spase_id[8:]}",
+	}
+
+	if issubclass(model, InstrumentObservatory):
+
+		# determine whether it's an observatory or instrument based on slug
+		if api_slug.lower() == "observatories":
+			fields["type"] = InstrObsType.OBSERVATORY
+			# Prefer the richer, user-friendly HelioData mission page for
+			# outbound links, but only when HelioData has datasets to browse.
+			# Zero-dataset HelioData pages are usually thinner than the
+			# canonical SPASE metadata page, so clear landing_url and fall
+			# back to `identifier` for those confirmed-sparse pages.
+			# On an undetermined probe (None: timeout/outage), leave any
+			# existing landing_url untouched rather than wiping a good link.
+			mission_has_datasets = heliodata_mission_has_datasets(uid, crawler)
+			if mission_has_datasets is True:
+				fields["landing_url"] = f"{HELIODATA_MISSION_URL}{uid}"
+			elif mission_has_datasets is False:
+				fields["landing_url"] = None
+		else: 
+			fields["type"] = InstrObsType.INSTRUMENT
+			# HelioData has no confirmed standalone instrument landing page,
+			# so leave landing_url empty and let the link fall back to SPASE.
+			fields["landing_url"] = None
 		
-		details = fetch_heliophysnet_detail(api_slug, uid)
+		# seperate abbreviation
+		lparensplit = name.split("(")
+		if len(lparensplit) > 1:
+			rparensplit = lparensplit[-1].split(")")
+			if len(rparensplit) > 1:
+				fields["abbreviation"] = rparensplit[0].strip()
+				fields["name"] = lparensplit[0].strip()
 
-		# choose the more descriptive title
-		name = details.get(HELIOPHYS_PROP_NAME)
-		name2 = details.get(HELIOPHYS_PROP_NAME_2)
-		name = name if len(name) > len(name2) else name2
-		if len(name) > 128: name = name[:128]
+	return fields
+
+def save_heliophysnet_entries(
+	model: type[ControlledList], 
+	entries: list[dict[str, Any]]
+) -> int:
+	"""
+	create or update the model entries with the fetched field values, 
+	matched by identifier, in bulk. Returns the number of entries saved
+	"""
+	# later items with the same identifier overwrite earlier ones
+	by_identifier = {fields["identifier"]: fields for fields in entries}
+	existing: dict[str, ControlledList] = {}
+	for obj in model.objects.filter(identifier__in=by_identifier.keys()):
+		existing.setdefault(obj.identifier, obj)
 
-		spase_id = details.get(HELIOPHYS_PROP_SPASEID)
-		if not spase_id: 
-			print(f"no spase id found for '{name}', skipping")
+	created: list[ControlledList] = []
+	updated: list[ControlledList] = []
+	update_fields: set[str] = set()
+	for identifier, fields in by_identifier.items():
+		obj = existing.get(identifier)
+		if obj is None:
+			created.append(model(**fields))
 			continue
+		changed = [
+			key for key, val in fields.items() if getattr(obj, key) != val
+		]
+		if not changed: continue
+		for key in changed: setattr(obj, key, fields[key])
+		update_fields.update(changed)
+		updated.append(obj)
 
-		definition = details.get(HELIOPHYS_PROP_DEFINITION)
-		spase_url = f"{SPASE_URL}{spase_id[8:]}"
-		
-		# find 
-		entry = model.objects.filter(identifier=spase_url).first()
-		if entry is None:
-			entry = model.objects.create()
-		
-		entry.name = name
-		entry.definition = definition
-		entry.identifier = spase_url
-
-		if isinstance(entry, InstrumentObservatory):
-			assert isinstance(entry, InstrumentObservatory)
-			assert isinstance(name, str)
-
-			# determine whether it's an observatory or instrument based on slug
-			if api_slug.lower() == "observatories":
-				entry.type = InstrObsType.OBSERVATORY
-				# Prefer the richer, user-friendly HelioData mission page for
-				# outbound links, but only when HelioData has datasets to browse.
-				# Zero-dataset HelioData pages are usually thinner than the
-				# canonical SPASE metadata page, so clear landing_url and fall
-				# back to `identifier` for those confirmed-sparse pages.
-				# On an undetermined probe (None: timeout/outage), leave any
-				# existing landing_url untouched rather than wiping a good link.
-				mission_has_datasets = heliodata_mission_has_datasets(uid)
-				if mission_has_datasets is True:
-					entry.landing_url = f"{HELIODATA_MISSION_URL}{uid}"
-				elif mission_has_datasets is False:
-					entry.landing_url = None
-			else: 
-				entry.type = InstrObsType.INSTRUMENT
-				# HelioData has no confirmed standalone instrument landing page,
-				# so leave landing_url empty and let the link fall back to SPASE.
-				entry.landing_url = None
-			
-			# seperate abbreviation
-			lparensplit = name.split("(")
-			if len(lparensplit) > 1:
-				rparensplit = lparensplit[-1].split(")")
-				if len(rparensplit) > 1:
-					entry.abbreviation = rparensplit[0].strip()
-					name = lparensplit[0].strip()
-					entry.name = name
-		
-		print(spase_url)
+	with transaction.atomic():
+		model.objects.bulk_create(created, batch_size=HELIOPHYS_WRITE_BATCH_SIZE)
+		if updated: model.objects.bulk_update(
+			updated, sorted(update_fields), batch_size=HELIOPHYS_WRITE_BATCH_SIZE
+		)
+		# bulk writes don't send the save signals that invalidate caches
+		if created or updated:
+			updated_ids = [obj.pk for obj in updated]
+			defer_work(
+				generations=[GENERATION_CATALOG],
+				software_ids=get_software_ids_referencing(model, updated_ids),
+				document_ids=get_jsonld_software_ids(model, updated_ids),
+			)
 
-		entry.save()
-		i += 1
-		print(f"saved '{name}' to {model.__name__} model [{i}/{item_count}]")
-		
+	print(f"created {len(created)} and updated {len(updated)} {model.__name__} entries")
+	return len(by_identifier)
+
+def fetch_heliophysnet_vocab(
+	model: type[ControlledList], 
+	api_slug: str,
+	report: Callable[[int, int], None] | None = None,
+	crawler: HttpCrawler | None = None,
+) -> int:
+	"""
+	fetch all vocab from the heliophysics api list at the given api slug 
+	(e.g. "observatories"), creates model objects for the specified model 
+	of them, and inserts them into the corresponding table. Item details 
+	are fetched concurrently and the entries are written together once all 
+	of them are fetched. Calls report with the number of items processed 
+	and the item count every few items, and returns the number of items saved
+	"""
+	owns_crawler = crawler is None
+	crawler = crawler or HttpCrawler()
+	try:
+		datalist = fetch_heliophysnet_list(api_slug, crawler)
+		uids: list[str] = []
+		for item in datalist:
+			assert isinstance(item, dict)
+			uid = item.get("id")
+			if uid is None:
+				print(f"ERROR - item has no ID:")
+				print(item)
+				continue
+			uids.append(uid)
+
+		item_count = len(uids)
+		print(f"found {item_count} items for {api_slug}")
+		entries: dict[str, dict[str, Any]] = {}
+		fetch = lambda uid: fetch_heliophysnet_entry(model, api_slug, uid, crawler)
+		for index, (uid, fields, error) in enumerate(crawler.map(fetch, uids)):
+			if report and index % HELIOPHYS_REPORT_INTERVAL == 0: report(index, item_count)
+			if error: print(f"failed fetching heliophysics item '{uid}': {error}")
+			elif fields: entries[uid] = fields
+	finally:
+		if owns_crawler: crawler.close()
+
+	# keep the order of the list for entries that share an identifier
+	saved = save_heliophysnet_entries(model, [entries[uid] for uid in uids if uid in entries])
+	if report: report(item_count, item_count)
+	return saved
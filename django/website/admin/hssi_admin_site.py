@@ -1,12 +1,15 @@
 from django.urls import path
 from django.contrib import admin
 
+from ..jobs import get_latest_jobs
+
 from .actions import (
 	view_export_db_new, 
 	view_import_db_new, 
 	view_get_metadata, 
 	fetch_vocab,
-	fetch_heliophysics_api
+	fetch_heliophysics_api,
+	view_job_status,
 )
 
 class HssiAdminSite(admin.AdminSite):
@@ -38,7 +41,13 @@ class HssiAdminSite(admin.AdminSite):
 			path('get_metadata/', view_get_metadata, name='get_metadata'),
 			path('fetch_vocab/', fetch_vocab, name="fetch_vocab"),
 			path('fetch_heliophys_api/', fetch_heliophysics_api, name="fetch_heliophys_api"),
+			path('job_status/', view_job_status, name="job_status"),
 		] + urls_base[-1:]
 		return urls
 
+	def index(self, request, extra_context=None):
+		# the latest background jobs, shown next to the actions that queue them
+		extra_context = {"hssi_jobs": get_latest_jobs(), **(extra_context or {})}
+		return super().index(request, extra_context)
+
 admin_site = HssiAdminSite()
\ No newline at end of file
@@ -3,7 +3,7 @@ import uuid, datetime
 from import_export import resources
 from import_export.admin import ImportExportModelAdmin
 from django.utils import timezone
-from django.contrib.admin import action
+from django.contrib.admin import action, ModelAdmin, TabularInline
 from django.http import HttpRequest
 from django.db.models import QuerySet, ManyToManyField
 
@@ -16,7 +16,8 @@ from ..models import (
 	SubmissionInfo, RelatedItem, Award, HssiModel, 
 	FunctionCategory, OperatingSystem, Phenomena, Keyword, 
 	Organization, License, InstrumentObservatory, RepoStatus, 
-	DataInput, ProgrammingLanguage, FileFormat, Region, CpuArchitecture
+	DataInput, ProgrammingLanguage, FileFormat, Region, CpuArchitecture,
+	OutboundEmail, OutboundEmailStatus, BackgroundJob, BackgroundJobProgress,
 )
 
 from ..util import *
@@ -271,6 +272,7 @@ class SoftwareAdmin(HSSIModelAdmin):
 			exists = not not VerifiedSoftware.objects.filter(pk=soft.pk).first()
 			if exists: continue
 			verified = VerifiedSoftware.create_verified(soft)
+		VerifiedSoftware.invalidate_visible()
 
 	@action(description="Add to Edit Queue")
 	def add_edit_queue(self, request: HttpRequest, queryset: QuerySet[Software]):
@@ -347,4 +349,48 @@ class SubmissionInfoAdmin(HSSIModelAdmin):
 		if obj.submitter.first(): return obj.submitter.first().fullName
 		return "<None>"
 	
-	list_display = ('submission_name', 'submitter_name', 'submission_date', 'id')
\ No newline at end of file
+	list_display = ('submission_name', 'submitter_name', 'submission_date', 'id')
+
+# Admin definitions for outbox module ------------------------------------------
+
+class OutboundEmailAdmin(ModelAdmin):
+	list_display = ('subject', 'status', 'attempts', 'next_attempt', 'sent', 'created')
+	list_filter = ('status',)
+	readonly_fields = ('attempts', 'last_error', 'created', 'sent')
+
+	@action(description="Retry sending now")
+	def retry_now(self, request: HttpRequest, query: QuerySet[OutboundEmail]):
+		query.exclude(status=OutboundEmailStatus.SENT).update(
+			status=OutboundEmailStatus.PENDING,
+			attempts=0,
+			next_attempt=timezone.now(),
+		)
+
+	actions = [
+		retry_now
+	]
+
+# Admin definitions for jobs module --------------------------------------------
+
+class BackgroundJobProgressInline(TabularInline):
+	model = BackgroundJobProgress
+	fields = ('created', 'current', 'total', 'message')
+	readonly_fields = fields
+	extra = 0
+	can_delete = False
+
+	def has_add_permission(self, request, obj=None): return False
+
+class BackgroundJobAdmin(ModelAdmin):
+	list_display = (
+		'kind', 'status', 'progress_current', 'progress_total', 
+		'message', 'created', 'finished',
+	)
+	list_filter = ('kind', 'status')
+	readonly_fields = (
+		'kind', 'params', 'status', 'progress_current', 'progress_total', 
+		'message', 'result', 'error', 'created', 'started', 'finished',
+	)
+	inlines = [BackgroundJobProgressInline]
+
+	def has_add_permission(self, request): return False
@@ -26,3 +26,5 @@ admin_site.register(RepoStatus, admin_class=RepoStatusAdmin)
 admin_site.register(DataInput, admin_class=DataInputAdmin)
 admin_site.register(Submitter, admin_class=SubmitterAdmin)
 admin_site.register(RelatedItem, admin_class=DatasetAdmin)
+admin_site.register(OutboundEmail, admin_class=OutboundEmailAdmin)
+admin_site.register(BackgroundJob, admin_class=BackgroundJobAdmin)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from django.conf import settings
 
 settings.INSTALLED_APPS.extend([
+	'django.contrib.postgres',
 	'colorful',
 	'crispy_forms',
 	'crispy_bootstrap4',
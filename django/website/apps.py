@@ -3,6 +3,8 @@ from django.apps import AppConfig
 class WebsiteConfig(AppConfig):
 	name = 'website'
 
-	# def ready(self):
-	#     import website.signals
+	def ready(self):
+		import website.signals
+		from .forms.payload import load_structure_payload
+		load_structure_payload()
 
@@ -0,0 +1,99 @@
+"""
+A small HTTP client for crawling third party APIs. Requests go through one
+pooled session that retries transient failures, are spaced out per host so
+concurrent workers don't flood any single server, and always time out.
+"""
+
+import threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CRAWLER_WORKERS = 8
+CRAWLER_TIMEOUT = 20
+CRAWLER_RETRIES = 3
+CRAWLER_BACKOFF = 0.5
+# minimum seconds between the starts of two requests to the same host
+CRAWLER_HOST_INTERVAL = 0.05
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class HostRateLimiter:
+	"""Spaces out the requests to each host by a minimum interval."""
+
+	def __init__(self, interval: float):
+		self.interval = interval
+		self.lock = threading.Lock()
+		self.next_slot: dict[str, float] = {}
+
+	def wait(self, url: str) -> None:
+		if self.interval <= 0: return
+		host = urlsplit(url).netloc
+		with self.lock:
+			now = time.monotonic()
+			slot = max(now, self.next_slot.get(host, now))
+			self.next_slot[host] = slot + self.interval
+		if slot > now: time.sleep(slot - now)
+
+class HttpCrawler:
+	"""
+	Makes GET requests from a bounded pool of worker threads that share one
+	session, so connections to each host are kept alive and reused.
+	"""
+
+	def __init__(
+		self,
+		workers: int = CRAWLER_WORKERS,
+		timeout: float = CRAWLER_TIMEOUT,
+		retries: int = CRAWLER_RETRIES,
+		host_interval: float = CRAWLER_HOST_INTERVAL,
+	):
+		self.workers = workers
+		self.timeout = timeout
+		self.limiter = HostRateLimiter(host_interval)
+		self.session = requests.Session()
+		retry = Retry(
+			total=retries,
+			backoff_factor=CRAWLER_BACKOFF,
+			status_forcelist=(429, 500, 502, 503, 504),
+			allowed_methods=("GET",),
+			raise_on_status=False,
+		)
+		adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+		self.session.mount("http://", adapter)
+		self.session.mount("https://", adapter)
+
+	def get(
+		self, 
+		url: str, 
+		timeout: float | None = None, 
+		headers: dict[str, str] | None = None,
+	) -> requests.Response:
+		self.limiter.wait(url)
+		return self.session.get(url, timeout=timeout or self.timeout, headers=headers)
+
+	def map(
+		self,
+		func: Callable[[T], R],
+		items: Iterable[T],
+	) -> Iterator[tuple[T, R | None, Exception | None]]:
+		"""
+		Call func on every item from the worker pool, yields each item with
+		its result or the exception it raised, in the order they complete.
+		"""
+		with ThreadPoolExecutor(max_workers=self.workers) as pool:
+			futures = {pool.submit(func, item): item for item in items}
+			for future in as_completed(futures):
+				try: yield futures[future], future.result(), None
+				except Exception as e: yield futures[future], None, e
+
+	def close(self) -> None:
+		self.session.close()
+
+	def __enter__(self) -> 'HttpCrawler': return self
+	def __exit__(self, *args: Any) -> None: self.close()
@@ -3,6 +3,7 @@ from uuid import UUID
 from datetime import date
 
 from .forms.names import *
+from .models.graph_paths import get_path_index
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -568,33 +569,27 @@ def apply_function_category(software: Software, fullnames: list[str]):
 	:type fullnames: list[str]
 	"""
 
-	categories: list[FunctionCategory] = []
+	index = get_path_index(FunctionCategory)
+	categories: list[UUID] = []
 	for fullname in fullnames:
-		ref_category: FunctionCategory = None
+		ref_category: UUID = None
 		try:
 			uid = UUID(fullname)
-			ref_category = FunctionCategory.objects.get(pk=uid)
+			if uid in index: ref_category = uid
 
 		except Exception:
 			subnames = fullname.split(":")
 			subnames.reverse()
 			child_name = subnames[0].strip()
-			child_matches = FunctionCategory.objects.filter(name=child_name)
 
 			# top level category names should be unique
 			if len(subnames) == 1:
-				ref_category = child_matches.first()
+				ref_category = index.find(child_name)
 
 			# if parent name is specified, narrow down to specific category with 
 			# matching name and parent
 			elif len(subnames) == 2:
-				parent_name = subnames[1].strip()
-				parent_matches = FunctionCategory.objects.filter(name=parent_name)
-
-				ref_category = FunctionCategory.objects.filter(
-					name=child_name, 
-					parent_nodes__in=parent_matches
-				).first()
+				ref_category = index.find(child_name, subnames[1].strip())
 
 		# append the found category if it exists
 		if(ref_category): categories.append(ref_category)
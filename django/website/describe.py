@@ -0,0 +1,157 @@
+"""
+Repository metadata extraction with somef. Results are cached by repository
+url and the commit its HEAD points to, so a repository is only analyzed again
+once it changes. The cache is stored in the database so that the app server
+can answer from the results of the job workers that ran somef. Concurrent
+requests for the same repository share one run, and runs happen on a bounded
+pool of workers.
+"""
+
+import hashlib, json, os, subprocess, tempfile, threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.cache import caches
+
+SOMEF_WORKERS = int(os.environ.get("SOMEF_WORKERS", 2))
+SOMEF_THRESHOLD = "0.7"
+SOMEF_TIMEOUT = 300
+GIT_TIMEOUT = 15
+
+# the cache alias shared by every process, see settings.CACHES
+DESCRIBE_CACHE = "describe"
+
+# output format flags of 'somef describe' that produce json
+SOMEF_FORMATS = ("o", "c")
+
+# results of repositories whose commit can't be resolved expire sooner
+DESCRIBE_CACHE_TTL = 60 * 60 * 24 * 7
+DESCRIBE_UNRESOLVED_CACHE_TTL = 60 * 60
+
+# repeated requests for a repository don't run git every time
+GIT_HEAD_CACHE_TTL = 60 * 5
+
+class DescribeError(Exception):
+	"""Raised when a repository can't be analyzed."""
+
+_pool = ThreadPoolExecutor(max_workers=SOMEF_WORKERS, thread_name_prefix="somef")
+_running: dict[str, Future] = {}
+_running_lock = threading.Lock()
+
+def validate_target(target: str) -> str:
+	"""Only http(s) urls are passed on to git and somef."""
+	target = target.strip()
+	parts = urlsplit(target)
+	if parts.scheme not in ("http", "https") or not parts.netloc:
+		raise ValueError(f"'{target}' is not a repository url")
+	return target
+
+def validate_format(fmt: str) -> str:
+	if fmt not in SOMEF_FORMATS: raise ValueError(f"unsupported format '{fmt}'")
+	return fmt
+
+def get_target_digest(target: str) -> str:
+	return hashlib.sha1(target.encode("utf-8")).hexdigest()
+
+def get_head_commit(target: str) -> str | None:
+	"""
+	The commit the repository's HEAD points to, or None if unknown. It's
+	cached for a few minutes, unresolved commits included.
+	"""
+	cache = caches[DESCRIBE_CACHE]
+	key = f"git_head:{get_target_digest(target)}"
+	commit: str | None = cache.get(key)
+	if commit is None:
+		commit = ls_remote_head(target) or ""
+		cache.set(key, commit, GIT_HEAD_CACHE_TTL)
+	return commit or None
+
+def ls_remote_head(target: str) -> str | None:
+	try:
+		process = subprocess.run(
+			["git", "ls-remote", "--quiet", target, "HEAD"],
+			stdout=subprocess.PIPE,
+			stderr=subprocess.DEVNULL,
+			timeout=GIT_TIMEOUT,
+			env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+		)
+	except (OSError, subprocess.TimeoutExpired): return None
+	if process.returncode != 0: return None
+	output = process.stdout.decode("utf-8").split()
+	return output[0] if output else None
+
+def get_describe_cache_key(target: str, commit: str | None, fmt: str) -> str:
+	return f"somef_describe:{fmt}:{get_target_digest(target)}:{commit or 'unresolved'}"
+
+def run_somef(target: str, fmt: str) -> dict:
+	"""Run somef on the repository and return the json data it outputs."""
+	with tempfile.TemporaryDirectory(prefix="somef-") as directory:
+		output = os.path.join(directory, "describe.json")
+		try:
+			process = subprocess.run(
+				[
+					"somef", "describe", "-t", SOMEF_THRESHOLD,
+					"-r", target, "-" + fmt, output
+				],
+				stdout=subprocess.DEVNULL,
+				stderr=subprocess.PIPE,
+				timeout=SOMEF_TIMEOUT,
+			)
+		except subprocess.TimeoutExpired:
+			raise DescribeError(f"somef timed out analyzing '{target}'")
+		except OSError as e: raise DescribeError(f"somef could not be run: {e}")
+		if not os.path.exists(output):
+			error = process.stderr.decode("utf-8", "replace").strip().splitlines()
+			raise DescribeError(
+				f"somef failed analyzing '{target}'" +
+				(f": {error[-1]}" if error else "")
+			)
+		with open(output, encoding="utf-8") as file: return json.load(file)
+
+def describe_repository_async(target: str, fmt: str = "o") -> Future:
+	"""
+	A future of a somef run on the repository. If the same repository is
+	already being analyzed, the future of that run is returned instead.
+	"""
+	target = validate_target(target)
+	validate_format(fmt)
+	run_key = f"{fmt}:{target}"
+	with _running_lock:
+		future = _running.get(run_key)
+		if future is not None: return future
+		print(f"analyzing '{target}' with somef..")
+		future = _pool.submit(run_somef, target, fmt)
+		_running[run_key] = future
+
+	def finished(_: Future) -> None:
+		with _running_lock:
+			if _running.get(run_key) is future: del _running[run_key]
+	future.add_done_callback(finished)
+	return future
+
+def get_cached_description(target: str, fmt: str = "o") -> dict | None:
+	"""The cached somef data of the repository at its current commit, if any."""
+	target = validate_target(target)
+	validate_format(fmt)
+	key = get_describe_cache_key(target, get_head_commit(target), fmt)
+	return caches[DESCRIBE_CACHE].get(key)
+
+def describe_repository(target: str, fmt: str = "o", timeout: float | None = None) -> dict:
+	"""
+	The somef data of the repository, waits for the analysis to finish if it
+	isn't cached. The cache is only accessed from the calling thread, since
+	the pool's threads have no database connection of their own to close.
+	"""
+	target = validate_target(target)
+	validate_format(fmt)
+	commit = get_head_commit(target)
+	key = get_describe_cache_key(target, commit, fmt)
+	cache = caches[DESCRIBE_CACHE]
+	data: dict | None = cache.get(key)
+	if data is None:
+		data = describe_repository_async(target, fmt).result(timeout)
+		cache.set(
+			key, data,
+			DESCRIBE_CACHE_TTL if commit else DESCRIBE_UNRESOLVED_CACHE_TTL
+		)
+	return data
@@ -0,0 +1,45 @@
+"""
+The serialized model structures that generated forms are built from. They
+only change when the code does, so they're encoded once when the app is
+ready and served as the same bytes, versioned by a hash of their content.
+"""
+
+import hashlib, json
+from typing import NamedTuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from ..models.structurizer import registered_structures
+from .names import MODEL_FIELD_MAP
+
+STRUCTURES_URL = "/api/models/structures/"
+STRUCTURE_HASH_LENGTH = 16
+
+class StructurePayload(NamedTuple):
+	content: bytes
+	hash: str
+
+_payload: StructurePayload | None = None
+
+def get_structure_data() -> dict:
+	return { "data": [
+		*[x.serialized() for x in registered_structures.values()],
+	], "fieldMap": MODEL_FIELD_MAP }
+
+def build_structure_payload() -> StructurePayload:
+	content = json.dumps(get_structure_data(), cls=DjangoJSONEncoder).encode("utf-8")
+	digest = hashlib.sha256(content).hexdigest()[:STRUCTURE_HASH_LENGTH]
+	return StructurePayload(content, digest)
+
+def load_structure_payload() -> StructurePayload:
+	"""Encode the structures again, called once the app is ready."""
+	global _payload
+	_payload = build_structure_payload()
+	return _payload
+
+def get_structure_payload() -> StructurePayload:
+	return _payload or load_structure_payload()
+
+def get_structures_url() -> str:
+	"""The structures url of the current release, which clients can keep."""
+	return f"{STRUCTURES_URL}?v={get_structure_payload().hash}"
@@ -1073,6 +1073,13 @@ SUBMISSION_FORM_FIELDS: ModelStructure = ModelStructure.define(
 	SUBMISSION_FORM_FIELDS.type_name + "_3",
 )
 
+# the sections of the submission form, in the order the pages display them
+SUBMISSION_STRUCTURE_NAMES = [
+	SUBMISSION_FORM_FIELDS_1.type_name,
+	SUBMISSION_FORM_FIELDS_2.type_name,
+	SUBMISSION_FORM_FIELDS_3.type_name,
+]
+
 register_structure(*[
 	SUBMISSION_FORM_AUTHOR_AFFILIATION,
 	SUBMISSION_FORM_CONTRIBUTOR_AFFILIATION,
@@ -0,0 +1,150 @@
+"""
+Runs BackgroundJob rows out of band of the request handlers that queue them.
+Each job kind maps to the dotted path of a function taking the job and its
+params as keyword arguments, which reports progress through job.report()
+and returns a json serializable result.
+"""
+
+import datetime
+import traceback
+from typing import Any, Callable
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BackgroundJob, BackgroundJobStatus
+
+JOB_FETCH_VOCAB = "fetch_vocab"
+JOB_FETCH_HELIOPHYSICS_API = "fetch_heliophysics_api"
+JOB_DESCRIBE_REPOSITORY = "describe_repository"
+
+# running jobs that haven't reported progress for this long are assumed to
+# have lost their worker, e.g. to a restart or a deploy
+JOB_STALE_AFTER = datetime.timedelta(minutes=30)
+
+JOB_FUNCTIONS: dict[str, str] = {
+	JOB_FETCH_VOCAB: "website.admin.actions.run_fetch_vocab",
+	JOB_FETCH_HELIOPHYSICS_API: "website.admin.actions.run_fetch_heliophysics_api",
+	JOB_DESCRIBE_REPOSITORY: "website.views.somef.run_describe_form",
+}
+
+def get_job_function(kind: str) -> Callable[..., Any]:
+	path = JOB_FUNCTIONS.get(kind)
+	if path is None: raise ValueError(f"Unknown job kind '{kind}'")
+	return import_string(path)
+
+def get_stale_jobs() -> QuerySet[BackgroundJob]:
+	"""Running jobs that neither started nor reported progress recently."""
+	cutoff = timezone.now() - JOB_STALE_AFTER
+	return (
+		BackgroundJob.objects
+		.filter(status=BackgroundJobStatus.RUNNING, started__lt=cutoff)
+		.exclude(progress__created__gte=cutoff)
+	)
+
+def fail_stale_jobs() -> int:
+	"""
+	Fail the jobs whose worker died while running them, so that they're no
+	longer reported as active and new requests queue a new job. They aren't
+	requeued since the job itself may be what killed the worker.
+	"""
+	return get_stale_jobs().update(
+		status=BackgroundJobStatus.FAILED,
+		error="The worker stopped while running the job",
+		finished=timezone.now(),
+	)
+
+def enqueue_job(kind: str, **params) -> BackgroundJob:
+	"""
+	Queue a job, unless a job of the same kind with the same params is already
+	queued or running, in which case that job is returned instead.
+	"""
+	if kind not in JOB_FUNCTIONS: raise ValueError(f"Unknown job kind '{kind}'")
+	with transaction.atomic():
+		active = BackgroundJob.objects.select_for_update().filter(
+			kind=kind,
+			status__in=[BackgroundJobStatus.QUEUED, BackgroundJobStatus.RUNNING],
+		).exclude(pk__in=get_stale_jobs().values("pk"))
+		for job in active:
+			if job.params == params: return job
+		return BackgroundJob.objects.create(kind=kind, params=params)
+
+def claim_next_job(
+	kinds: list[str] | None = None,
+	exclude_kinds: list[str] | None = None,
+) -> BackgroundJob | None:
+	"""
+	Mark the oldest queued job as running, skipping jobs other workers claim.
+	If kinds are specified, only jobs of those kinds are claimed, and jobs of
+	the excluded kinds are never claimed.
+	"""
+	fail_stale_jobs()
+	with transaction.atomic():
+		queued = BackgroundJob.objects.filter(status=BackgroundJobStatus.QUEUED)
+		if kinds: queued = queued.filter(kind__in=kinds)
+		if exclude_kinds: queued = queued.exclude(kind__in=exclude_kinds)
+		job = (
+			queued
+			.select_for_update(skip_locked=True)
+			.order_by("created", "id")
+			.first()
+		)
+		if job is None: return None
+		job.status = BackgroundJobStatus.RUNNING
+		job.started = timezone.now()
+		job.save(update_fields=["status", "started"])
+		return job
+
+def run_job(job: BackgroundJob) -> BackgroundJob:
+	"""
+	Run a claimed job outside of any transaction so that its progress is
+	visible while it runs, and store its result or error.
+	"""
+	print(f"Running job {job.id} '{job.kind}'..")
+	try:
+		job.result = get_job_function(job.kind)(job, **job.params)
+		job.status = BackgroundJobStatus.SUCCEEDED
+	except Exception as e:
+		traceback.print_exc()
+		job.error = f"{type(e).__name__}: {e}"
+		job.status = BackgroundJobStatus.FAILED
+	job.finished = timezone.now()
+	job.save(update_fields=["result", "status", "error", "finished"])
+	print(f"Job {job.id} '{job.kind}' {job.get_status_display().lower()}")
+	return job
+
+def run_queued_jobs(
+	kinds: list[str] | None = None,
+	exclude_kinds: list[str] | None = None,
+) -> int:
+	"""Run jobs until none are queued, returns the number of jobs run."""
+	count = 0
+	while (job := claim_next_job(kinds, exclude_kinds)) is not None:
+		run_job(job)
+		count += 1
+	return count
+
+def get_latest_jobs() -> dict[str, BackgroundJob | None]:
+	"""The most recent job of every kind, for status displays."""
+	return {
+		kind: BackgroundJob.objects.filter(kind=kind).order_by("-created", "-id").first()
+		for kind in JOB_FUNCTIONS
+	}
+
+def serialize_job(job: BackgroundJob | None) -> dict[str, Any] | None:
+	if job is None: return None
+	return {
+		"id": job.id,
+		"kind": job.kind,
+		"status": job.get_status_display(),
+		"active": job.is_active,
+		"current": job.progress_current,
+		"total": job.progress_total,
+		"message": job.message,
+		"result": job.result,
+		"error": job.error,
+		"created": job.created,
+		"finished": job.finished,
+	}
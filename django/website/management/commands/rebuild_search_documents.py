@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.search.documents import rebuild_search_documents
+
+
+class Command(BaseCommand):
+
+	help = "Rebuilds the denormalized search document of every visible software"
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=200,
+			help="Number of software loaded and written per batch",
+		)
+
+	def handle(self, *args, **options):
+
+		print("Rebuilding search documents...")
+		start = time.monotonic()
+		total = rebuild_search_documents(batch_size=options["batch_size"])
+		elapsed = time.monotonic() - start
+		print(f"Rebuilt {total} search documents in {elapsed:.2f}s")
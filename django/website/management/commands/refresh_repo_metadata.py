@@ -0,0 +1,69 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.metadata import METADATA_WORKERS
+from website.repo_refresh import REFRESH_BATCH_SIZE, refresh_repo_metadata
+
+
+class Command(BaseCommand):
+
+	help = "Updates the versions, descriptions and licenses of visible software from their repositories"
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=REFRESH_BATCH_SIZE,
+			help="Number of software fetched and written per batch",
+		)
+		parser.add_argument(
+			"--workers",
+			type=int,
+			default=METADATA_WORKERS,
+			help="Number of concurrent requests to the repository APIs",
+		)
+		parser.add_argument(
+			"--dry-run",
+			action="store_true",
+			help="Report the changes without writing them",
+		)
+		parser.add_argument(
+			"--overwrite-licenses",
+			action="store_true",
+			help="Replace licenses that differ from the repository's, not only missing ones",
+		)
+		parser.add_argument(
+			"--report",
+			help="Path of a json file to write the report of changes to",
+		)
+
+	def handle(self, *args, **options):
+
+		print("Refreshing repository metadata...")
+		start = time.monotonic()
+		report = refresh_repo_metadata(
+			batch_size=options["batch_size"],
+			workers=options["workers"],
+			dry_run=options["dry_run"],
+			overwrite_licenses=options["overwrite_licenses"],
+		)
+		elapsed = time.monotonic() - start
+
+		for change in report["changes"]:
+			print(f"  {change['name']}: {change['field']} '{change['old']}' -> '{change['new']}'")
+		for change in report["rejected"]:
+			print(f"  {change['name']}: {change['field']} '{change['new']}' rejected, {change['reason']}")
+		for url in report["failed"]: print(f"  failed reading {url}")
+		print(
+			f"Checked {report['checked']} repositories in {elapsed:.2f}s, "
+			f"{len(report['changes'])} changes"
+			f"{' (dry run)' if options['dry_run'] else ''}, "
+			f"{len(report['rejected'])} rejected, {len(report['failed'])} failed, "
+			f"{len(report['unsupported'])} unsupported"
+		)
+
+		if options["report"]:
+			with open(options["report"], "w") as file: json.dump(report, file, indent=2)
+			print(f"Wrote report to {options['report']}")
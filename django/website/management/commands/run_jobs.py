@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.jobs import run_queued_jobs
+
+
+class Command(BaseCommand):
+
+	help = "Runs the queued background jobs, such as vocab fetches started from the admin or repository autofills"
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--loop",
+			action="store_true",
+			help="Keep running and poll for queued jobs instead of exiting",
+		)
+		parser.add_argument(
+			"--interval",
+			type=float,
+			default=5,
+			help="Seconds to wait between polls when looping",
+		)
+		parser.add_argument(
+			"--kind",
+			action="append",
+			dest="kinds",
+			help="Only run jobs of this kind, can be specified multiple times",
+		)
+		parser.add_argument(
+			"--exclude-kind",
+			action="append",
+			dest="exclude_kinds",
+			help="Never run jobs of this kind, can be specified multiple times",
+		)
+
+	def handle(self, *args, **options):
+
+		while True:
+			count = run_queued_jobs(options["kinds"], options["exclude_kinds"])
+			if count: print(f"Ran {count} background jobs")
+			if not options["loop"]: break
+			time.sleep(options["interval"])
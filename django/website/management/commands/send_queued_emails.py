@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from website.outbox import OUTBOX_BATCH_SIZE, send_all_queued_emails
+
+
+class Command(BaseCommand):
+
+	help = "Sends the queued outbound emails that are due, retrying failures with backoff"
+
+	def add_arguments(self, parser):
+		parser.add_argument(
+			"--batch-size",
+			type=int,
+			default=OUTBOX_BATCH_SIZE,
+			help="Number of emails sent over one connection per batch",
+		)
+		parser.add_argument(
+			"--loop",
+			action="store_true",
+			help="Keep running and poll for due emails instead of exiting",
+		)
+		parser.add_argument(
+			"--interval",
+			type=float,
+			default=10,
+			help="Seconds to wait between polls when looping",
+		)
+
+	def handle(self, *args, **options):
+
+		while True:
+			sent, failed = send_all_queued_emails(batch_size=options["batch_size"])
+			if sent or failed:
+				print(f"Sent {sent} queued emails, {failed} failed")
+			if not options["loop"]: break
+			time.sleep(options["interval"])
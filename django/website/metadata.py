@@ -1,7 +1,27 @@
-import http.client
-import json
+"""
+Repository metadata from the GitHub and GitLab APIs. API responses are kept
+in the database with their ETags so that repeated lookups are conditional
+requests, the repository, contributors, languages and latest release are
+requested concurrently over pooled connections, and no requests are made to
+a host while its rate limit is exhausted.
+"""
 
+import abc, threading, time
 from datetime import datetime
+from typing import Any, Iterable
+from urllib.parse import quote, urlsplit
+
+import dateutil.parser
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from .crawler import HttpCrawler
+from .models import RepoApiResponse
+
+METADATA_WORKERS = 4
+METADATA_TIMEOUT = 15
+METADATA_USER_AGENT = "Mozilla/5.0 (compatible; Python-requests/2.26.0)"
 
 class GithubUserData:
 	login: str
@@ -76,24 +96,40 @@ class GithubRepoData:
 			self.license = GithubLicenseData(data['license'])
 
 class RepoData:
-	name: str = ""
-	owner: str = ""
-	description: str = ""
-	homepage: str = ""
-	repo_url: str = ""
-	created_date: datetime | None = None
-	updated_date: datetime | None = None
-	publish_date: datetime | None = None
-	credits: list[str] = []
-	languages: list[str] = []
-	version: str = ""
+	name: str
+	owner: str
+	description: str
+	homepage: str
+	repo_url: str
+	created_date: datetime | None
+	updated_date: datetime | None
+	publish_date: datetime | None
+	credits: list[str]
+	languages: list[str]
+	version: str
+	license: str
 
 	def __init__(self):
-		pass
+		self.name = ""
+		self.owner = ""
+		self.description = ""
+		self.homepage = ""
+		self.repo_url = ""
+		self.created_date = None
+		self.updated_date = None
+		self.publish_date = None
+		self.credits = []
+		self.languages = []
+		self.version = ""
+		self.license = ""
 
 	@staticmethod
-	def from_github_data(data: GithubRepoData) -> 'RepoData':
-		fmt_str = "%Y-%m-%dT%H:%M:%SZ"
+	def from_github_data(
+		data: GithubRepoData,
+		contributors: list[dict] | None = None,
+		languages: dict[str, int] | None = None,
+		release: dict | None = None,
+	) -> 'RepoData':
 
 		if data is None:
 			return None
@@ -101,84 +137,305 @@ class RepoData:
 		repodata = RepoData()
 		repodata.name = data.name
 		repodata.owner = data.owner.login
-		repodata.description = data.description
+		repodata.description = data.description or ""
 		repodata.homepage = data.homepage or ""
 		repodata.repo_url = data.html_url
-		repodata.created_date = datetime.strptime(data.created_at, fmt_str)
-		repodata.updated_date = datetime.strptime(data.updated_at, fmt_str)
-		repodata.publish_date = None # TODO get publish date from release url
-		repodata.credits = [data.owner.login] # TODO get credits from contributors url
-		repodata.languages = [data.language] # TODO get languages from languages url
-		repodata.version = "" # TODO get version from release url
+		repodata.created_date = parse_date(data.created_at)
+		repodata.updated_date = parse_date(data.updated_at)
+
+		# contributors are listed by number of commits
+		repodata.credits = [
+			contributor['login'] for contributor in contributors or []
+			if contributor.get('type') != "Bot"
+		] or [data.owner.login]
+
+		# languages are mapped to the bytes of code written in them
+		repodata.languages = sorted(
+			languages or {}, key=lambda language: languages[language], reverse=True
+		) or ([data.language] if data.language else [])
+
+		if release:
+			repodata.version = release.get('tag_name') or ""
+			repodata.publish_date = parse_date(release.get('published_at'))
+
+		# licenses github can't identify have the 'NOASSERTION' spdx id
+		if data.license and data.license.spdx_id != "NOASSERTION":
+			repodata.license = data.license.spdx_id or data.license.name
 
 		return repodata
 
-	def from_gitlab_data(data: dict) -> 'RepoData':
-		print("Gitlab metadata retrieval not implemented")
-		return None
+	@staticmethod
+	def from_gitlab_data(
+		data: dict,
+		contributors: list[dict] | None = None,
+		languages: dict[str, float] | None = None,
+		releases: list[dict] | None = None,
+	) -> 'RepoData':
 
-def get_metadata(repo_url: str) -> RepoData | None:
+		if data is None:
+			return None
 
-	# get repo data from appropriate web api
-	if "github.com" in repo_url:
-		return RepoData.from_github_data(github_metadata(repo_url))
-	elif "gitlab.com" in repo_url:
-		return RepoData.from_gitlab_data(gitlab_metadata(repo_url))
-	
-	# if no match, return None
-	return None
+		namespace = data.get('namespace') or {}
+		repodata = RepoData()
+		repodata.name = data['name']
+		repodata.owner = namespace.get('full_path') or namespace.get('name') or ""
+		repodata.description = data.get('description') or ""
+		repodata.repo_url = data['web_url']
+		repodata.created_date = parse_date(data.get('created_at'))
+		repodata.updated_date = parse_date(data.get('last_activity_at'))
 
-def gitlab_metadata(url: str) -> dict:
-	# TODO
-	print("Gitlab metadata retrieval not implemented")
-	return None
+		# gitlab doesn't sort contributors by their number of commits
+		contributors = sorted(
+			contributors or [], key=lambda contributor: contributor.get('commits', 0), 
+			reverse=True
+		)
+		repodata.credits = [contributor['name'] for contributor in contributors]
+		if not repodata.credits and repodata.owner: repodata.credits = [repodata.owner]
 
-def github_metadata(url: str) -> GithubRepoData | None:
+		# languages are mapped to the percentage of code written in them
+		repodata.languages = sorted(
+			languages or {}, key=lambda language: languages[language], reverse=True
+		)
 
-	# Extract the owner and repo names from the URL
-	url_post_domain = url.split("github.com/")[1]
-	owner = url_post_domain.split("/")[0]
-	repo = url_post_domain.split("/")[1]
+		if releases:
+			repodata.version = releases[0].get('tag_name') or ""
+			repodata.publish_date = parse_date(releases[0].get('released_at'))
 
-	# Set up the connection to the GitHub API
-	host = "api.github.com"
-	conn = http.client.HTTPSConnection(host)
-	
-	# Define the API endpoint
-	endpoint = f"/repos/{owner}/{repo}"
-	print(f"attempting to get repo metadata from {host + endpoint}")
-
-	# Make the GET request
-	conn.request(
-		"GET", 
-		endpoint, 
-		headers = {
-			"User-Agent": "Mozilla/5.0 (compatible; Python-requests/2.26.0)"
+		license = data.get('license') or {}
+		repodata.license = license.get('nickname') or license.get('name') or ""
+
+		return repodata
+
+def parse_date(value: str | None) -> datetime | None:
+	if not value: return None
+	return dateutil.parser.isoparse(value)
+
+## API clients
+
+# hosts whose rate limit is used up, mapped to the time it resets
+_rate_limited_hosts: dict[str, float] = {}
+_rate_limited_lock = threading.Lock()
+
+_default_crawler: HttpCrawler | None = None
+_default_crawler_lock = threading.Lock()
+
+def get_default_crawler() -> HttpCrawler:
+	"""A crawler shared between lookups, so connections to the APIs are reused."""
+	global _default_crawler
+	with _default_crawler_lock:
+		if _default_crawler is None:
+			_default_crawler = HttpCrawler(workers=METADATA_WORKERS, timeout=METADATA_TIMEOUT)
+		return _default_crawler
+
+class RepoApiClient(abc.ABC):
+	"""
+	Makes conditional GET requests to a repository hosting API. Fetching is
+	done from the crawler's worker threads, the stored responses are read 
+	before and written after in the calling thread.
+	"""
+	host: str
+	rate_limit_remaining_header: str
+	rate_limit_reset_header: str
+
+	def __init__(self, crawler: HttpCrawler | None = None):
+		self.crawler = crawler or get_default_crawler()
+
+	def get_headers(self) -> dict[str, str]:
+		return { "User-Agent": METADATA_USER_AGENT }
+
+	def is_rate_limited(self) -> bool:
+		with _rate_limited_lock:
+			reset = _rate_limited_hosts.get(self.host)
+			if reset is None: return False
+			if reset > time.time(): return True
+			del _rate_limited_hosts[self.host]
+			return False
+
+	def update_rate_limit(self, response: requests.Response) -> None:
+		remaining = response.headers.get(self.rate_limit_remaining_header)
+		reset = response.headers.get(self.rate_limit_reset_header)
+		if remaining is None or reset is None or int(remaining) > 0: return
+		print(f"rate limit for {self.host} exhausted until {time.ctime(int(reset))}")
+		with _rate_limited_lock: _rate_limited_hosts[self.host] = float(reset)
+
+	def request(self, url: str, stored: RepoApiResponse | None) -> RepoApiResponse | None:
+		"""
+		Request the url, and return the new response, the stored response if 
+		the url hasn't changed or can't be requested right now, or None.
+		"""
+		if self.is_rate_limited(): return stored
+		headers = self.get_headers()
+		if stored and stored.etag: headers["If-None-Match"] = stored.etag
+		try: response = self.crawler.get(url, headers=headers)
+		except requests.RequestException as e:
+			print(f"Error requesting {url}: {e}")
+			return stored
+
+		self.update_rate_limit(response)
+		if response.status_code == 304: return stored
+		if response.status_code != 200:
+			if response.status_code in (403, 429) and self.is_rate_limited(): return stored
+			print(f"Error: {response.status_code} - {response.reason} from {url}")
+			return None
+		return RepoApiResponse(
+			url=url,
+			etag=response.headers.get("ETag", ""),
+			content=response.json(),
+			fetched=timezone.now(),
+		)
+
+	def get_json_many(self, urls: Iterable[str]) -> dict[str, Any]:
+		"""The json content of each url, None for urls that can't be fetched."""
+		urls = list(dict.fromkeys(urls))
+		stored = {
+			response.url: response 
+			for response in RepoApiResponse.objects.filter(url__in=urls)
 		}
-	)
+		results: dict[str, Any] = {}
+		fetched: list[RepoApiResponse] = []
+		for url, response, error in self.crawler.map(
+			lambda url: self.request(url, stored.get(url)), urls
+		):
+			if error is not None:
+				print(f"Error reading {url}: {error}")
+				response = stored.get(url)
+			results[url] = response.content if response else None
+			if response is not None and response is not stored.get(url): 
+				fetched.append(response)
+
+		if fetched: RepoApiResponse.objects.bulk_create(
+			fetched,
+			update_conflicts=True,
+			unique_fields=["url"],
+			update_fields=["etag", "content", "fetched"],
+		)
+		return results
+
+	def get_json(self, url: str) -> Any:
+		return self.get_json_many([url])[url]
+
+	@abc.abstractmethod
+	def get_repo_urls(self, repo_url: str) -> list[str]:
+		"""The API urls to request for the repository, the repository itself first."""
+
+	@abc.abstractmethod
+	def build_repo_data(self, responses: list[Any]) -> RepoData | None:
+		"""The repository data from the content of each of its API urls."""
+
+	def get_repo_data_many(self, repo_urls: Iterable[str]) -> dict[str, RepoData | None]:
+		"""The data of several repositories, requested together."""
+		urls = { repo_url: self.get_repo_urls(repo_url) for repo_url in repo_urls }
+		responses = self.get_json_many(url for api_urls in urls.values() for url in api_urls)
+		return {
+			repo_url: (
+				self.build_repo_data([responses[url] for url in api_urls]) 
+				if responses[api_urls[0]] else None
+			)
+			for repo_url, api_urls in urls.items()
+		}
+
+	def get_repo_data(self, repo_url: str) -> RepoData | None:
+		print(f"attempting to get repo metadata from {self.get_repo_urls(repo_url)[0]}")
+		return self.get_repo_data_many([repo_url])[repo_url]
+
+class GithubClient(RepoApiClient):
+	api_url = "https://api.github.com"
+	host = "api.github.com"
+	rate_limit_remaining_header = "X-RateLimit-Remaining"
+	rate_limit_reset_header = "X-RateLimit-Reset"
+
+	def get_headers(self) -> dict[str, str]:
+		headers = super().get_headers()
+		headers["Accept"] = "application/vnd.github+json"
+		if settings.GITHUB_TOKEN: headers["Authorization"] = f"Bearer {settings.GITHUB_TOKEN}"
+		return headers
+
+	def get_repo_api_url(self, repo_url: str) -> str:
+		# Extract the owner and repo names from the URL
+		parts = [part for part in urlsplit(repo_url).path.split("/") if part]
+		if len(parts) < 2: raise ValueError(f"'{repo_url}' is not a GitHub repository url")
+		owner, repo = parts[:2]
+		if repo.endswith(".git"): repo = repo[:-4]
+		return f"{self.api_url}/repos/{owner}/{repo}"
+
+	def get_repo(self, repo_url: str) -> GithubRepoData | None:
+		data = self.get_json(self.get_repo_api_url(repo_url))
+		return GithubRepoData(data) if data else None
+
+	def get_repo_urls(self, repo_url: str) -> list[str]:
+		endpoint = self.get_repo_api_url(repo_url)
+		return [
+			endpoint,
+			f"{endpoint}/contributors?per_page=100",
+			f"{endpoint}/languages",
+			f"{endpoint}/releases/latest",
+		]
+
+	def build_repo_data(self, responses: list[Any]) -> RepoData | None:
+		repo, contributors, languages, release = responses
+		return RepoData.from_github_data(GithubRepoData(repo), contributors, languages, release)
+
+class GitlabClient(RepoApiClient):
+	rate_limit_remaining_header = "RateLimit-Remaining"
+	rate_limit_reset_header = "RateLimit-Reset"
+
+	def __init__(self, host: str = "gitlab.com", crawler: HttpCrawler | None = None):
+		super().__init__(crawler)
+		self.host = host
+		self.api_url = f"https://{host}/api/v4"
+
+	def get_headers(self) -> dict[str, str]:
+		headers = super().get_headers()
+		# anyone can submit a repository on an instance they control, so the
+		# token is only sent to the configured hosts
+		if settings.GITLAB_TOKEN and self.host in settings.GITLAB_TOKEN_HOSTS: 
+			headers["PRIVATE-TOKEN"] = settings.GITLAB_TOKEN
+		return headers
+
+	def get_repo_api_url(self, repo_url: str) -> str:
+		# projects are identified by their url encoded path with namespaces
+		path = urlsplit(repo_url).path.split("/-/")[0].strip("/")
+		if "/" not in path: raise ValueError(f"'{repo_url}' is not a GitLab project url")
+		if path.endswith(".git"): path = path[:-4]
+		return f"{self.api_url}/projects/{quote(path, safe='')}"
+
+	def get_repo(self, repo_url: str) -> dict | None:
+		return self.get_json(self.get_repo_urls(repo_url)[0])
+
+	def get_repo_urls(self, repo_url: str) -> list[str]:
+		endpoint = self.get_repo_api_url(repo_url)
+		return [
+			f"{endpoint}?license=true",
+			f"{endpoint}/repository/contributors?per_page=100",
+			f"{endpoint}/languages",
+			f"{endpoint}/releases?per_page=1",
+		]
+
+	def build_repo_data(self, responses: list[Any]) -> RepoData | None:
+		return RepoData.from_gitlab_data(*responses)
+
+def get_metadata_client(
+	repo_url: str, 
+	crawler: HttpCrawler | None = None
+) -> RepoApiClient | None:
+	"""The API client for the host of the repository, if it's supported."""
+	host = urlsplit(repo_url).netloc.lower()
+	if host in ("github.com", "www.github.com"): return GithubClient(crawler)
+	if "gitlab" in host: return GitlabClient(host, crawler)
+	return None
+
+def get_metadata(repo_url: str, crawler: HttpCrawler | None = None) -> RepoData | None:
+
+	# get repo data from appropriate web api
+	client = get_metadata_client(repo_url, crawler)
 	
-	# Get the response
-	response = conn.getresponse()
+	# if no match, return None
+	if client is None: return None
+	return client.get_repo_data(repo_url)
 
-	# Check if the request was successful
-	if response.status == 200:
-		# Read and decode the response data
-		data = response.read().decode("utf-8")
-		
-		# Parse the JSON response
-		repo_metadata = json.loads(data)
-		
-		# Close the connection
-		conn.close()
-		
-		# print the retrieved metadata
-		# print(f"Repository: {repo_metadata['full_name']}:")
-		# for key, value in repo_metadata.items():
-		#     print(f"  {key}: {value}")
-
-		return GithubRepoData(repo_metadata)
-	else:
-		# Handle errors
-		print(f"Error: {response.status} - {response.reason}")
-		conn.close()
-		return None
\ No newline at end of file
+def gitlab_metadata(url: str) -> dict | None:
+	host = urlsplit(url).netloc.lower()
+	return GitlabClient(host).get_repo(url)
+
+def github_metadata(url: str) -> GithubRepoData | None:
+	return GithubClient().get_repo(url)
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0019_instrumentobservatory_landing_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoftwareSearchDocument',
+            fields=[
+                ('software', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='website.software')),
+                ('software_name', models.CharField(max_length=128)),
+                ('tier_1', models.TextField(blank=True, default='')),
+                ('tier_2', models.TextField(blank=True, default='')),
+                ('tier_3', models.TextField(blank=True, default='')),
+                ('tier_4_1', models.TextField(blank=True, default='')),
+                ('tier_4_2', models.TextField(blank=True, default='')),
+                ('tier_4_3', models.TextField(blank=True, default='')),
+                ('tier_4_4', models.TextField(blank=True, default='')),
+                ('tier_4_5', models.TextField(blank=True, default='')),
+                ('tier_4_6', models.TextField(blank=True, default='')),
+                ('tier_4_7', models.TextField(blank=True, default='')),
+                ('tier_4_8', models.TextField(blank=True, default='')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['software_name'],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_TEXT_CONFIG = 'english'
+TIER_WEIGHTS = {
+    'tier_1': 'A',
+    'tier_2': 'B',
+    'tier_3': 'C',
+    **{f'tier_4_{index}': 'D' for index in range(1, 9)},
+}
+
+
+def populate_search_vectors(apps, schema_editor):
+    SoftwareSearchDocument = apps.get_model('website', 'SoftwareSearchDocument')
+    vector = None
+    for tier_name, weight in TIER_WEIGHTS.items():
+        tier_vector = SearchVector(tier_name, weight=weight, config=SEARCH_TEXT_CONFIG)
+        vector = tier_vector if vector is None else vector + tier_vector
+    SoftwareSearchDocument.objects.update(search_vector=vector)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm ships with postgres contrib, but not every installation has it,
+    # the postgres search engine falls back to unindexed matching without it
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            print("\npg_trgm is not available, skipping trigram indexes")
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for tier_name in TIER_WEIGHTS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS search_document_{tier_name}_trgm '
+            f'ON website_softwaresearchdocument USING gin ({tier_name} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    for tier_name in TIER_WEIGHTS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS search_document_{tier_name}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0020_softwaresearchdocument'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='softwaresearchdocument',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='softwaresearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='search_document_vector_idx'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
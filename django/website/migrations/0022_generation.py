@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0021_search_document_full_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Generation',
+            fields=[
+                ('name', models.CharField(max_length=128, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('modified', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
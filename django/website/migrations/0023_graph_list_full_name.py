@@ -0,0 +1,72 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:28
+
+from django.db import migrations, models
+
+# the ordering that picks the first parent of each model, and whether the 
+# model's names repeat the name of their parent, see ControlledGraphList
+GRAPH_LISTS = {
+    'FunctionCategory': (['pk'], False),
+    'Region': (['name'], True),
+    'Phenomena': (['name'], False),
+}
+
+
+def populate_full_names(apps, schema_editor):
+    for model_name, (ordering, strip_parent_name) in GRAPH_LISTS.items():
+        model = apps.get_model('website', model_name)
+        names = {}
+        rank = {}
+        for index, (pk, name) in enumerate(model.objects.order_by(*ordering).values_list('pk', 'name')):
+            names[pk] = name
+            rank[pk] = index
+        first_parents = {}
+        for child, parent in model.objects.filter(children__isnull=False).values_list('children', 'pk'):
+            current = first_parents.get(child)
+            if current is None or rank[parent] < rank[current]:
+                first_parents[child] = parent
+
+        full_names = {}
+        def resolve(pk, visiting):
+            if pk in full_names: return full_names[pk]
+            parent = first_parents.get(pk)
+            name = names[pk]
+            if parent is None or parent in visiting:
+                full_name = name
+            else:
+                if strip_parent_name: name = name.replace(names[parent], '').strip()
+                full_name = f'{resolve(parent, visiting | {pk})}: {name}'
+            full_names[pk] = full_name
+            return full_name
+
+        for pk in names: resolve(pk, set())
+        model.objects.bulk_update(
+            [model(pk=pk, full_name=full_name) for pk, full_name in full_names.items()],
+            ['full_name'],
+            batch_size=500,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0022_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='functioncategory',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='phenomena',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.AddField(
+            model_name='region',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512),
+        ),
+        migrations.RunPython(populate_full_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0023_graph_list_full_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=512)),
+                ('body', models.TextField()),
+                ('from_email', models.CharField(blank=True, max_length=512, null=True)),
+                ('recipients', models.JSONField(default=list)),
+                ('status', models.IntegerField(choices=[(0, 'Pending'), (1, 'Sent'), (2, 'Failed')], default=0)),
+                ('attempts', models.IntegerField(default=0)),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('sent', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['next_attempt', 'id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt'], name='outbound_email_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0024_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=128)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('status', models.IntegerField(choices=[(0, 'Queued'), (1, 'Running'), (2, 'Succeeded'), (3, 'Failed')], default=0)),
+                ('progress_current', models.IntegerField(default=0)),
+                ('progress_total', models.IntegerField(blank=True, null=True)),
+                ('message', models.CharField(blank=True, default='', max_length=512)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('started', models.DateTimeField(blank=True, null=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created'],
+                'indexes': [models.Index(fields=['status', 'created'], name='background_job_status_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BackgroundJobProgress',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('message', models.CharField(blank=True, default='', max_length=512)),
+                ('current', models.IntegerField(default=0)),
+                ('total', models.IntegerField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress', to='website.backgroundjob')),
+            ],
+            options={
+                'ordering': ['created', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0025_background_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RepoApiResponse',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.CharField(max_length=512, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=512)),
+                ('content', models.JSONField(blank=True, null=True)),
+                ('fetched', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0026_repo_api_response'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoftwareJsonLdVersion',
+            fields=[
+                ('software', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='jsonld_version', serialize=False, to='website.software')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SoftwareJsonLd',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_url', models.CharField(blank=True, default='', max_length=512)),
+                ('version', models.BigIntegerField(default=0)),
+                ('content', models.BinaryField()),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('software', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jsonld_documents', to='website.software')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('software', 'base_url'), name='software_jsonld_base_url_unique')],
+            },
+        ),
+    ]
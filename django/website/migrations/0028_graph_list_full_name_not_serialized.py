@@ -0,0 +1,28 @@
+# Generated by Django 5.1.5 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0027_software_jsonld'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='functioncategory',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='phenomena',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='region',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=512, serialize=False),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.5 on 2026-10-18 18:40
+
+import uuid
+
+from django.db import migrations, models
+
+
+def generate_tokens(apps, schema_editor):
+    BackgroundJob = apps.get_model('website', 'BackgroundJob')
+    jobs = list(BackgroundJob.objects.only('id'))
+    for job in jobs:
+        job.token = uuid.uuid4()
+    BackgroundJob.objects.bulk_update(jobs, ['token'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('website', '0028_graph_list_full_name_not_serialized'),
+    ]
+
+    operations = [
+        # existing jobs get distinct tokens before the field is made unique
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='token',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.RunPython(generate_tokens, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='token',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
@@ -4,4 +4,10 @@ from .related import *
 from .organizations import *
 from .software import *
 from .people import *
-from .vocab import *
\ No newline at end of file
+from .vocab import *
+from .generation import *
+from .search import *
+from .jsonld import *
+from .outbox import *
+from .jobs import *
+from .metadata import *
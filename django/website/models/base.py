@@ -3,14 +3,14 @@ Include base models which all models used by HSSI should inherit from, also
 pcontains utility types and constants.
 """
 
-import uuid, json
-from typing import Any, NamedTuple
+import uuid
+from typing import Any, Iterable, NamedTuple
 from django.db import models
-from django.db.models import ManyToManyField, QuerySet
+from django.db.models import ManyToManyField, Prefetch, QuerySet, prefetch_related_objects
 from django.db.models.fields import related_descriptors
-from django.core.serializers import serialize
 
 from ..util import *
+from .extractor import get_field_extractor
 
 ## Utility Constants & Types ---------------------------------------------------
 
@@ -74,6 +74,16 @@ class HssiModel(models.Model, metaclass=HssiBase):
 
 	def get_tooltip(self) -> str: return ''
 
+	@classmethod
+	def get_choice_queryset(cls, queryset: QuerySet['HssiModel']) -> QuerySet['HssiModel']:
+		"""The queryset with the relations that get_choice reads loaded"""
+		return queryset
+
+	@classmethod
+	def get_choices(cls, queryset: QuerySet['HssiModel']) -> list[ModelObjectChoice]:
+		"""The choices of every object in the queryset, in its order"""
+		return [obj.get_choice() for obj in cls.get_choice_queryset(queryset)]
+
 	def get_identifier_url(self) -> str | None: return None
 	
 	@staticmethod
@@ -170,44 +180,51 @@ class HssiModel(models.Model, metaclass=HssiBase):
 		if access < self.access and access_override < self.access:
 			raise Exception(f"Unauthorized access, {access} < {self.access}")
 		
-		datas: str = serialize('json', [self], fields=fields)
-		data: dict[str, Any] = json.loads(datas)[0].get('fields')
+		data = get_field_extractor(type(self)).extract(self, fields)
 		data['id'] = str(self.id)
 
-		# TODO handle potential infinite recursion for circular table references
 		if recursive:
-			def lookup(uid: str, field: FIELD_HAS_FOREIGN_KEY) -> dict[str, Any] | None | str:
-				if isinstance(field, FIELD_HAS_FOREIGN_KEY):
-					target_model: type[HssiModel] = field.related_model
-					if not issubclass(target_model, HssiModel): return None
-					instance = target_model.objects.filter(pk=uid).first()
-					parsed_val: dict[str, Any] = None
-					try: parsed_val = instance.get_serialized_data(access, recursive)
-					except Exception: return "ERROR"
-					return parsed_val
-				return None
-			
-			for key, val in data.items():
-				if key == 'id': continue
-				if isinstance(val, list):
-					new_val: list = []
-					for item in val:
-						if not item: continue
-						try:
-							new_item = lookup(uuid.UUID(item), self._meta.get_field(key))
-							if new_item: new_val.append(new_item)
-						except Exception: break
-				else:
-					try: new_val =  lookup(uuid.UUID(val), self._meta.get_field(key))
-					except: continue
-				if new_val: data[key] = new_val
+			from .expansion import SerializedDataExpander
+			data = SerializedDataExpander(access).expand([(type(self), self.pk, data)])[0]
 		
 		# if fields param is specified, remove any non-specified fields
 		if fields:
-			for key in data:
-				if not key in fields: del data[key]
+			data = {key: val for key, val in data.items() if key in fields}
 
 		return data
+
+	@classmethod
+	def prefetch_serialized_data(
+		cls, 
+		objects: Iterable['HssiModel'], 
+		fields: list[str] = None
+	) -> list['HssiModel']:
+		"""
+		load the related data that get_serialized_data reads for all the objects
+		at once, returns the objects as a list
+		"""
+		return get_field_extractor(cls).prefetch(objects, fields)
+
+	@classmethod
+	def get_serialized_data_many(
+		cls, 
+		objects: Iterable['HssiModel'], 
+		access: AccessLevel, 
+		recursive: bool = False, 
+		fields: list[str] = None
+	) -> list[dict[str, Any]]:
+		"""
+		get_serialized_data for every object in a queryset or iterable, when 
+		recursive the referenced objects of all the objects are expanded together
+		"""
+		objects = cls.prefetch_serialized_data(objects, fields)
+		datas = [obj.get_serialized_data(access, fields=fields) for obj in objects]
+		if recursive:
+			from .expansion import SerializedDataExpander
+			datas = SerializedDataExpander(access).expand(
+				(type(obj), obj.pk, data) for obj, data in zip(objects, datas)
+			)
+		return datas
 	
 	def to_user_str(self) -> str:
 		return str(self)
@@ -226,6 +243,16 @@ class HssiSet(HssiModel):
 		return self.target_model.objects.get(pk=self.pk).get_choice()
 	def get_tooltip(self):
 		return self.target_model.objects.get(pk=self.pk).get_tooltip()
+
+	@classmethod
+	def get_choices(cls, queryset):
+		# the choices of the targets, fetched together instead of one at a time
+		ids = list(queryset.values_list("pk", flat=True))
+		targets = cls.target_model.get_choice_queryset(
+			cls.target_model.objects.filter(pk__in=ids)
+		)
+		choices = {target.pk: target.get_choice() for target in targets}
+		return [choices[pk] for pk in ids if pk in choices]
 	def get_serialized_data(
 		self, 
 		access, 
@@ -235,13 +262,27 @@ class HssiSet(HssiModel):
 	):
 		if access < self.access and accessOverride < self.access:
 			raise Exception(f"Unauthorized access, {access} < {self.access}")
-		return self.target_model.objects.get(pk=self.pk).get_serialized_data(
+		target: HssiModel = getattr(self, "_serialized_target", None)
+		if target is None: target = self.target_model.objects.get(pk=self.pk)
+		return target.get_serialized_data(
 			access, 
 			recursive, 
 			self.target_model.access,
 			fields
 		)
 
+	@classmethod
+	def prefetch_serialized_data(cls, objects, fields = None):
+		objects = list(objects)
+		targets = cls.target_model.prefetch_serialized_data(
+			cls.target_model.objects.filter(pk__in=[obj.pk for obj in objects]),
+			fields,
+		)
+		target_map = {target.pk: target for target in targets}
+		for obj in objects:
+			obj._serialized_target = target_map.get(obj.pk)
+		return objects
+
 	def __str__(self): 
 		try:
 			software = self.target_model.objects.get(pk=self.id)
@@ -301,6 +342,12 @@ class ControlledGraphList(ControlledList):
 	children: models.Manager['ControlledGraphList']
 	parent_nodes: models.Manager['ControlledGraphList']
 
+	# path of names from the root, kept up to date by update_full_names(), it's
+	# internal so it isn't serialized or part of the model structures
+	full_name = models.CharField(
+		max_length=LEN_LONGNAME, blank=True, default="", editable=False, serialize=False
+	)
+
 	@classmethod
 	def apply_old_to_new_mapping(cls, mapping: dict[str, str]):
 
@@ -337,42 +384,80 @@ class ControlledGraphList(ControlledList):
 	
 	@classmethod
 	def get_object_with_full_name(cls, full_name: str) -> 'ControlledGraphList':
+		"""
+		find the object at a "Root: Child: ..." path of names, each segment is 
+		the first object with that name whose parents include the previous one
+		"""
+		from .graph_paths import get_path_index
+		pk = get_path_index(cls).resolve(full_name)
+		return cls.objects.get(pk=pk) if pk else None
 
-		split_name = full_name.split(": ")
-
-		# set root parent to root object with same subname as first 
-		# part of fullname
-		name_query = cls.objects.filter(name=split_name[0]).filter(parent_nodes__isnull=True)
-		parent: 'ControlledGraphList' = name_query.first()
-
-		# go through subnames sequentially finding a match with the same 
-		# parent from the previous iteration
-		for subname in split_name[1:]:
-			name_query = cls.objects.filter(name=subname)
-			parent_changed = False
-			for obj in name_query:
-				if obj.parent_nodes.contains(parent):
-					parent = obj
-					parent_changed = True
-					break
-			if not parent_changed:
-				raise Exception(
-					f"Invalid full name '{full_name}', " +
-					f"resolution failed at '{subname}'"
+	@classmethod
+	def join_full_name(cls, parent_full_name: str, parent_name: str, name: str) -> str:
+		""" the full name of a node from its name and its parent's full name """
+		return f"{parent_full_name}: {name}"
+
+	@classmethod
+	def build_full_names(cls) -> dict[uuid.UUID, str]:
+		"""
+		compute the full name of every object, following the same first parent 
+		that parent_nodes.first() returns
+		"""
+		rows = cls.objects.order_by(*(cls._meta.ordering or ["pk"])).values_list("pk", "name")
+		names: dict[uuid.UUID, str] = {}
+		rank: dict[uuid.UUID, int] = {}
+		for index, (pk, name) in enumerate(rows):
+			names[pk] = name
+			rank[pk] = index
+
+		first_parents: dict[uuid.UUID, uuid.UUID] = {}
+		edges = cls.objects.filter(children__isnull=False).values_list("children", "pk")
+		for child, parent in edges:
+			current = first_parents.get(child)
+			if current is None or rank[parent] < rank[current]:
+				first_parents[child] = parent
+
+		full_names: dict[uuid.UUID, str] = {}
+		def resolve(pk: uuid.UUID, visiting: set[uuid.UUID]) -> str:
+			full_name = full_names.get(pk)
+			if full_name is not None: return full_name
+			parent = first_parents.get(pk)
+			if parent is None or parent in visiting: full_name = names[pk]
+			else: 
+				full_name = cls.join_full_name(
+					resolve(parent, visiting | {pk}), names[parent], names[pk]
 				)
-		
-		return parent
+			full_names[pk] = full_name
+			return full_name
+
+		for pk in names: resolve(pk, set())
+		return full_names
+
+	@classmethod
+	def update_full_names(cls) -> int:
+		""" store the full name of every object, returns the number updated """
+		full_names = cls.build_full_names()
+		stored = dict(cls.objects.values_list("pk", "full_name"))
+		changed = [
+			cls(pk=pk, full_name=full_name) 
+			for pk, full_name in full_names.items() if stored.get(pk) != full_name
+		]
+		cls.objects.bulk_update(changed, ["full_name"], batch_size=500)
+		return len(changed)
+
+	@classmethod
+	def post_fetch(cls):
+		super().post_fetch()
+		cls.update_full_names()
 
 	def get_full_name(self) -> str:
 		""" get a path of all parents recursively pointing to this one """
-		path = self.name
+		if self.full_name: return self.full_name
 
+		# not stored yet, build it from the parent's full name instead
 		parent = self.parent_nodes.first()
-		while parent:
-			path = f"{parent.name}: {path}"
-			parent = parent.parent_nodes.first()
-
-		return path
+		if parent is None: return self.name
+		return self.join_full_name(parent.get_full_name(), parent.name, self.name)
 	
 	def get_serialized_data(
 		self, 
@@ -397,6 +482,16 @@ class ControlledGraphList(ControlledList):
 		
 		return data
 
+	@classmethod
+	def prefetch_serialized_data(cls, objects, fields = None):
+		objects = super().prefetch_serialized_data(objects, fields)
+		if fields is None or "parents" in fields:
+			prefetch_related_objects(
+				objects, 
+				Prefetch("parent_nodes", queryset=cls.objects.only("pk")),
+			)
+		return objects
+
 	class Meta:
 		ordering = ['name']
 		abstract = True
@@ -0,0 +1,84 @@
+"""
+Encoded choice lists of the models, the options that model boxes in the
+forms autocomplete from. Each list is built from a few bulk queries and kept
+in the cache under the catalog generation, which every change to an HSSI
+model bumps, so requests are answered with stored bytes until the next edit.
+"""
+
+import json
+from typing import Any
+
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .base import HssiModel
+from .generation import GENERATION_CATALOG, Generation
+
+CHOICES_CACHE_PREFIX = "model_choices"
+
+# the lookups that a choice filter may use on a field of the model
+CHOICE_FILTER_LOOKUPS = {
+	"exact", "iexact", "in", "isnull",
+	"contains", "icontains", "startswith", "istartswith",
+}
+
+def parse_filter_value(value: str) -> Any:
+	"""A json literal like 1, true or [1, 2], otherwise the string itself."""
+	try: return json.loads(value)
+	except ValueError: return value
+
+def parse_choice_filters(model: type[HssiModel], params: dict[str, str]) -> dict[str, Any]:
+	"""
+	The queryset filters of a choices request. Only the model's own concrete
+	fields can be filtered, so a filter can't reach into related models, and
+	raises a ValueError otherwise.
+	"""
+	filters: dict[str, Any] = {}
+	for key, value in params.items():
+		field_name, _, lookup = key.partition("__")
+		try: field = model._meta.get_field(field_name)
+		except FieldDoesNotExist:
+			raise ValueError(f"Unknown field '{field_name}'")
+		if not field.concrete or field.is_relation:
+			raise ValueError(f"Field '{field_name}' can't be filtered")
+		if lookup and lookup not in CHOICE_FILTER_LOOKUPS:
+			raise ValueError(f"Unsupported lookup '{lookup}'")
+		value = parse_filter_value(value)
+		if lookup == "in" and not isinstance(value, list):
+			raise ValueError(f"'{key}' must be a list")
+		filters[key] = value
+
+	# values the fields can't convert only fail once the filter is built
+	try: model.objects.filter(**filters)
+	except (TypeError, ValueError, ValidationError) as e:
+		raise ValueError(f"Invalid filter value: {e}")
+	return filters
+
+def get_choices_cache_key(model: type[HssiModel], filters: dict[str, Any], version: str) -> str:
+	filter_key = json.dumps(filters, sort_keys=True, separators=(",", ":"))
+	return f"{CHOICES_CACHE_PREFIX}:{version}:{model.__name__}:{filter_key}"
+
+def encode_choices(model: type[HssiModel], filters: dict[str, Any]) -> bytes:
+	"""The choices response of a model, encoded the same as a JsonResponse."""
+	queryset = model.objects.filter(**filters) if filters else model.objects.all()
+	data = {"data": model.get_choices(queryset)}
+	return json.dumps(data, cls=DjangoJSONEncoder).encode("utf-8")
+
+def get_choices_json(
+	model: type[HssiModel], 
+	filters: dict[str, Any] = None, 
+	version: str = None,
+) -> bytes:
+	"""
+	The encoded choices of a model, from the cache when they haven't changed.
+	The catalog version is read unless the caller already has it.
+	"""
+	filters = filters or {}
+	if version is None: version = Generation.get_version(GENERATION_CATALOG)
+	key = get_choices_cache_key(model, filters, version)
+	content: bytes | None = cache.get(key)
+	if content is None:
+		content = encode_choices(model, filters)
+		cache.set(key, content)
+	return content
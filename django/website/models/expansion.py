@@ -0,0 +1,140 @@
+"""
+Recursive expansion of serialized model data, where every foreign key and
+many to many id is replaced by the serialized data of the object it refers
+to. Referenced objects are collected level by level and each model is
+fetched once per level, instead of querying for every reference.
+"""
+
+import uuid
+from typing import Any, Iterable
+
+from django.core.exceptions import FieldDoesNotExist
+
+from ..util import AccessLevel
+from .base import FIELD_HAS_FOREIGN_KEY, HssiModel
+
+# the value of a reference whose object couldn't be serialized
+EXPANSION_ERROR = "ERROR"
+
+Reference = tuple[type[HssiModel], uuid.UUID]
+
+def get_data_model(model: type[HssiModel]) -> type[HssiModel]:
+	"""The model whose fields the serialized data of model's objects has."""
+	return getattr(model, "target_model", None) or model
+
+def get_references(
+	model: type[HssiModel],
+	data: dict[str, Any]
+) -> dict[str, Reference | list[Reference]]:
+	"""
+	The objects that each relation field of the data refers to. Ids that
+	aren't strings, such as those added by get_serialized_data overrides,
+	are not references, and a list stops at the first id that fails to parse.
+	"""
+	references: dict[str, Reference | list[Reference]] = {}
+	for key, val in data.items():
+		if key == 'id': continue
+		try: field = model._meta.get_field(key)
+		except FieldDoesNotExist: continue
+		if not isinstance(field, FIELD_HAS_FOREIGN_KEY): continue
+		target_model = field.related_model
+		if not issubclass(target_model, HssiModel): continue
+		if isinstance(val, list):
+			items: list[Reference] = []
+			for item in val:
+				if not item: continue
+				try: items.append((target_model, uuid.UUID(item)))
+				except Exception: break
+			references[key] = items
+		else:
+			try: references[key] = (target_model, uuid.UUID(val))
+			except Exception: continue
+	return references
+
+class SerializedDataExpander:
+	"""
+	Expands the serialized data of objects, memoizing the data of every
+	referenced object so it is fetched and serialized only once. A reference
+	back to an object that is already being expanded higher up is left as
+	its id instead of recursing forever.
+	"""
+
+	def __init__(self, access: AccessLevel):
+		self.access = access
+		self.nodes: dict[Reference, dict[str, Any] | str] = {}
+		self.references: dict[Reference, dict[str, Reference | list[Reference]]] = {}
+		self.queued: set[Reference] = set()
+
+	def expand(
+		self,
+		items: Iterable[tuple[type[HssiModel], uuid.UUID, dict[str, Any]]]
+	) -> list[dict[str, Any]]:
+		"""
+		Expand the (model, pk, data) of each item, returns the expanded data
+		of the items in order.
+		"""
+		items = [
+			(get_data_model(model), pk, data, get_references(get_data_model(model), data))
+			for model, pk, data in items
+		]
+		self.load([references for _, _, _, references in items])
+		return [
+			self.build(data, references, {(model, pk)})
+			for model, pk, data, references in items
+		]
+
+	def load(self, references: list[dict[str, Reference | list[Reference]]]) -> None:
+		"""Serialize every object reachable from the references, level by level."""
+		pending: dict[type[HssiModel], set[uuid.UUID]] = {}
+		def queue(refs: dict[str, Reference | list[Reference]]):
+			for ref in refs.values():
+				for target in ref if isinstance(ref, list) else [ref]:
+					if target in self.queued: continue
+					self.queued.add(target)
+					pending.setdefault(target[0], set()).add(target[1])
+
+		for refs in references: queue(refs)
+		while pending:
+			level, pending = pending, {}
+			for model, pks in level.items():
+				self.load_model(model, pks)
+				for pk in pks:
+					refs = self.references.get((model, pk))
+					if refs: queue(refs)
+
+	def load_model(self, model: type[HssiModel], pks: set[uuid.UUID]) -> None:
+		# nested objects are serialized without the access override
+		if self.access < model.access and AccessLevel.PUBLIC < model.access:
+			for pk in pks: self.nodes[(model, pk)] = EXPANSION_ERROR
+			return
+
+		objects = model.objects.in_bulk(pks)
+		model.prefetch_serialized_data(objects.values())
+		for pk in pks:
+			obj = objects.get(pk)
+			try: data = obj.get_serialized_data(self.access)
+			except Exception: data = EXPANSION_ERROR
+			self.nodes[(model, pk)] = data
+			if data is not EXPANSION_ERROR:
+				self.references[(model, pk)] = get_references(get_data_model(model), data)
+
+	def build(
+		self,
+		data: dict[str, Any],
+		references: dict[str, Reference | list[Reference]],
+		path: set[Reference],
+	) -> dict[str, Any]:
+		"""A copy of data with its references replaced by the expanded objects."""
+		data = dict(data)
+		for key, ref in references.items():
+			if isinstance(ref, list):
+				new_val = [self.build_reference(target, path) for target in ref]
+			else: new_val = self.build_reference(ref, path)
+			if new_val: data[key] = new_val
+		return data
+
+	def build_reference(self, target: Reference, path: set[Reference]) -> dict[str, Any] | str:
+		if target in path: return str(target[1])
+		node = self.nodes[target]
+		if node is EXPANSION_ERROR: return node
+		return self.build(node, self.references[target], path | {target})
@@ -0,0 +1,85 @@
+"""
+Reads the field values of model instances into the same dictionaries that
+django.core.serializers produces for them, without encoding every instance
+to a json string and parsing it back.
+"""
+
+import functools
+from typing import Any, Callable, Iterable
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import prefetch_related_objects, Prefetch
+from django.utils.encoding import is_protected_type
+
+_encoder = DjangoJSONEncoder()
+
+def _encode_protected(value: Any) -> Any:
+	"""Protected values as they read after a round trip through json."""
+	if value is None or isinstance(value, (bool, int, float)): return value
+	return _encoder.default(value)
+
+class FieldExtractor:
+	"""
+	The serializable fields of a model, compiled once from its _meta. Concrete
+	fields are read from their attribute, and many to many fields as lists of
+	related primary keys, from the prefetched objects when they are available.
+	"""
+
+	def __init__(self, model: type[models.Model]):
+		self.model = model
+		self.fields: list[tuple[str, str, Callable[[models.Model], str] | None]] = []
+		self.m2m_fields: list[models.ManyToManyField] = []
+
+		# the same fields that the django serializers include
+		opts = model._meta.concrete_model._meta
+		for field in opts.local_fields:
+			if not field.serialize: continue
+			# fields that don't override value_to_string can be converted by str()
+			to_string = None
+			if type(field).value_to_string is not models.Field.value_to_string:
+				to_string = field.value_to_string
+			self.fields.append((field.name, field.attname, to_string))
+		for field in opts.local_many_to_many:
+			if field.serialize and field.remote_field.through._meta.auto_created:
+				self.m2m_fields.append(field)
+
+	def get_m2m_fields(self, fields: list[str] = None) -> list[models.ManyToManyField]:
+		return [field for field in self.m2m_fields if fields is None or field.name in fields]
+
+	def prefetch(self, objects: Iterable[models.Model], fields: list[str] = None) -> list[models.Model]:
+		"""
+		Prefetch the related keys of the many to many fields for all the
+		objects at once, one query per field.
+		"""
+		objects = list(objects)
+		lookups = [
+			Prefetch(field.name, queryset=field.related_model._default_manager.only("pk"))
+			for field in self.get_m2m_fields(fields)
+		]
+		prefetch_related_objects(objects, *lookups)
+		return objects
+
+	def extract(self, obj: models.Model, fields: list[str] = None) -> dict[str, Any]:
+		"""The values of the object's fields, restricted to fields if specified."""
+		data: dict[str, Any] = {}
+		for name, attname, to_string in self.fields:
+			if fields is not None and name not in fields: continue
+			value = getattr(obj, attname)
+			if is_protected_type(value): value = _encode_protected(value)
+			elif to_string is None: value = str(value)
+			else: value = to_string(obj)
+			data[name] = value
+
+		prefetched: dict[str, Any] = getattr(obj, "_prefetched_objects_cache", {})
+		for field in self.get_m2m_fields(fields):
+			related = prefetched.get(field.name)
+			if related is None:
+				related = getattr(obj, field.name).select_related(None).only("pk").iterator()
+			data[field.name] = [str(item.pk) for item in related]
+
+		return data
+
+@functools.cache
+def get_field_extractor(model: type[models.Model]) -> FieldExtractor:
+	return FieldExtractor(model)
@@ -0,0 +1,63 @@
+""" Database stored counters used to invalidate caches across processes. """
+
+import datetime
+
+from django.db import models, transaction
+from django.utils import timezone
+
+from .base import LEN_NAME
+
+# Incremented whenever any HSSI model data changes, see website.signals
+GENERATION_CATALOG = "catalog"
+# Incremented whenever the set of visible software or their slugs change
+GENERATION_VISIBLE_SOFTWARE = "visible_software"
+
+class Generation(models.Model):
+	"""
+	A named counter which is incremented whenever the data it tracks changes.
+	Each worker process compares the stored value against the one it built a
+	cache with, so the cache is rebuilt everywhere after any change.
+	"""
+	name = models.CharField(max_length=LEN_NAME, primary_key=True)
+	value = models.BigIntegerField(default=0)
+	modified = models.DateTimeField(auto_now=True)
+
+	def __str__(self): return f"{self.name} ({self.value})"
+
+	@classmethod
+	def get_value(cls, name: str) -> int:
+		"""The current value of the named counter, 0 if it was never bumped."""
+		value = cls.objects.filter(pk=name).values_list("value", flat=True).first()
+		return value or 0
+
+	@classmethod
+	def get_modified(cls, name: str) -> datetime.datetime | None:
+		"""When the named counter was last bumped, None if it never was."""
+		return cls.objects.filter(pk=name).values_list("modified", flat=True).first()
+
+	@classmethod
+	def get_version(cls, name: str) -> str:
+		"""
+		Identifies the current state of the named counter. Includes the time
+		it was bumped, since values repeat after a rolled back transaction.
+		"""
+		return cls.get_state(name)[0]
+
+	@classmethod
+	def get_state(cls, name: str) -> tuple[str, datetime.datetime | None]:
+		"""The version and last modification time of the named counter."""
+		row = cls.objects.filter(pk=name).values_list("value", "modified").first()
+		if row is None: return "0", None
+		value, modified = row
+		return f"{value}-{int(modified.timestamp() * 1_000_000)}", modified
+
+	@classmethod
+	def bump(cls, name: str) -> None:
+		"""Increment the named counter, creating it if it doesn't exist."""
+		with transaction.atomic():
+			updated = cls.objects.filter(pk=name).update(
+				value=models.F("value") + 1,
+				modified=timezone.now(),
+			)
+			if not updated:
+				cls.objects.get_or_create(pk=name, defaults={"value": 1})
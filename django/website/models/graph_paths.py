@@ -0,0 +1,106 @@
+"""
+Per-process indexes of the names and parents of each ControlledGraphList
+model, used to resolve full name paths like "Parent: Child" to ids without
+querying every path segment. An index is rebuilt in one query whenever the
+graph generation of its model changes, see website.signals.
+"""
+
+import threading, uuid
+
+from .base import ControlledGraphList
+from .generation import Generation
+
+# prefix of the generation counters incremented by edits of each graph list
+GENERATION_GRAPH_LIST = "graph_list"
+
+def get_graph_generation(model: type[ControlledGraphList]) -> str:
+	return f"{GENERATION_GRAPH_LIST}:{model.__name__}"
+
+class GraphPathIndex:
+	"""
+	The objects of a graph list by name, in the model's ordering, so the
+	first match of each lookup is the object that the equivalent queryset's
+	first() returns.
+	"""
+
+	def __init__(self, model: type[ControlledGraphList], generation: str):
+		self.model = model
+		self.generation = generation
+		self.names: dict[uuid.UUID, str] = {}
+		self.by_name: dict[str, list[uuid.UUID]] = {}
+		self.roots: dict[str, uuid.UUID] = {}
+		self.children: dict[tuple[uuid.UUID, str], uuid.UUID] = {}
+		self.parents: dict[uuid.UUID, set[uuid.UUID]] = {}
+
+		rows = (
+			model.objects
+			.order_by(*(model._meta.ordering or []), "pk")
+			.values_list("pk", "name", "parent_nodes")
+		)
+		for pk, name, parent in rows:
+			if pk not in self.names:
+				self.names[pk] = name
+				self.by_name.setdefault(name, []).append(pk)
+				self.parents[pk] = set()
+			if parent is None: self.roots.setdefault(name, pk)
+			else: self.parents[pk].add(parent)
+
+		# the children of each parent by name, first in order
+		for name, pks in self.by_name.items():
+			for pk in pks:
+				for parent in self.parents[pk]:
+					self.children.setdefault((parent, name), pk)
+
+	def resolve(self, full_name: str) -> uuid.UUID | None:
+		"""
+		The id of the object at the "Root: Child: ..." path, same as
+		get_object_with_full_name. None if the path has only a root name that
+		doesn't match, raises an exception if any other segment doesn't match.
+		"""
+		split_name = full_name.split(": ")
+		node = self.roots.get(split_name[0])
+		for subname in split_name[1:]:
+			node = self.children.get((node, subname))
+			if node is None:
+				raise Exception(
+					f"Invalid full name '{full_name}', " +
+					f"resolution failed at '{subname}'"
+				)
+		return node
+
+	def find(self, name: str, parent_name: str | None = None) -> uuid.UUID | None:
+		"""
+		The first object with the name, and when a parent name is specified,
+		with any parent of that name.
+		"""
+		for pk in self.by_name.get(name, []):
+			if parent_name is None: return pk
+			for parent in self.parents[pk]:
+				if self.names.get(parent) == parent_name: return pk
+		return None
+
+	def __contains__(self, pk: uuid.UUID) -> bool:
+		return pk in self.names
+
+_indexes: dict[type[ControlledGraphList], GraphPathIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_path_index(model: type[ControlledGraphList]) -> GraphPathIndex:
+	"""The path index of a graph list model, rebuilt first if it changed."""
+	from .pending import get_pending_work
+	work = get_pending_work()
+	if work is not None and model in work.graph_models:
+		# edited in the current transaction, which the cached index can't see
+		return GraphPathIndex(model, "")
+
+	generation = Generation.get_version(get_graph_generation(model))
+	index = _indexes.get(model)
+	if index is not None and index.generation == generation: return index
+	with _indexes_lock:
+		index = _indexes.get(model)
+		if index is None or index.generation != generation:
+			index = _indexes[model] = GraphPathIndex(model, generation)
+		return index
+
+def invalidate_path_index(model: type[ControlledGraphList]) -> None:
+	Generation.bump(get_graph_generation(model))
@@ -0,0 +1,81 @@
+""" Long running work queued from the admin and run by a worker process. """
+
+import uuid
+from typing import Callable
+
+from django.db import models
+from django.utils import timezone
+
+from .base import LEN_LONGNAME, LEN_NAME
+
+class BackgroundJobStatus(models.IntegerChoices):
+	QUEUED = 0, "Queued"
+	RUNNING = 1, "Running"
+	SUCCEEDED = 2, "Succeeded"
+	FAILED = 3, "Failed"
+
+class BackgroundJob(models.Model):
+	"""
+	A job of one of the kinds in website.jobs.JOB_FUNCTIONS, run by the
+	'run_jobs' command. The latest progress is kept on the job for status
+	displays, and every report is also stored as a BackgroundJobProgress row.
+	"""
+	kind = models.CharField(max_length=LEN_NAME)
+	# jobs polled by anonymous users are looked up by this instead of their id
+	token = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+	params = models.JSONField(default=dict, blank=True)
+	status = models.IntegerField(
+		choices=BackgroundJobStatus.choices,
+		default=BackgroundJobStatus.QUEUED
+	)
+	progress_current = models.IntegerField(default=0)
+	progress_total = models.IntegerField(blank=True, null=True)
+	message = models.CharField(max_length=LEN_LONGNAME, blank=True, default='')
+	result = models.JSONField(blank=True, null=True)
+	error = models.TextField(blank=True, default='')
+	created = models.DateTimeField(auto_now_add=True)
+	started = models.DateTimeField(blank=True, null=True)
+	finished = models.DateTimeField(blank=True, null=True)
+
+	class Meta:
+		ordering = ['-created']
+		indexes = [
+			models.Index(fields=['status', 'created'], name='background_job_status_idx'),
+		]
+
+	def __str__(self): return f"{self.kind} ({self.get_status_display()})"
+
+	# autogenerated django integer choice string getter
+	get_status_display: Callable[[], str]
+
+	@property
+	def is_active(self) -> bool:
+		return self.status in (BackgroundJobStatus.QUEUED, BackgroundJobStatus.RUNNING)
+
+	def report(self, message: str, current: int | None = None, total: int | None = None) -> None:
+		"""Record the progress of the running job."""
+		if current is not None: self.progress_current = current
+		if total is not None: self.progress_total = total
+		self.message = message[:LEN_LONGNAME]
+		self.save(update_fields=["progress_current", "progress_total", "message"])
+		self.progress.create(
+			message=self.message,
+			current=self.progress_current,
+			total=self.progress_total,
+		)
+
+class BackgroundJobProgress(models.Model):
+	"""A progress report of a job."""
+	job = models.ForeignKey(
+		BackgroundJob,
+		on_delete=models.CASCADE,
+		related_name='progress'
+	)
+	created = models.DateTimeField(default=timezone.now)
+	message = models.CharField(max_length=LEN_LONGNAME, blank=True, default='')
+	current = models.IntegerField(default=0)
+	total = models.IntegerField(blank=True, null=True)
+
+	class Meta: ordering = ['created', 'id']
+
+	def __str__(self): return self.message
@@ -0,0 +1,47 @@
+""" Rendered JSON-LD documents stored alongside the software they describe. """
+
+from django.db import models
+
+from .software import Software
+
+class SoftwareJsonLdVersion(models.Model):
+	"""
+	Incremented whenever the JSON-LD of the software changes, stored documents
+	rendered at an older version are no longer served. Software without a row
+	are at version 0.
+	"""
+	software = models.OneToOneField(
+		Software,
+		primary_key=True,
+		on_delete=models.CASCADE,
+		related_name='jsonld_version',
+	)
+	value = models.BigIntegerField(default=0)
+
+	def __str__(self): return f"JSON-LD version {self.value} of {self.software_id}"
+
+class SoftwareJsonLd(models.Model):
+	"""
+	The rendered JSON-LD of a software, for each base url the documents are
+	served from since their urls are absolute. Rows are written by
+	website.models.serializers.jsonld when a document is first requested.
+	"""
+	software = models.ForeignKey(
+		Software,
+		on_delete=models.CASCADE,
+		related_name='jsonld_documents',
+	)
+	base_url = models.CharField(max_length=512, blank=True, default='')
+	version = models.BigIntegerField(default=0)
+	content = models.BinaryField()
+	updated = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(
+				fields=['software', 'base_url'],
+				name='software_jsonld_base_url_unique',
+			),
+		]
+
+	def __str__(self): return f"JSON-LD of {self.software_id} at '{self.base_url}'"
@@ -0,0 +1,19 @@
+""" Responses of the repository hosting APIs, kept for conditional requests. """
+
+from django.db import models
+from django.utils import timezone
+
+from .base import LEN_LONGNAME
+
+class RepoApiResponse(models.Model):
+	"""
+	The last successful response from a GitHub or GitLab API url. Requests for
+	the url send its ETag, and when the API answers that nothing changed the 
+	stored content is used, which doesn't count against the API rate limit.
+	"""
+	url = models.CharField(max_length=LEN_LONGNAME, unique=True)
+	etag = models.CharField(max_length=LEN_LONGNAME, blank=True, default='')
+	content = models.JSONField(blank=True, null=True)
+	fetched = models.DateTimeField(default=timezone.now)
+
+	def __str__(self): return self.url
@@ -0,0 +1,55 @@
+""" Outgoing emails, queued by request handlers and sent by a worker. """
+
+from django.db import models
+from django.utils import timezone
+
+from .base import LEN_LONGNAME
+
+class OutboundEmailStatus(models.IntegerChoices):
+	PENDING = 0, "Pending"
+	SENT = 1, "Sent"
+	FAILED = 2, "Failed"
+
+class OutboundEmail(models.Model):
+	"""
+	An email waiting to be delivered. Request handlers only insert rows, the
+	'send_queued_emails' command delivers them in batches over one SMTP
+	connection and reschedules the ones that fail, see website.outbox.
+	"""
+	subject = models.CharField(max_length=LEN_LONGNAME)
+	body = models.TextField()
+	from_email = models.CharField(max_length=LEN_LONGNAME, blank=True, null=True)
+	recipients = models.JSONField(default=list)
+	status = models.IntegerField(
+		choices=OutboundEmailStatus.choices,
+		default=OutboundEmailStatus.PENDING
+	)
+	attempts = models.IntegerField(default=0)
+	next_attempt = models.DateTimeField(default=timezone.now)
+	last_error = models.TextField(blank=True, default='')
+	created = models.DateTimeField(auto_now_add=True)
+	sent = models.DateTimeField(blank=True, null=True)
+
+	class Meta:
+		ordering = ['next_attempt', 'id']
+		indexes = [
+			models.Index(fields=['status', 'next_attempt'], name='outbound_email_due_idx'),
+		]
+
+	def __str__(self): return f"{self.subject} to {', '.join(self.recipients)}"
+
+	@classmethod
+	def enqueue(
+		cls,
+		subject: str,
+		message: str,
+		from_email: str | None,
+		recipient_list: list[str],
+	) -> 'OutboundEmail':
+		"""Queue an email to be sent, same arguments as send_mail."""
+		return cls.objects.create(
+			subject=subject,
+			body=message,
+			from_email=from_email,
+			recipients=list(recipient_list),
+		)
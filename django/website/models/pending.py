@@ -0,0 +1,76 @@
+"""
+Cache invalidation and denormalization work requested by the signal receivers
+in website.signals. The work is collected for the whole transaction and done
+once when it commits, so a writer saving many objects bumps each generation
+counter and rebuilds each search document once, and concurrent writers don't
+queue on the generation rows while their transactions are open.
+"""
+
+import uuid
+from typing import Iterable
+
+from django.db import transaction
+
+from .base import ControlledGraphList
+from .generation import Generation
+
+class PendingWork:
+	"""The work requested during one transaction."""
+
+	def __init__(self):
+		self.generations: set[str] = set()
+		self.software_ids: set[uuid.UUID] = set()
+		self.document_ids: set[uuid.UUID] = set()
+		self.graph_models: set[type[ControlledGraphList]] = set()
+		self.done = False
+
+	def run(self) -> None:
+		from ..search.documents import refresh_search_documents
+		from .graph_paths import invalidate_path_index
+		from .serializers.jsonld import invalidate_jsonld
+		self.done = True
+
+		# full names first, the search documents include them
+		for model in self.graph_models:
+			model.update_full_names()
+			invalidate_path_index(model)
+		refresh_search_documents(self.software_ids)
+		invalidate_jsonld(self.document_ids)
+		for name in sorted(self.generations): Generation.bump(name)
+
+def get_pending_work() -> PendingWork | None:
+	"""The work deferred to the end of the current transaction, if any."""
+	connection = transaction.get_connection()
+	if not connection.in_atomic_block: return None
+	work: PendingWork | None = getattr(connection, "hssi_pending_work", None)
+
+	# rolling back a transaction discards the callback, and with it the work
+	if work is None or work.done or not any(
+		func == work.run for _, func, _ in connection.run_on_commit
+	): return None
+	return work
+
+def defer_work(
+	generations: Iterable[str] = (),
+	software_ids: Iterable[uuid.UUID] = (),
+	graph_models: Iterable[type[ControlledGraphList]] = (),
+	document_ids: Iterable[uuid.UUID] = (),
+) -> None:
+	"""
+	Bump the generations, refresh the search documents of the software_ids,
+	update the full names of the graph models and invalidate the JSON-LD of
+	the document_ids once the current transaction commits, or right away
+	outside of a transaction.
+	"""
+	connection = transaction.get_connection()
+	work = get_pending_work()
+	if work is None:
+		work = PendingWork()
+		if connection.in_atomic_block:
+			connection.hssi_pending_work = work
+			transaction.on_commit(work.run)
+	work.generations.update(generations)
+	work.software_ids.update(software_ids)
+	work.graph_models.update(graph_models)
+	work.document_ids.update(document_ids)
+	if not connection.in_atomic_block: work.run()
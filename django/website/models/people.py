@@ -96,6 +96,9 @@ class Curator(HssiModel):
 	@classmethod
 	def get_top_field(cls) -> models.Field: return cls._meta.get_field("email")
 
+	@classmethod
+	def get_choice_queryset(cls, queryset): return queryset.select_related("person")
+
 	class Meta: ordering = ['person']
 	def __str__(self): return str(self.person)
 
@@ -142,5 +145,8 @@ class Submitter(HssiModel):
 	@classmethod
 	def get_top_field(cls) -> models.Field: return cls._meta.get_field("email")
 	
+	@classmethod
+	def get_choice_queryset(cls, queryset): return queryset.select_related("person")
+
 	class Meta: ordering = ['person']
 	def __str__(self): return str(self.person)
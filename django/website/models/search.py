@@ -0,0 +1,42 @@
+""" Denormalized search data kept alongside the primary software models. """
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+from .base import LEN_NAME
+from .software import Software
+
+class SoftwareSearchDocument(models.Model):
+	"""
+	One row per visible software holding the lowercased text of every field
+	searched by each relevance tier, so that text search scans a single 
+	narrow table instead of joining every related model. Rows are kept up to
+	date by website.signals and rebuilt with 'rebuild_search_documents'.
+	"""
+	software = models.OneToOneField(
+		Software,
+		primary_key=True,
+		on_delete=models.CASCADE,
+		related_name='search_document'
+	)
+	software_name = models.CharField(max_length=LEN_NAME)
+	tier_1 = models.TextField(blank=True, default='')
+	tier_2 = models.TextField(blank=True, default='')
+	tier_3 = models.TextField(blank=True, default='')
+	tier_4_1 = models.TextField(blank=True, default='')
+	tier_4_2 = models.TextField(blank=True, default='')
+	tier_4_3 = models.TextField(blank=True, default='')
+	tier_4_4 = models.TextField(blank=True, default='')
+	tier_4_5 = models.TextField(blank=True, default='')
+	tier_4_6 = models.TextField(blank=True, default='')
+	tier_4_7 = models.TextField(blank=True, default='')
+	tier_4_8 = models.TextField(blank=True, default='')
+	search_vector = SearchVectorField(null=True, editable=False)
+	updated = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		ordering = ['software_name']
+		indexes = [GinIndex(fields=['search_vector'], name='search_document_vector_idx')]
+
+	def __str__(self): return f"search document for {self.software_name}"
@@ -0,0 +1,143 @@
+"""
+Rendered JSON-LD documents of Software, stored in the SoftwareJsonLd table so
+the landing page and the API endpoints serve stored bytes instead of
+serializing the software and all of its relations on every request. Each
+software has its own version, which website.signals increments when the
+software, its relations or the rows they reference change, so an edit only
+invalidates the documents that include it.
+"""
+
+import uuid
+from typing import Iterable, Iterator
+
+from django.db import connection
+from django.db.models import F, QuerySet
+from django.db.models.functions import Coalesce
+from django.http import HttpRequest
+
+from hssi.camel_case_renderer import CamelCaseJSONRenderer
+from ..jsonld import SoftwareJsonLd, SoftwareJsonLdVersion
+from ..software import Software
+from .software import SoftwareSerializer
+from .util import SerialView
+
+JSONLD_CHUNK_SIZE = 100
+
+def get_base_url(request: HttpRequest | None) -> str:
+	"""Absolute urls in the documents depend on the host they're served from."""
+	return request.build_absolute_uri("/") if request else ""
+
+def render_jsonld(data: dict) -> bytes:
+	"""The same bytes DRF renders for the data in an API response."""
+	return CamelCaseJSONRenderer().render(data)
+
+def get_stored_documents(ids: Iterable[uuid.UUID], base_url: str) -> dict[uuid.UUID, bytes]:
+	"""The stored documents of the software that are still current."""
+	return {
+		software_id: bytes(content) for software_id, content in
+		SoftwareJsonLd.objects
+			# software that were never invalidated have no version row
+			.annotate(current=Coalesce("software__jsonld_version__value", 0))
+			.filter(software_id__in=ids, base_url=base_url, version=F("current"))
+			.values_list("software_id", "content")
+	}
+
+def get_versions(ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, int]:
+	"""The current JSON-LD versions of the software, read before rendering."""
+	return dict(
+		SoftwareJsonLdVersion.objects.filter(software_id__in=ids)
+		.values_list("software_id", "value")
+	)
+
+def store_documents(
+	documents: dict[uuid.UUID, bytes],
+	versions: dict[uuid.UUID, int],
+	base_url: str,
+) -> None:
+	SoftwareJsonLd.objects.bulk_create(
+		[
+			SoftwareJsonLd(
+				software_id=software_id,
+				base_url=base_url,
+				version=versions.get(software_id, 0),
+				content=content,
+			)
+			for software_id, content in documents.items()
+		],
+		update_conflicts=True,
+		unique_fields=["software", "base_url"],
+		update_fields=["version", "content", "updated"],
+	)
+
+def invalidate_jsonld(software_ids: Iterable[uuid.UUID]) -> None:
+	"""
+	Increment the versions of the software so their stored documents are
+	rendered again. Documents rendered meanwhile from the old data are stored
+	at the old version, so they're never served.
+	"""
+	software_ids = list(set(software_ids))
+	if not software_ids: return
+	versions = SoftwareJsonLdVersion._meta.db_table
+	with connection.cursor() as cursor:
+		cursor.execute(
+			f"INSERT INTO {versions} (software_id, value) "
+			f"SELECT id, 1 FROM {Software._meta.db_table} WHERE id = ANY(%s) "
+			f"ON CONFLICT (software_id) DO UPDATE SET value = {versions}.value + 1",
+			[software_ids],
+		)
+	SoftwareJsonLd.objects.filter(software_id__in=software_ids).delete()
+
+def get_software_jsonld(software: Software, request: HttpRequest | None = None) -> bytes:
+	"""The rendered JSON-LD of a single software."""
+	base_url = get_base_url(request)
+	document = get_stored_documents([software.pk], base_url).get(software.pk)
+	if document is None:
+		versions = get_versions([software.pk])
+		serializer = SoftwareSerializer(software, context={"request": request})
+		serializer._view = SerialView.JSONLD
+		document = render_jsonld(serializer.data)
+		store_documents({software.pk: document}, versions, base_url)
+	return document
+
+def iter_software_jsonld(
+	queryset: QuerySet[Software],
+	request: HttpRequest | None = None,
+	chunk_size: int = JSONLD_CHUNK_SIZE,
+) -> Iterator[tuple[uuid.UUID, bytes]]:
+	"""
+	Yield the id and rendered JSON-LD of every software in the queryset, in
+	its order. Stored documents are read in chunks of chunk_size, and the
+	missing ones of each chunk are serialized together with prefetching.
+	"""
+	base_url = get_base_url(request)
+	ids = queryset.values_list("pk", flat=True)
+	chunk: list[uuid.UUID] = []
+	for software_id in ids.iterator(chunk_size=chunk_size):
+		chunk.append(software_id)
+		if len(chunk) >= chunk_size:
+			yield from _get_chunk(chunk, base_url, request)
+			chunk = []
+	yield from _get_chunk(chunk, base_url, request)
+
+def _get_chunk(
+	ids: list[uuid.UUID],
+	base_url: str,
+	request: HttpRequest | None,
+) -> list[tuple[uuid.UUID, bytes]]:
+	if not ids: return []
+	stored = get_stored_documents(ids, base_url)
+	missing = [software_id for software_id in ids if software_id not in stored]
+	if missing:
+		versions = get_versions(missing)
+		rendered: dict[uuid.UUID, bytes] = {}
+		for software, data in SoftwareSerializer.iter_jsonld(
+			Software.objects.filter(pk__in=missing),
+			context={"request": request},
+		):
+			rendered[software.pk] = render_jsonld(data)
+		store_documents(rendered, versions, base_url)
+		stored.update(rendered)
+	return [
+		(software_id, stored[software_id])
+		for software_id in ids if software_id in stored
+	]
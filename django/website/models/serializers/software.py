@@ -1,15 +1,15 @@
 """Serializers for Software-related models."""
 
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
 from django.http import HttpRequest
-from django.db.models import Model, Manager
+from django.db.models import Model, Manager, Prefetch, QuerySet
 
-from .util import HssiSerializer, serialize_obj_userfriendly
+from .util import HssiSerializer, SerialView, serialize_obj_userfriendly
 from ..organizations import Organization
 from ..people import Person
 from ..related import RelatedItem, RelatedItemType
-from ..software import Software, SoftwareVersion
+from ..software import Software, SoftwareVersion, SubmissionInfo, VerifiedSoftware
 from ..vocab import InstrObsType, InstrumentObservatory
 from ..base import HssiModel
 
@@ -20,6 +20,37 @@ URL_TERMSET_FUNCTIONCATEGORY = "https://github.com/Heliophysics-Software-Search-
 URL_TERMSET_REGIONS = "https://api.heliophysics.net/api/regions/"
 NAME_UNKOWN = "UNKNOWN"
 
+# relations read by to_representation_jsonld, loaded up front for bulk output
+JSONLD_SELECT_RELATED = [
+	"publisher",
+	"reference_publication",
+	"development_status",
+	"license",
+]
+JSONLD_PREFETCH_RELATED = [
+	"authors__affiliation",
+	"version",
+	"software_functionality",
+	"data_sources",
+	"input_formats",
+	"output_formats",
+	"related_phenomena",
+	"keywords",
+	"related_instruments",
+	"related_observatories",
+	"related_publications",
+	"related_datasets",
+	"related_software",
+	"interoperable_software",
+	"operating_system",
+	"programming_language",
+	"cpu_architecture",
+	"related_region",
+	"award__funder",
+	"funder",
+]
+DATED_SUBMISSION_INFO_ATTR = "dated_submission_info"
+
 def serialize_with_relations(obj: Model) -> dict[str, Any]:
 	"""Serialize a model instance with FK/M2M expanded via serializers or str()."""
 
@@ -43,6 +74,56 @@ def serialize_with_relations(obj: Model) -> dict[str, Any]:
 class SoftwareSerializer(HssiSerializer):
 	"""Serializer for Software model data."""
 
+	@staticmethod
+	def prefetch_jsonld(queryset: QuerySet[Software]) -> QuerySet[Software]:
+		"""
+		Load every relation the JSON-LD representation reads. Functionality
+		full names are stored, so only the direct parents are needed.
+		"""
+		return queryset.select_related(*JSONLD_SELECT_RELATED).prefetch_related(
+			*JSONLD_PREFETCH_RELATED,
+			"software_functionality__parent_nodes",
+			Prefetch(
+				"submission_info",
+				queryset=SubmissionInfo.objects
+					.filter(submission_date__isnull=False)
+					.order_by("submission_date"),
+				to_attr=DATED_SUBMISSION_INFO_ATTR,
+			),
+		)
+
+	@classmethod
+	def iter_jsonld(
+		cls, 
+		queryset: QuerySet[Software], 
+		context: dict[str, Any] = None,
+		chunk_size: int | None = None,
+	) -> Iterator[tuple[Software, dict[str, Any]]]:
+		"""
+		Yield each software in the queryset with its JSON-LD, identical to 
+		serializing each one separately but in a constant number of queries,
+		or a constant number per chunk when chunk_size is specified.
+		"""
+		context = {
+			**(context or {}),
+			"visible_slugs": VerifiedSoftware.get_visible_slugs(),
+		}
+		queryset = cls.prefetch_jsonld(queryset)
+		softwares = queryset.iterator(chunk_size=chunk_size) if chunk_size else queryset
+		for software in softwares:
+			serializer = cls(software, context=context)
+			serializer._view = SerialView.JSONLD
+			yield software, serializer.data
+
+	@classmethod
+	def serialize_jsonld_many(
+		cls, 
+		queryset: QuerySet[Software], 
+		context: dict[str, Any] = None
+	) -> list[dict[str, Any]]:
+		"""JSON-LD of every software in the queryset, see iter_jsonld()."""
+		return [data for _, data in cls.iter_jsonld(queryset, context)]
+
 	def to_representation_user(self, instance) -> dict[str, Any]:
 		"""
 		User friendly view for Software model - serialize all non-null 
@@ -268,6 +349,12 @@ class SoftwareSerializer(HssiSerializer):
 		}
 		return data
 
+	def _absolute_url(self, instance: Software) -> str:
+		slugs: dict | None = self.context.get("visible_slugs")
+		if slugs is None:
+			return instance.get_absolute_url()
+		return instance.get_url_for_slug(slugs.get(instance.pk))
+
 	def _subject_of(self, instance: Software) -> dict[str, Any] | None:
 		version: SoftwareVersion | None = instance.version.first()
 		if not version:
@@ -275,9 +362,9 @@ class SoftwareSerializer(HssiSerializer):
 		content_url = None
 		request: HttpRequest | None = self.context.get("request")
 		if request:
-			content_url = request.build_absolute_uri(instance.get_absolute_url())
+			content_url = request.build_absolute_uri(self._absolute_url(instance))
 		else:
-			content_url = instance.get_absolute_url()
+			content_url = self._absolute_url(instance)
 		data: dict[str, Any] = {
 			"@type": "DataDownload",
 			"contentUrl": content_url,
@@ -293,11 +380,15 @@ class SoftwareSerializer(HssiSerializer):
 		# always truthy and `.latest()` raised DoesNotExist for a published
 		# software with no dated SubmissionInfo, which 500'd the landing page
 		# and both JSON-LD API endpoints for that record.
-		latest_submission = (
-			instance.submission_info.filter(submission_date__isnull=False)
-				.order_by("submission_date")
-				.last()
-		)
+		dated_submissions = getattr(instance, DATED_SUBMISSION_INFO_ATTR, None)
+		if dated_submissions is not None:
+			latest_submission = dated_submissions[-1] if dated_submissions else None
+		else:
+			latest_submission = (
+				instance.submission_info.filter(submission_date__isnull=False)
+					.order_by("submission_date")
+					.last()
+			)
 		if latest_submission:
 			data["dateModified"] = latest_submission.submission_date
 		return { key: value for key, value in data.items() if value }
@@ -1,10 +1,10 @@
 """Submission API and related logic."""
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.validators import URLValidator
-from django.db import transaction
+from django.db import models, transaction
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from rest_framework import serializers
@@ -22,6 +22,8 @@ from ..vocab import (
 )
 from .util import HssiSerializer
 
+if TYPE_CHECKING: from .submission_batch import SubmissionResolver
+
 
 # Every snake-case key accepted by the user-view payload. Keys outside this
 # set are rejected with 400 so client typos fail loudly instead of being
@@ -94,9 +96,28 @@ _USER_LIST_FIELDS: tuple[str, ...] = (
 )
 
 
+class UserSubmission:
+	"""The objects a user-view payload maps to, before the relations are written."""
+	software: Software
+	relations: dict[str, list[models.Model]]
+	affiliations: list[tuple[Person, Organization]]
+	version: SoftwareVersion | None
+
+	def __init__(self, software: Software):
+		self.software = software
+		self.relations = {}
+		self.affiliations = []
+		self.version = None
+
+
 class SubmissionSerializer(HssiSerializer):
 	"""Serializer and parser for submission data."""
 
+	@property
+	def resolver(self) -> 'SubmissionResolver | None':
+		"""Answers the lookups below from memory when saving a batch of submissions."""
+		return self.context.get("resolver")
+
 	def _strip_string(self, value: Any) -> str | None:
 		if value is None:
 			return None
@@ -138,6 +159,14 @@ class SubmissionSerializer(HssiSerializer):
 		value: str, 
 	) -> ControlledGraphList:
 		normalized = self._normalize_term(value, model.__name__)
+		if self.resolver is not None:
+			obj = self.resolver.get_graph_item(
+				model, [part.strip() for part in normalized.split(":")]
+			)
+			if not obj:
+				raise serializers.ValidationError({model.__name__: f"Unknown value '{value}'."})
+			return obj
+
 		if ":" not in normalized:
 			obj = model.objects.filter(name__iexact=normalized).first()
 			if not obj:
@@ -161,13 +190,23 @@ class SubmissionSerializer(HssiSerializer):
 		value: str, 
 	) -> ControlledList:
 		normalized = self._normalize_term(value, model.__name__)
-		obj = model.objects.filter(name__iexact=normalized).first()
+		if self.resolver is not None: obj = self.resolver.get_named(model, normalized)
+		else: obj = model.objects.filter(name__iexact=normalized).first()
 		if not obj:
 			raise serializers.ValidationError({model.__name__: f"Unknown value '{value}'."})
 		return obj
 
+	def _get_license(self, value: str) -> License:
+		normalized = self._normalize_term(value, "license")
+		if self.resolver is not None: obj = self.resolver.get_named(License, normalized)
+		else: obj = License.objects.filter(name__iexact=normalized).first()
+		if not obj:
+			raise serializers.ValidationError({"license": f"Unknown license '{value}'."})
+		return obj
+
 	def _get_or_create_keyword(self, value: str) -> Keyword:
 		normalized = self._normalize_term(value, Keyword.__name__)
+		if self.resolver is not None: return self.resolver.get_keyword(normalized)
 		obj = Keyword.objects.filter(name__iexact=normalized).first()
 		if obj:
 			return obj
@@ -177,8 +216,11 @@ class SubmissionSerializer(HssiSerializer):
 		given_name = self._normalize_term(data.get("given_name"), "givenName")
 		family_name = self._normalize_term(data.get("family_name"), "familyName")
 		identifier = data.get("identifier")
+		if identifier: identifier = self._validate_url(self._strip_string(identifier))
+		if self.resolver is not None:
+			return self.resolver.get_person(given_name, family_name, identifier)
+
 		if identifier:
-			identifier = self._validate_url(self._strip_string(identifier))
 			person = Person.objects.filter(identifier=identifier).first()
 			if person:
 				if not person.given_name:
@@ -207,8 +249,10 @@ class SubmissionSerializer(HssiSerializer):
 	def _get_or_create_org(self, data: dict[str, Any]) -> Organization:
 		name = self._normalize_term(data.get("name"), "name")
 		identifier = data.get("identifier")
+		if identifier: identifier = self._validate_url(self._strip_string(identifier))
+		if self.resolver is not None: return self.resolver.get_organization(name, identifier)
+
 		if identifier:
-			identifier = self._validate_url(self._strip_string(identifier))
 			org = Organization.objects.filter(identifier=identifier).first()
 			if org:
 				if not org.name:
@@ -228,6 +272,7 @@ class SubmissionSerializer(HssiSerializer):
 		if not isinstance(person_data, dict):
 			raise serializers.ValidationError({"person": "Expected an object."})
 		person = self._get_or_create_person(person_data)
+		if self.resolver is not None: return self.resolver.get_submitter(email, person)
 		submitter = Submitter.objects.filter(email__iexact=email).first()
 		if submitter:
 			return submitter
@@ -240,8 +285,11 @@ class SubmissionSerializer(HssiSerializer):
 	) -> InstrumentObservatory:
 		name = self._normalize_term(data.get("name"), "name")
 		identifier = data.get("identifier")
+		if identifier: identifier = self._validate_url(self._strip_string(identifier))
+		if self.resolver is not None:
+			return self.resolver.get_observatory(name, identifier, instr_type)
+
 		if identifier:
-			identifier = self._validate_url(self._strip_string(identifier))
 			entry = InstrumentObservatory.objects.filter(identifier=identifier).first()
 			if entry:
 				return entry
@@ -258,8 +306,10 @@ class SubmissionSerializer(HssiSerializer):
 	def _get_or_create_award(self, data: dict[str, Any]) -> Award:
 		name = self._normalize_term(data.get("name"), "name")
 		identifier = data.get("identifier")
+		if identifier: identifier = self._normalize_term(identifier, "identifier")
+		if self.resolver is not None: return self.resolver.get_award(name, identifier)
+
 		if identifier:
-			identifier = self._normalize_term(identifier, "identifier")
 			award = Award.objects.filter(identifier=identifier).first()
 			if award:
 				return award
@@ -271,6 +321,7 @@ class SubmissionSerializer(HssiSerializer):
 
 	def _get_or_create_related(self, url: str, item_type: RelatedItemType) -> RelatedItem:
 		identifier = self._validate_url(self._normalize_term(url, "identifier"))
+		if self.resolver is not None: return self.resolver.get_related(identifier, item_type)
 		item = RelatedItem.objects.filter(identifier=identifier).first()
 		if item:
 			return item
@@ -364,6 +415,30 @@ class SubmissionSerializer(HssiSerializer):
 		ensuring required fields are present — that check lives in
 		``to_internal_value_user`` and only runs for non-partial input.
 		"""
+		submission = self._build_user_submission(software, data)
+
+		# Persist scalars and FKs before touching M2M relations — a new
+		# Software instance needs a PK before ``.set()`` can run against it.
+		software.save()
+
+		for author, organization in submission.affiliations:
+			author.affiliation.add(organization)
+		for field, items in submission.relations.items():
+			getattr(software, field).set(items)
+
+		if "version" in data:
+			if submission.version is None:
+				software.version.clear()
+			else:
+				submission.version.save()
+				software.version.set([submission.version])
+
+	def _build_user_submission(self, software: Software, data: dict[str, Any]) -> UserSubmission:
+		"""
+		Set the scalar and FK fields of the software and resolve the objects of
+		its M2M fields, without writing the software or its relations.
+		"""
+		submission = UserSubmission(software)
 		if "software_name" in data:
 			software.software_name = self._normalize_term(
 				data["software_name"], "softwareName"
@@ -405,13 +480,7 @@ class SubmissionSerializer(HssiSerializer):
 			if license_name in (None, ""):
 				software.license = None
 			else:
-				normalized = self._normalize_term(license_name, "license")
-				license_obj = License.objects.filter(name__iexact=normalized).first()
-				if not license_obj:
-					raise serializers.ValidationError(
-						{"license": f"Unknown license '{license_name}'."}
-					)
-				software.license = license_obj
+				software.license = self._get_license(license_name)
 
 		if "development_status" in data:
 			status_value = data["development_status"]
@@ -431,10 +500,6 @@ class SubmissionSerializer(HssiSerializer):
 					reference, RelatedItemType.PUBLICATION
 				)
 
-		# Persist scalars and FKs before touching M2M relations — a new
-		# Software instance needs a PK before ``.set()`` can run against it.
-		software.save()
-
 		if "authors" in data:
 			authors_data = data["authors"] or []
 			authors = [self._get_or_create_person(item) for item in authors_data]
@@ -446,141 +511,141 @@ class SubmissionSerializer(HssiSerializer):
 							raise serializers.ValidationError(
 								{"affiliation": "Expected an object."}
 							)
-						author.affiliation.add(self._get_or_create_org(org_data))
-			software.authors.set(authors)
+						submission.affiliations.append(
+							(author, self._get_or_create_org(org_data))
+						)
+			submission.relations["authors"] = authors
 
 		if "programming_language" in data:
 			items = [
 				self._get_controlled_item(ProgrammingLanguage, item)
 				for item in (data["programming_language"] or [])
 			]
-			software.programming_language.set(items)
+			submission.relations["programming_language"] = items
 
 		if "input_formats" in data:
 			items = [
 				self._get_controlled_item(FileFormat, item)
 				for item in (data["input_formats"] or [])
 			]
-			software.input_formats.set(items)
+			submission.relations["input_formats"] = items
 
 		if "output_formats" in data:
 			items = [
 				self._get_controlled_item(FileFormat, item)
 				for item in (data["output_formats"] or [])
 			]
-			software.output_formats.set(items)
+			submission.relations["output_formats"] = items
 
 		if "operating_system" in data:
 			items = [
 				self._get_controlled_item(OperatingSystem, item)
 				for item in (data["operating_system"] or [])
 			]
-			software.operating_system.set(items)
+			submission.relations["operating_system"] = items
 
 		if "cpu_architecture" in data:
 			items = [
 				self._get_controlled_item(CpuArchitecture, item)
 				for item in (data["cpu_architecture"] or [])
 			]
-			software.cpu_architecture.set(items)
+			submission.relations["cpu_architecture"] = items
 
 		if "software_functionality" in data:
 			items = [
 				self._get_graph_list_item(FunctionCategory, item)
 				for item in (data["software_functionality"] or [])
 			]
-			software.software_functionality.set(items)
+			submission.relations["software_functionality"] = items
 
 		if "related_region" in data:
 			items = [
 				self._get_graph_list_item(Region, item)
 				for item in (data["related_region"] or [])
 			]
-			software.related_region.set(items)
+			submission.relations["related_region"] = items
 
 		if "related_phenomena" in data:
 			items = [
 				self._get_graph_list_item(Phenomena, item)
 				for item in (data["related_phenomena"] or [])
 			]
-			software.related_phenomena.set(items)
+			submission.relations["related_phenomena"] = items
 
 		if "data_sources" in data:
 			items = [
 				self._get_controlled_item(DataInput, item)
 				for item in (data["data_sources"] or [])
 			]
-			software.data_sources.set(items)
+			submission.relations["data_sources"] = items
 
 		if "keywords" in data:
 			items = [
 				self._get_or_create_keyword(item)
 				for item in (data["keywords"] or [])
 			]
-			software.keywords.set(items)
+			submission.relations["keywords"] = items
 
 		if "related_instruments" in data:
 			items = [
 				self._get_or_create_observatory(item, InstrObsType.INSTRUMENT)
 				for item in (data["related_instruments"] or [])
 			]
-			software.related_instruments.set(items)
+			submission.relations["related_instruments"] = items
 
 		if "related_observatories" in data:
 			items = [
 				self._get_or_create_observatory(item, InstrObsType.OBSERVATORY)
 				for item in (data["related_observatories"] or [])
 			]
-			software.related_observatories.set(items)
+			submission.relations["related_observatories"] = items
 
 		if "related_publications" in data:
 			items = [
 				self._get_or_create_related(url, RelatedItemType.PUBLICATION)
 				for url in (data["related_publications"] or [])
 			]
-			software.related_publications.set(items)
+			submission.relations["related_publications"] = items
 
 		if "related_datasets" in data:
 			items = [
 				self._get_or_create_related(url, RelatedItemType.DATASET)
 				for url in (data["related_datasets"] or [])
 			]
-			software.related_datasets.set(items)
+			submission.relations["related_datasets"] = items
 
 		if "related_software" in data:
 			items = [
 				self._get_or_create_related(url, RelatedItemType.SOFTWARE)
 				for url in (data["related_software"] or [])
 			]
-			software.related_software.set(items)
+			submission.relations["related_software"] = items
 
 		if "interoperable_software" in data:
 			items = [
 				self._get_or_create_related(url, RelatedItemType.SOFTWARE)
 				for url in (data["interoperable_software"] or [])
 			]
-			software.interoperable_software.set(items)
+			submission.relations["interoperable_software"] = items
 
 		if "funder" in data:
 			items = [
 				self._get_or_create_org(item)
 				for item in (data["funder"] or [])
 			]
-			software.funder.set(items)
+			submission.relations["funder"] = items
 
 		if "award" in data:
 			items = [
 				self._get_or_create_award(item)
 				for item in (data["award"] or [])
 			]
-			software.award.set(items)
+			submission.relations["award"] = items
 
 		if "version" in data:
 			version = data["version"]
-			if version is None:
-				software.version.clear()
-			else:
-				version_obj = SoftwareVersion.objects.create(
+			if version is not None:
+				submission.version = SoftwareVersion(
 					number=self._normalize_term(version.get("number"), "version_number"),
 					release_date=self._validate_date(version.get("release_date")),
 					description=self._strip_string(version.get("description")),
@@ -588,7 +653,14 @@ class SubmissionSerializer(HssiSerializer):
 						self._strip_string(version.get("version_pid"))
 					),
 				)
-				software.version.set([version_obj])
+
+		return submission
+
+	def _get_submitters(self, data: dict[str, Any]) -> list[Submitter]:
+		return [
+			self._get_or_create_submitter(item)
+			for item in data.get("submitter", [])
+		]
 
 	@transaction.atomic
 	def create_user(self, validated_data: dict[str, Any]):
@@ -597,10 +669,7 @@ class SubmissionSerializer(HssiSerializer):
 
 		# Submitter is write-once and only attached during initial
 		# submission. ``update_user`` rejects any attempt to change it.
-		submitters = [
-			self._get_or_create_submitter(item)
-			for item in validated_data.get("submitter", [])
-		]
+		submitters = self._get_submitters(validated_data)
 		submission_info = SubmissionInfo.objects.create(
 			software=software,
 			submission_date=timezone.now(),
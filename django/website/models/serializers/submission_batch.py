@@ -0,0 +1,381 @@
+"""
+Batched saving of SubmissionAPI payloads. Every vocabulary term, keyword,
+person, organization, identifier and related item referenced anywhere in the
+payload is loaded with one query per model, the missing ones are inserted in
+bulk, and the software are written with their submission info and every M2M
+through row in bulk inserts.
+"""
+
+import uuid
+from collections import defaultdict
+from typing import Any, Iterable
+
+from django.db import models, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from ..base import ControlledGraphList
+from ..generation import GENERATION_CATALOG
+from ..organizations import Award, Organization
+from ..pending import defer_work
+from ..people import Person, Submitter
+from ..related import RelatedItem, RelatedItemType
+from ..software import Software, SoftwareVersion, SubmissionInfo
+from ..vocab import InstrObsType, InstrumentObservatory, Keyword
+from .submission import SubmissionSerializer, UserSubmission
+from .util import SerialView
+
+# the order pending objects are inserted in, so foreign keys are satisfied
+CREATE_ORDER: tuple[type[models.Model], ...] = (
+	Organization, Person, Keyword, InstrumentObservatory, Award, RelatedItem, Submitter,
+)
+
+def ordered(queryset: models.QuerySet) -> models.QuerySet:
+	"""The order .first() would pick from, so lookups match the single path."""
+	return queryset if queryset.ordered else queryset.order_by("pk")
+
+class SubmissionResolver:
+	"""
+	Answers the lookups of SubmissionSerializer for a batch of submissions.
+	The payload is walked twice, the first walk only records what is looked
+	up and answers with placeholders. resolve() then loads the existing
+	objects, and the second walk is answered from memory, with unsaved
+	objects for the ones that don't exist yet, which flush() inserts.
+	"""
+
+	def __init__(self):
+		self.collecting = True
+		self.names: dict[type[models.Model], set[str]] = defaultdict(set)
+		self.identifiers: dict[type[models.Model], set[str]] = defaultdict(set)
+		self.person_names: set[tuple[str, str]] = set()
+		self.observatory_names: set[str] = set()
+		self.emails: set[str] = set()
+
+		self.by_name: dict[type[models.Model], dict[str, Any]] = defaultdict(dict)
+		self.by_identifier: dict[type[models.Model], dict[str, Any]] = defaultdict(dict)
+		self.graph_items: dict[type[models.Model], dict[str, list[ControlledGraphList]]] = {}
+		self.graph_parents: dict[uuid.UUID, set[uuid.UUID]] = defaultdict(set)
+		self.persons_by_name: dict[tuple[str, str], Person] = {}
+		self.observatories_by_name: dict[tuple[str, int], InstrumentObservatory] = {}
+		self.submitters: dict[str, Submitter] = {}
+
+		self.created: dict[type[models.Model], list[models.Model]] = defaultdict(list)
+		self.updated: dict[type[models.Model], dict[uuid.UUID, models.Model]] = defaultdict(dict)
+
+	def create(self, obj: models.Model) -> Any:
+		self.created[type(obj)].append(obj)
+		return obj
+
+	def update(self, obj: models.Model) -> None:
+		self.updated[type(obj)][obj.pk] = obj
+
+	## lookups, mirroring the SubmissionSerializer methods that call them
+
+	def get_named(self, model: type[models.Model], name: str) -> Any:
+		if self.collecting:
+			self.names[model].add(name.lower())
+			return model()
+		return self.by_name[model].get(name.lower())
+
+	def get_graph_item(self, model: type[ControlledGraphList], parts: list[str]) -> Any:
+		if self.collecting:
+			self.names[model].update(part.lower() for part in parts)
+			return model()
+		items = self.graph_items.get(model, {})
+		if len(parts) == 1: return next(iter(items.get(parts[0].lower(), [])), None)
+		node = next((
+			item for item in items.get(parts[0].lower(), [])
+			if not self.graph_parents[item.pk]
+		), None)
+		for part in parts[1:]:
+			if node is None: break
+			node = next((
+				item for item in items.get(part.lower(), [])
+				if node.pk in self.graph_parents[item.pk]
+			), None)
+		return node
+
+	def get_keyword(self, name: str) -> Keyword:
+		if self.collecting:
+			self.names[Keyword].add(name.lower())
+			return Keyword()
+		keywords = self.by_name[Keyword]
+		if name.lower() not in keywords:
+			keywords[name.lower()] = self.create(Keyword(name=name))
+		return keywords[name.lower()]
+
+	def get_person(self, given_name: str, family_name: str, identifier: str | None) -> Person:
+		if self.collecting:
+			if identifier: self.identifiers[Person].add(identifier)
+			else: self.person_names.add((given_name, family_name))
+			return Person()
+
+		if identifier:
+			person = self.by_identifier[Person].get(identifier)
+			if person is not None:
+				if not person.given_name or not person.family_name:
+					person.given_name = person.given_name or given_name
+					person.family_name = person.family_name or family_name
+					self.update(person)
+				return person
+			person = self.create(Person(
+				given_name=given_name,
+				family_name=family_name,
+				identifier=identifier,
+			))
+			self.by_identifier[Person][identifier] = person
+			self.persons_by_name.setdefault((given_name, family_name), person)
+			return person
+
+		key = (given_name, family_name)
+		if key not in self.persons_by_name:
+			self.persons_by_name[key] = self.create(Person(
+				given_name=given_name,
+				family_name=family_name,
+			))
+		return self.persons_by_name[key]
+
+	def get_organization(self, name: str, identifier: str | None) -> Organization:
+		if self.collecting:
+			if identifier: self.identifiers[Organization].add(identifier)
+			else: self.names[Organization].add(name.lower())
+			return Organization()
+
+		if identifier:
+			org = self.by_identifier[Organization].get(identifier)
+			if org is not None:
+				if not org.name:
+					org.name = name
+					self.update(org)
+				return org
+			org = self.create(Organization(name=name, identifier=identifier))
+			self.by_identifier[Organization][identifier] = org
+			self.by_name[Organization].setdefault(name.lower(), org)
+			return org
+
+		orgs = self.by_name[Organization]
+		if name.lower() not in orgs:
+			orgs[name.lower()] = self.create(Organization(name=name))
+		return orgs[name.lower()]
+
+	def get_submitter(self, email: str, person: Person) -> Submitter:
+		if self.collecting:
+			self.emails.add(email.lower())
+			# the person default of an empty submitter would query for it
+			return Submitter(person=person)
+		if email.lower() not in self.submitters:
+			self.submitters[email.lower()] = self.create(Submitter(email=email, person=person))
+		return self.submitters[email.lower()]
+
+	def get_observatory(
+		self,
+		name: str,
+		identifier: str | None,
+		instr_type: InstrObsType
+	) -> InstrumentObservatory:
+		if self.collecting:
+			if identifier: self.identifiers[InstrumentObservatory].add(identifier)
+			else: self.observatory_names.add(name)
+			return InstrumentObservatory()
+
+		if identifier:
+			entry = self.by_identifier[InstrumentObservatory].get(identifier)
+			if entry is not None: return entry
+			entry = self.create(InstrumentObservatory(
+				name=name,
+				identifier=identifier,
+				type=instr_type,
+			))
+			self.by_identifier[InstrumentObservatory][identifier] = entry
+			self.observatories_by_name.setdefault((name, instr_type), entry)
+			return entry
+
+		key = (name, instr_type)
+		if key not in self.observatories_by_name:
+			self.observatories_by_name[key] = self.create(
+				InstrumentObservatory(name=name, type=instr_type)
+			)
+		return self.observatories_by_name[key]
+
+	def get_award(self, name: str, identifier: str | None) -> Award:
+		if self.collecting:
+			if identifier: self.identifiers[Award].add(identifier)
+			else: self.names[Award].add(name.lower())
+			return Award()
+
+		if identifier:
+			award = self.by_identifier[Award].get(identifier)
+			if award is None:
+				award = self.create(Award(name=name, identifier=identifier))
+				self.by_identifier[Award][identifier] = award
+				self.by_name[Award].setdefault(name.lower(), award)
+			return award
+
+		awards = self.by_name[Award]
+		if name.lower() not in awards:
+			awards[name.lower()] = self.create(Award(name=name))
+		return awards[name.lower()]
+
+	def get_related(self, identifier: str, item_type: RelatedItemType) -> RelatedItem:
+		if self.collecting:
+			self.identifiers[RelatedItem].add(identifier)
+			return RelatedItem()
+		items = self.by_identifier[RelatedItem]
+		if identifier not in items:
+			items[identifier] = self.create(RelatedItem(
+				name=identifier,
+				identifier=identifier,
+				type=item_type,
+			))
+		return items[identifier]
+
+	## loading and writing
+
+	def resolve(self) -> None:
+		"""Load every object recorded by the first walk, one query per model."""
+		for model, names in self.names.items():
+			queryset = ordered(
+				model.objects.annotate(name_lower=Lower("name")).filter(name_lower__in=names)
+			)
+			if issubclass(model, ControlledGraphList): self.load_graph(model, queryset)
+			else:
+				for obj in queryset: self.by_name[model].setdefault(obj.name_lower, obj)
+
+		for model, identifiers in self.identifiers.items():
+			for obj in ordered(model.objects.filter(identifier__in=identifiers)):
+				self.by_identifier[model].setdefault(obj.identifier, obj)
+
+		if self.person_names:
+			given_names, family_names = zip(*self.person_names)
+			for person in ordered(Person.objects.filter(
+				given_name__in=given_names,
+				family_name__in=family_names,
+			)):
+				self.persons_by_name.setdefault((person.given_name, person.family_name), person)
+
+		if self.observatory_names:
+			for entry in ordered(InstrumentObservatory.objects.filter(name__in=self.observatory_names)):
+				self.observatories_by_name.setdefault((entry.name, entry.type), entry)
+
+		if self.emails:
+			for submitter in ordered(
+				Submitter.objects.annotate(email_lower=Lower("email"))
+				.filter(email_lower__in=self.emails)
+			): self.submitters.setdefault(submitter.email_lower, submitter)
+
+		self.collecting = False
+
+	def load_graph(self, model: type[ControlledGraphList], queryset: models.QuerySet) -> None:
+		"""Load the graph items by name, and all of their parents."""
+		items: dict[str, list[ControlledGraphList]] = defaultdict(list)
+		for item in queryset: items[item.name_lower].append(item)
+		self.graph_items[model] = items
+
+		field = model._meta.get_field("children")
+		parent_name = field.m2m_field_name()
+		child_name = field.m2m_reverse_field_name()
+		links = field.remote_field.through.objects.filter(**{
+			f"{child_name}__in": [item.pk for named in items.values() for item in named]
+		}).values_list(f"{parent_name}_id", f"{child_name}_id")
+		for parent_id, child_id in links: self.graph_parents[child_id].add(parent_id)
+
+	def flush(self) -> None:
+		"""Insert the objects that didn't exist and save the filled in ones."""
+		for model in CREATE_ORDER:
+			if self.created[model]: model.objects.bulk_create(self.created[model])
+		if self.updated[Person]: Person.objects.bulk_update(
+			self.updated[Person].values(), ["given_name", "family_name"]
+		)
+		if self.updated[Organization]: Organization.objects.bulk_update(
+			self.updated[Organization].values(), ["name"]
+		)
+
+def get_through_rows(
+	model: type[models.Model],
+	field_name: str,
+	source: models.Model,
+	targets: Iterable[models.Model],
+) -> list[models.Model]:
+	"""The through rows .set() would insert, numbered for sorted M2M fields."""
+	field = model._meta.get_field(field_name)
+	through = field.remote_field.through
+	source_field = field.m2m_field_name() + "_id"
+	target_field = field.m2m_reverse_field_name() + "_id"
+	sort_field = getattr(through, "_sort_field_name", None)
+	rows = []
+	for index, target in enumerate(dict.fromkeys(targets), 1):
+		row = through(**{source_field: source.pk, target_field: target.pk})
+		if sort_field: setattr(row, sort_field, index)
+		rows.append(row)
+	return rows
+
+@transaction.atomic
+def save_submissions(items: list[Any], context: dict[str, Any] | None = None) -> list[Software]:
+	"""
+	Validate and create the software of every submission in the payload,
+	raises the ValidationError of the first invalid submission.
+	"""
+	context = context or {}
+	validated: list[dict[str, Any]] = []
+	for item in items:
+		serializer = SubmissionSerializer(data=item, context=context)
+		serializer._view = SerialView.USER
+		serializer.is_valid(raise_exception=True)
+		validated.append(serializer.validated_data)
+
+	resolver = SubmissionResolver()
+	builder = SubmissionSerializer(context={**context, "resolver": resolver})
+	builder._view = SerialView.USER
+	for data in validated:
+		builder._build_user_submission(Software(), data)
+		builder._get_submitters(data)
+	resolver.resolve()
+
+	submissions: list[tuple[UserSubmission, list[Submitter]]] = [
+		(builder._build_user_submission(Software(), data), builder._get_submitters(data))
+		for data in validated
+	]
+	resolver.flush()
+
+	now = timezone.now()
+	softwares = Software.objects.bulk_create(
+		[submission.software for submission, _ in submissions]
+	)
+	SoftwareVersion.objects.bulk_create(
+		[submission.version for submission, _ in submissions if submission.version]
+	)
+	infos = SubmissionInfo.objects.bulk_create([
+		SubmissionInfo(software=submission.software, submission_date=now)
+		for submission, _ in submissions
+	])
+
+	rows: dict[type[models.Model], list[models.Model]] = defaultdict(list)
+	def add_rows(new_rows: list[models.Model]) -> None:
+		for row in new_rows: rows[type(row)].append(row)
+
+	for (submission, submitters), info in zip(submissions, infos):
+		software = submission.software
+		for field_name, targets in submission.relations.items():
+			add_rows(get_through_rows(Software, field_name, software, targets))
+		if submission.version:
+			add_rows(get_through_rows(Software, "version", software, [submission.version]))
+		for author, organization in submission.affiliations:
+			add_rows(get_through_rows(Person, "affiliation", author, [organization]))
+		add_rows(get_through_rows(SubmissionInfo, "submitter", info, submitters))
+	for through, through_rows in rows.items():
+		through.objects.bulk_create(through_rows, ignore_conflicts=True)
+
+	# bulk writes don't send the save signals that invalidate caches, new
+	# software aren't visible so only filled in names change search documents
+	from ...signals import get_jsonld_software_ids, get_software_ids_referencing
+	updated = {model: list(resolver.updated[model]) for model in (Person, Organization)}
+	defer_work(
+		generations=[GENERATION_CATALOG],
+		software_ids=set().union(*(
+			get_software_ids_referencing(model, pks) for model, pks in updated.items()
+		)),
+		document_ids=set().union(*(
+			get_jsonld_software_ids(model, pks) for model, pks in updated.items()
+		)),
+	)
+	return softwares
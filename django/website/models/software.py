@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 import datetime, uuid
-from typing import Callable
+from typing import Callable, KeysView
 
+from django.core.cache import cache
 from django.db import models
 from django.utils import timezone
 from django.utils.text import slugify
@@ -15,6 +16,7 @@ from .people import Person, Submitter, Curator
 from .related import RelatedItem
 from .organizations import Award, Organization
 from .base import LEN_NAME, HssiModel, HssiSet
+from .generation import GENERATION_VISIBLE_SOFTWARE, Generation
 from .license import License
 from .vocab import (
 	RepoStatus, OperatingSystem, Keyword, Phenomena, 
@@ -61,15 +63,28 @@ class SoftwareVersion(HssiModel):
 	@classmethod
 	def get_top_field(cls) -> models.Field: return cls._meta.get_field("number")
 
+	@classmethod
+	def get_choice_queryset(cls, queryset): return queryset.prefetch_related("software")
+
 	def __str__(self):
-		if self.software.first():
-			return f"{self.software.first()} - {self.number}"
+		software = self.software.first()
+		if software: return f"{software} - {self.number}"
 		return self.number
 
 	class Meta: ordering = ['number']
 
+class SoftwareQuerySet(models.QuerySet):
+
+	def visible_software(self) -> 'SoftwareQuerySet':
+		"""
+		Only the software that are visible to the public, filtered with a
+		subquery so the visible ids never leave the database.
+		"""
+		return self.filter(pk__in=VerifiedSoftware.objects.values("pk"))
+
 class Software(HssiModel):
 	access = AccessLevel.CURATOR
+	objects: SoftwareQuerySet = SoftwareQuerySet.as_manager()
 	programming_language: Manager[ProgrammingLanguage] = models.ManyToManyField(
 		ProgrammingLanguage,
 		blank=True, 
@@ -257,10 +272,14 @@ class Software(HssiModel):
 	def __str__(self): return self.software_name
 
 	def get_absolute_url(self):
-		from django.urls import reverse
 		verified = VerifiedSoftware.objects.filter(pk=self.pk).only("slug").first()
-		if verified and verified.slug:
-			return reverse('website:software_detail', kwargs={'slug': verified.slug})
+		return self.get_url_for_slug(verified.slug if verified else None)
+
+	def get_url_for_slug(self, slug: str | None) -> str:
+		"""get_absolute_url for when the visible slug is already known"""
+		from django.urls import reverse
+		if slug:
+			return reverse('website:software_detail', kwargs={'slug': slug})
 		return reverse('website:software_detail', kwargs={'pk': str(self.pk)})
 
 	"""if the software is visible on the website"""
@@ -344,6 +363,29 @@ class VerifiedSoftware(HssiSet):
 		print(f"made {software.software_name}:{software.id} visible to public at slug '{obj.slug}'")
 		return obj
 	
+	@classmethod
+	def get_visible_slugs(cls) -> dict[uuid.UUID, str]:
+		"""
+		Map of the id to the slug of every visible software, from the cache
+		unless it was invalidated since it was stored.
+		"""
+		version = Generation.get_version(GENERATION_VISIBLE_SOFTWARE)
+		key = f"visible_software:{version}"
+		slugs: dict[uuid.UUID, str] = cache.get(key)
+		if slugs is None:
+			slugs = dict(cls.objects.values_list("id", "slug"))
+			cache.set(key, slugs)
+		return slugs
+
+	@classmethod
+	def get_visible_ids(cls) -> KeysView[uuid.UUID]:
+		return cls.get_visible_slugs().keys()
+
+	@classmethod
+	def invalidate_visible(cls):
+		"""Cached visible ids are reloaded on next access, in every process."""
+		Generation.bump(GENERATION_VISIBLE_SOFTWARE)
+
 	@classmethod
 	def get_unique_slug(cls, name: str) -> str:
 		slug_orig = slugify(name.lower().replace("/","-").replace(".","-"))
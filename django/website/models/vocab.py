@@ -214,6 +214,7 @@ class Region(ControlledGraphList):
 
 	@classmethod
 	def post_fetch(cls):
+		super().post_fetch()
 
 		url_validator = URLValidator()
 
@@ -226,16 +227,10 @@ class Region(ControlledGraphList):
 				object.save()
 
 
-	def get_full_name(self):
-		""" get a path of all parents recursively pointing to this one """
-		path = self.name
-
-		parent = self.parent_nodes.first()
-		if parent: 
-			path = path.replace(parent.name, "").strip()
-			path = f"{parent.get_full_name()}: {path}"
-
-		return path
+	@classmethod
+	def join_full_name(cls, parent_full_name, parent_name, name):
+		# region names repeat the name of their parent
+		return f"{parent_full_name}: {name.replace(parent_name, '').strip()}"
 
 	class Meta: ordering = ['name']
 	def __str__(self): return self.get_full_name()
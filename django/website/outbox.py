@@ -0,0 +1,102 @@
+"""
+Delivery of the queued OutboundEmail rows. Due emails are claimed in batches
+with row locks that other workers skip, by moving their next attempt past a
+lease, and the claim is committed before anything is sent. The emails are
+then sent over a single SMTP connection and each result is saved on its own,
+failures are rescheduled with exponential backoff. An email whose worker
+died while sending it is due again once its lease runs out.
+"""
+
+import datetime
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboundEmail, OutboundEmailStatus
+
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 6
+
+# the first retry waits a minute, each one after that twice as long
+OUTBOX_RETRY_DELAY = datetime.timedelta(minutes=1)
+OUTBOX_MAX_RETRY_DELAY = datetime.timedelta(hours=6)
+
+# how long a claimed email is reserved for the worker sending it
+OUTBOX_LEASE = datetime.timedelta(minutes=10)
+
+def get_retry_delay(attempts: int) -> datetime.timedelta:
+	"""How long to wait before the next attempt after the specified attempts."""
+	return min(OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0), OUTBOX_MAX_RETRY_DELAY)
+
+def get_due_emails():
+	return OutboundEmail.objects.filter(
+		status=OutboundEmailStatus.PENDING,
+		next_attempt__lte=timezone.now(),
+	)
+
+def send_queued_email(email: OutboundEmail, connection) -> None:
+	"""Try to send a claimed email over the connection and record the result."""
+	now = timezone.now()
+	try:
+		connection.open()
+		EmailMessage(
+			email.subject,
+			email.body,
+			email.from_email,
+			email.recipients,
+			connection=connection,
+		).send()
+		email.status = OutboundEmailStatus.SENT
+		email.sent = now
+		email.last_error = ''
+	except Exception as e:
+		print(f"Failed sending email {email.id} (attempt {email.attempts}): {e}")
+		email.last_error = str(e)
+		if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+			email.status = OutboundEmailStatus.FAILED
+		else: email.next_attempt = now + get_retry_delay(email.attempts)
+		# a broken connection is opened again for the next email
+		try: connection.close()
+		except Exception: pass
+	email.save(update_fields=["status", "next_attempt", "last_error", "sent"])
+
+def claim_due_emails(batch_size: int = OUTBOX_BATCH_SIZE) -> list[OutboundEmail]:
+	"""
+	Reserve a batch of due emails for this worker and count the attempt, other
+	workers don't see them as due until the lease runs out.
+	"""
+	with transaction.atomic():
+		batch = list(get_due_emails().select_for_update(skip_locked=True)[:batch_size])
+		lease_until = timezone.now() + OUTBOX_LEASE
+		for email in batch:
+			email.attempts += 1
+			email.next_attempt = lease_until
+		OutboundEmail.objects.bulk_update(batch, ["attempts", "next_attempt"])
+	return batch
+
+def send_queued_emails(batch_size: int = OUTBOX_BATCH_SIZE, connection = None) -> tuple[int, int]:
+	"""
+	Send one batch of due emails, returns the number of emails that were sent
+	and the number that failed.
+	"""
+	sent = failed = 0
+	batch = claim_due_emails(batch_size)
+	if not batch: return sent, failed
+	connection = connection or get_connection(fail_silently=False)
+	try:
+		for email in batch:
+			send_queued_email(email, connection)
+			if email.status == OutboundEmailStatus.SENT: sent += 1
+			else: failed += 1
+	finally: connection.close()
+	return sent, failed
+
+def send_all_queued_emails(batch_size: int = OUTBOX_BATCH_SIZE) -> tuple[int, int]:
+	"""Send batches until no emails are due, returns the sent and failed counts."""
+	total_sent = total_failed = 0
+	while True:
+		sent, failed = send_queued_emails(batch_size)
+		total_sent += sent
+		total_failed += failed
+		if sent + failed < batch_size: return total_sent, total_failed
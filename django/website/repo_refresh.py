@@ -0,0 +1,260 @@
+"""
+Refreshes the repository derived fields of every visible software. The
+repositories are requested concurrently in batches, their metadata is
+compared to the current field values, and only the differences are written,
+one transaction per batch.
+"""
+
+import datetime, uuid
+from typing import Any
+
+from django.db import transaction
+from packaging.version import InvalidVersion, Version
+
+from .crawler import HttpCrawler
+from .metadata import METADATA_WORKERS, RepoData, get_metadata_client
+from .models import GENERATION_CATALOG, License, Software, SoftwareVersion
+from .models.pending import defer_work
+
+REFRESH_BATCH_SIZE = 50
+
+class SoftwareChange:
+	"""A change to a field of a software, from the metadata of its repository."""
+	software: Software
+	field: str
+	old: Any
+	new: Any
+	# why the change can't be made, rejected changes are only reported
+	reason: str | None
+
+	def __init__(
+		self, 
+		software: Software, 
+		field: str, 
+		old: Any, 
+		new: Any, 
+		reason: str | None = None,
+	):
+		self.software = software
+		self.field = field
+		self.old = old
+		self.new = new
+		self.reason = reason
+
+	def to_dict(self) -> dict[str, Any]:
+		data = {
+			"software": str(self.software.id),
+			"name": self.software.software_name,
+			"field": self.field,
+			"old": str(self.old) if self.old is not None else None,
+			"new": str(self.new) if self.new is not None else None,
+		}
+		if self.reason: data["reason"] = self.reason
+		return data
+
+class LicenseMatcher:
+	"""Finds the license matching a license name or SPDX id from a repository."""
+
+	def __init__(self):
+		self.licenses: dict[str, License] = {}
+		for license in License.objects.all():
+			self.licenses.setdefault(license.name.lower(), license)
+			# license urls end in their SPDX id
+			if license.url:
+				spdx_id = license.url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".html")
+				self.licenses.setdefault(spdx_id.lower(), license)
+
+	def match(self, name: str) -> License | None:
+		if not name: return None
+		return self.licenses.get(name.strip().lower())
+
+def normalize_version(number: str) -> str:
+	return number.strip().lower().removeprefix("v")
+
+def parse_version(number: str) -> Version | None:
+	try: return Version(normalize_version(number))
+	except InvalidVersion: return None
+
+def get_latest_version(versions: list[SoftwareVersion]) -> SoftwareVersion | None:
+	"""
+	The most recently released version, versions without a date count as 
+	oldest and are ordered by their number.
+	"""
+	return max(
+		versions, 
+		key=lambda version: (
+			version.release_date or datetime.date.min, 
+			parse_version(version.number) or Version("0"),
+		), 
+		default=None,
+	)
+
+def is_newer_release(
+	number: str, 
+	release_date: datetime.date | None, 
+	latest: SoftwareVersion | None,
+) -> bool:
+	"""
+	Whether a release is newer than the latest recorded version, by release 
+	date when both have one, otherwise by version number. Releases that can't
+	be ordered aren't newer.
+	"""
+	if latest is None: return True
+	if release_date and latest.release_date and release_date != latest.release_date:
+		return release_date > latest.release_date
+	version, latest_version = parse_version(number), parse_version(latest.number)
+	if version is None or latest_version is None: return False
+	return version > latest_version
+
+def get_changes(
+	software: Software, 
+	data: RepoData, 
+	licenses: LicenseMatcher,
+	overwrite_licenses: bool = False,
+) -> list[SoftwareChange]:
+	"""The changes to make to the software from its repository metadata."""
+	changes: list[SoftwareChange] = []
+
+	# curated descriptions are kept, the repository only fills in missing ones
+	if data.description and not software.description:
+		changes.append(SoftwareChange(software, "description", None, data.description))
+
+	# so are curated licenses, unless they're explicitly overwritten
+	license = licenses.match(data.license)
+	if (
+		license and license.pk != software.license_id and 
+		(software.license_id is None or overwrite_licenses)
+	):
+		changes.append(SoftwareChange(software, "license", software.license, license))
+
+	versions = list(software.version.all())
+	numbers = [normalize_version(version.number) for version in versions]
+	latest = get_latest_version(versions)
+	release_date = data.publish_date.date() if data.publish_date else None
+	# the repository's latest release can be a backport of an older version
+	if (
+		data.version and normalize_version(data.version) not in numbers and
+		is_newer_release(data.version, release_date, latest)
+	):
+		max_length = SoftwareVersion._meta.get_field("number").max_length
+		changes.append(SoftwareChange(
+			software, "version", 
+			latest.number if latest else None, 
+			data.version,
+			# a single oversized tag would fail the bulk insert of its batch
+			f"longer than {max_length} characters" if len(data.version) > max_length else None,
+		))
+	return changes
+
+def apply_changes(changes: list[SoftwareChange], metadata: dict[str, RepoData | None]) -> None:
+	"""Write the changes of a batch in bulk."""
+	updated: dict[uuid.UUID, Software] = {}
+	update_fields: set[str] = set()
+	versions: list[SoftwareVersion] = []
+	version_links: list[Any] = []
+	through = Software.version.through
+	for change in changes:
+		software = change.software
+		if change.field == "version":
+			data = metadata[software.code_repository_url]
+			version = SoftwareVersion(
+				number=change.new, 
+				release_date=data.publish_date.date() if data.publish_date else None,
+			)
+			versions.append(version)
+			version_links.append(through(software_id=software.pk, softwareversion_id=version.pk))
+			continue
+		setattr(software, change.field, change.new)
+		update_fields.add(change.field)
+		updated[software.pk] = software
+
+	with transaction.atomic():
+		if updated: Software.objects.bulk_update(updated.values(), sorted(update_fields))
+		SoftwareVersion.objects.bulk_create(versions)
+		through.objects.bulk_create(version_links)
+
+		# bulk writes don't send the save signals that invalidate caches
+		defer_work(
+			generations=[GENERATION_CATALOG],
+			software_ids={change.software.pk for change in changes},
+			document_ids={change.software.pk for change in changes},
+		)
+
+def refresh_repo_metadata(
+	batch_size: int = REFRESH_BATCH_SIZE,
+	workers: int = METADATA_WORKERS,
+	dry_run: bool = False,
+	overwrite_licenses: bool = False,
+) -> dict[str, Any]:
+	"""
+	Refresh every visible software from its repository, returns a report of 
+	the changes, of the changes that can't be made, and of the repositories 
+	that couldn't be read. Licenses are only filled in for software without 
+	one, unless overwrite_licenses is set.
+	"""
+	softwares = list(
+		Software.objects.visible_software()
+		.exclude(code_repository_url__isnull=True)
+		.exclude(code_repository_url="")
+		.select_related("license")
+		.prefetch_related("version")
+		.order_by("software_name", "id")
+	)
+	licenses = LicenseMatcher()
+	report: dict[str, Any] = {
+		"checked": 0, 
+		"changes": [], 
+		"rejected": [], 
+		"unsupported": [], 
+		"failed": [],
+		"dry_run": dry_run,
+	}
+
+	with HttpCrawler(workers=workers) as crawler:
+		for start in range(0, len(softwares), batch_size):
+			batch = softwares[start:start + batch_size]
+
+			# repositories are requested together per API host
+			clients: dict[str, Any] = {}
+			repos: dict[str, list[str]] = {}
+			for software in batch:
+				url = software.code_repository_url
+				try:
+					client = get_metadata_client(url, crawler)
+					if client is not None: client.get_repo_urls(url)
+				except ValueError as e:
+					# malformed urls fail on their own instead of the whole run
+					print(f"Error reading {url}: {e}")
+					report["failed"].append(url)
+					continue
+				if client is None:
+					report["unsupported"].append(url)
+					continue
+				clients.setdefault(client.host, client)
+				repos.setdefault(client.host, []).append(url)
+			metadata: dict[str, RepoData | None] = {}
+			for host, urls in repos.items():
+				metadata.update(clients[host].get_repo_data_many(urls))
+
+			changes: list[SoftwareChange] = []
+			for software in batch:
+				url = software.code_repository_url
+				if url not in metadata: continue
+				report["checked"] += 1
+				data = metadata[url]
+				if data is None:
+					report["failed"].append(url)
+					continue
+				for change in get_changes(software, data, licenses, overwrite_licenses):
+					if change.reason: report["rejected"].append(change.to_dict())
+					else: changes.append(change)
+
+			report["changes"].extend(change.to_dict() for change in changes)
+			if changes and not dry_run:
+				apply_changes(changes, metadata)
+			print(
+				f"checked {min(start + batch_size, len(softwares))}/{len(softwares)} "
+				f"software, {len(report['changes'])} changes"
+			)
+
+	return report
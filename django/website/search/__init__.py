@@ -0,0 +1,9 @@
+"""
+Search over visible Software for the /api/search/ endpoint. Field parsing and
+relevance tiers live in .fields, interchangeable ranking strategies in
+.engines, the denormalized search documents in .documents and the in-process
+search index in .index.
+"""
+
+from .fields import *
+from .engines import *
@@ -0,0 +1,141 @@
+"""
+Builds SoftwareSearchDocument rows from Software. Each tier column holds the
+lowercased values of every field in that tier, one value per line, so a
+substring match against a column is equivalent to an icontains match against
+any of the tier's fields.
+"""
+
+import uuid
+from typing import Any, Iterable
+
+from django.contrib.postgres.search import SearchVector
+from django.db import models, transaction
+
+from ..models import Software, SoftwareSearchDocument
+from .fields import SEARCH_TEXT_CONFIG, SEARCH_TIER_WEIGHTS, SEARCH_TIERS
+
+DOCUMENT_VALUE_SEPARATOR = "\n"
+
+def get_tier_paths() -> list[str]:
+	"""Every field path searched by the relevance tiers."""
+	return [path for _, fields in SEARCH_TIERS for path in fields]
+
+def get_related_paths(paths: Iterable[str]) -> tuple[list[str], list[str]]:
+	"""
+	Split the first segment of every relation path into the relations that
+	need select_related() and prefetch_related() to resolve the paths.
+	"""
+	select: list[str] = []
+	prefetch: list[str] = []
+	for path in paths:
+		if "__" not in path: continue
+		field = Software._meta.get_field(path.split("__")[0])
+		target = prefetch if field.many_to_many else select
+		if field.name not in target: target.append(field.name)
+	return select, prefetch
+
+def get_software_queryset(paths: Iterable[str] = None) -> models.QuerySet[Software]:
+	"""
+	Visible software with the relations needed to resolve the specified
+	field paths loaded, by default those searched by the tiers.
+	"""
+	select, prefetch = get_related_paths(paths or get_tier_paths())
+	return (
+		Software.objects.visible_software()
+		.select_related(*select)
+		.prefetch_related(*prefetch)
+	)
+
+def get_path_values(
+	software: Software, 
+	path: str, 
+	related_cache: dict[str, list[models.Model]] = None
+) -> list[Any]:
+	"""
+	Resolve a field path like 'keywords__name' to its values. Related objects
+	are stored in related_cache when given, since creating the related 
+	managers costs more than reading the prefetched objects.
+	"""
+	if "__" not in path: return [getattr(software, path)]
+	relation, attribute = path.split("__", 1)
+	related = related_cache.get(relation) if related_cache is not None else None
+	if related is None:
+		field = Software._meta.get_field(relation)
+		if field.many_to_many:
+			related = list(getattr(software, relation).all())
+		else:
+			obj = getattr(software, relation)
+			related = [obj] if obj else []
+		if related_cache is not None: related_cache[relation] = related
+	return [getattr(obj, attribute) for obj in related]
+
+def build_document(
+	software: Software, 
+	related_cache: dict[str, list[models.Model]] = None
+) -> SoftwareSearchDocument:
+	"""Create an unsaved search document for a software."""
+	if related_cache is None: related_cache = {}
+	document = SoftwareSearchDocument(
+		software=software,
+		software_name=software.software_name,
+	)
+	for tier_name, fields in SEARCH_TIERS:
+		values: list[str] = []
+		for path in fields:
+			values.extend(
+				str(value).lower()
+				for value in get_path_values(software, path, related_cache) if value
+			)
+		setattr(document, tier_name, DOCUMENT_VALUE_SEPARATOR.join(values))
+	return document
+
+def build_search_vector() -> SearchVector:
+	"""The weighted full text vector of a document's tier columns."""
+	vector: SearchVector = None
+	for tier_name, weight in SEARCH_TIER_WEIGHTS.items():
+		tier_vector = SearchVector(tier_name, weight=weight, config=SEARCH_TEXT_CONFIG)
+		vector = tier_vector if vector is None else vector + tier_vector
+	return vector
+
+def write_documents(documents: list[SoftwareSearchDocument]) -> None:
+	"""Insert documents and compute their full text vectors in the database."""
+	if not documents: return
+	SoftwareSearchDocument.objects.bulk_create(documents)
+	SoftwareSearchDocument.objects.filter(
+		software_id__in=[document.software_id for document in documents]
+	).update(search_vector=build_search_vector())
+
+def refresh_search_documents(software_ids: Iterable[uuid.UUID | str]) -> int:
+	"""
+	Rebuild the search documents for the specified software, deleting the
+	documents of any that are no longer visible. Returns the number of
+	documents written.
+	"""
+	software_ids = set(software_ids)
+	if not software_ids: return 0
+	softwares = list(get_software_queryset().filter(pk__in=software_ids))
+	documents = [build_document(software) for software in softwares]
+	with transaction.atomic():
+		SoftwareSearchDocument.objects.filter(software_id__in=software_ids).delete()
+		write_documents(documents)
+	return len(documents)
+
+def rebuild_search_documents(batch_size: int = 200) -> int:
+	"""
+	Replace every search document, building them from the visible software in
+	batches of batch_size. Returns the number of documents written.
+	"""
+	total = 0
+	documents: list[SoftwareSearchDocument] = []
+	queryset = get_software_queryset().order_by("pk")
+	with transaction.atomic():
+		SoftwareSearchDocument.objects.all().delete()
+		for software in queryset.iterator(chunk_size=batch_size):
+			documents.append(build_document(software))
+			if len(documents) >= batch_size:
+				write_documents(documents)
+				total += len(documents)
+				documents = []
+		write_documents(documents)
+		total += len(documents)
+	return total
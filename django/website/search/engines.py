@@ -0,0 +1,340 @@
+"""
+Search engines that rank visible Software against a parsed query. Every
+engine returns the same ordering for the same query: matches are ranked by
+the first tier in SEARCH_TIERS that contains them, then by software name.
+The engine used by /api/search/ is selected with settings.HSSI_SEARCH_ENGINE.
+"""
+
+import functools, time
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.models import Case, F, FloatField, IntegerField, Q, QuerySet, Value, When
+
+from ..models import Software, SoftwareSearchDocument
+from ..models.people import Person
+from .fields import FIELD_ALIAS_MAP, SEARCH_TEXT_CONFIG, SEARCH_TIERS
+from .index import get_search_index
+
+DEFAULT_SEARCH_ENGINE = "ranked"
+
+def build_author_query(value: str) -> Q:
+	"""
+	Build a Q for searching authors by name across given_name and family_name.
+	For multi-word values, also matches same-Person-row via a subquery so that
+	e.g. authors:"john doe" finds a Person with given=john AND family=doe.
+	"""
+	tokens = value.split()
+	q = Q()
+	for token in tokens:
+		q |= Q(authors__given_name__icontains=token)
+		q |= Q(authors__family_name__icontains=token)
+
+	if len(tokens) >= 2:
+		# Same-row match: first token ~ given_name, last token ~ family_name
+		matching_persons = Person.objects.filter(
+			given_name__icontains=tokens[0],
+			family_name__icontains=tokens[-1],
+		)
+		q |= Q(authors__in=matching_persons)
+
+	return q
+
+def build_field_query(query: str, tokens: list[str], fields: list[str]) -> Q:
+	"""Build a case-insensitive OR query across fields for a query and tokens."""
+	q = Q()
+	for field in fields:
+		if query:
+			q |= Q(**{f"{field}__icontains": query})
+		for token in tokens:
+			q |= Q(**{f"{field}__icontains": token})
+	return q
+
+def build_alias_filter(alias_groups: dict[str, list[str]]) -> Q:
+	"""
+	AND together one clause per alias, where each clause ORs the provided
+	values across every lookup the alias maps to.
+	"""
+	field_filter = Q()
+	for alias, values in alias_groups.items():
+		lookups = FIELD_ALIAS_MAP.get(alias)
+		if lookups is None:
+			# Author special case: OR across all provided values
+			author_q = Q()
+			for v in values:
+				author_q |= build_author_query(v)
+			field_filter &= author_q
+		else:
+			alias_q = Q()
+			for v in values:
+				value_q = Q()
+				for lookup in lookups:
+					value_q |= Q(**{lookup: v})
+				alias_q |= value_q
+			field_filter &= alias_q
+	return field_filter
+
+class SearchEngine:
+	"""
+	Base class for search engines. Subclasses implement rank() to order the
+	filtered visible Software by tier; search() handles the shared field
+	filtering and the field-only (no plain text) case.
+	"""
+
+	name: str = ""
+
+	def get_base_queryset(self) -> QuerySet[Software]:
+		return Software.objects.visible_software()
+
+	def search(
+		self,
+		alias_groups: dict[str, list[str]],
+		query: str,
+		tokens: list[str],
+	) -> list[str]:
+		"""
+		Return ordered ids of visible Software matching every field filter in
+		alias_groups and, when query is not empty, ranked against query/tokens.
+		"""
+		base_qs = self.get_base_queryset()
+
+		# Apply field filters as exclusive AND conditions, narrowing the base queryset
+		if alias_groups:
+			base_qs = base_qs.filter(build_alias_filter(alias_groups)).distinct()
+
+		if not query:
+			# Pure field-filter query with no remainder text — ordered flat results
+			return [str(uid) for uid in base_qs.values_list("id", flat=True)]
+
+		return self.rank(base_qs, query, tokens)
+
+	def rank(self, base_qs: QuerySet[Software], query: str, tokens: list[str]) -> list[str]:
+		raise NotImplementedError
+
+class TieredSearchEngine(SearchEngine):
+	"""
+	Original search strategy: one query per tier, concatenated in tier order
+	with duplicates dropped. Kept as a reference implementation.
+	"""
+
+	name = "tiered"
+
+	def rank(self, base_qs, query, tokens):
+		def fetch_tier_ids(tier_name: str, fields: list[str]) -> list[str]:
+			tier_start = time.monotonic()
+			query_obj = build_field_query(query, tokens, fields)
+			ids = list(
+				base_qs.filter(query_obj)
+				.distinct()
+				.values_list("id", flat=True)
+			)
+			elapsed = time.monotonic() - tier_start
+			print(f"[search] {tier_name} matches={len(ids)} elapsed={elapsed:.3f}s")
+			return [str(uid) for uid in ids]
+
+		result_ids: list[str] = []
+		seen: set[str] = set()
+		for tier_name, fields in SEARCH_TIERS:
+			for uid in fetch_tier_ids(tier_name, fields):
+				if uid not in seen:
+					seen.add(uid)
+					result_ids.append(uid)
+		return result_ids
+
+class RankedSearchEngine(SearchEngine):
+	"""
+	Computes every tier in a single query. Each tier becomes an
+	``id IN (subquery)`` branch of a CASE expression, so the database
+	evaluates each tier's joins once and the first matching branch is the
+	rank. Ordering by (rank, software_name) reproduces the tiered ordering.
+	"""
+
+	name = "ranked"
+
+	def rank_expression(self, query: str, tokens: list[str]) -> Case:
+		whens = [
+			When(
+				Q(pk__in=Software.objects
+					.filter(build_field_query(query, tokens, fields))
+					.values("pk")
+				),
+				then=Value(rank),
+			)
+			for rank, (_, fields) in enumerate(SEARCH_TIERS)
+		]
+		return Case(*whens, default=None, output_field=IntegerField())
+
+	def rank(self, base_qs, query, tokens):
+		rank_start = time.monotonic()
+		ids = list(
+			base_qs.annotate(search_rank=self.rank_expression(query, tokens))
+				.filter(search_rank__isnull=False)
+				.order_by("search_rank", "software_name", "id")
+				.values_list("id", flat=True)
+		)
+		elapsed = time.monotonic() - rank_start
+		print(f"[search] ranked matches={len(ids)} elapsed={elapsed:.3f}s")
+		return [str(uid) for uid in ids]
+
+class DocumentSearchEngine(SearchEngine):
+	"""
+	Ranks against the denormalized SoftwareSearchDocument table, where each
+	tier is a single lowercased text column, so text matching never joins
+	the related models. Requires the documents to be populated, see the 
+	'rebuild_search_documents' management command.
+	"""
+
+	name = "document"
+
+	@staticmethod
+	def get_terms(query: str, tokens: list[str]) -> list[str]:
+		return [term.lower() for term in (query, *tokens) if term]
+
+	@staticmethod
+	def tier_match(tier_name: str, terms: list[str]) -> Q:
+		tier_q = Q()
+		for term in terms:
+			tier_q |= Q(**{f"{tier_name}__contains": term})
+		return tier_q
+
+	def tier_whens(self, terms: list[str]) -> list[When]:
+		return [
+			When(self.tier_match(tier_name, terms), then=Value(rank))
+			for rank, (tier_name, _) in enumerate(SEARCH_TIERS)
+		]
+
+	def rank_expression(self, query: str, tokens: list[str]) -> Case:
+		whens = self.tier_whens(self.get_terms(query, tokens))
+		return Case(*whens, default=None, output_field=IntegerField())
+
+	def rank(self, base_qs, query, tokens):
+		rank_start = time.monotonic()
+		ids = list(
+			SoftwareSearchDocument.objects
+				.filter(software_id__in=base_qs.values("pk"))
+				.annotate(search_rank=self.rank_expression(query, tokens))
+				.filter(search_rank__isnull=False)
+				.order_by("search_rank", "software_name", "software_id")
+				.values_list("software_id", flat=True)
+		)
+		elapsed = time.monotonic() - rank_start
+		print(f"[search] document matches={len(ids)} elapsed={elapsed:.3f}s")
+		return [str(uid) for uid in ids]
+
+@functools.cache
+def has_trigram_support() -> bool:
+	"""If the pg_trgm extension is installed in the database."""
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+		return cursor.fetchone() is not None
+
+class PostgresSearchEngine(DocumentSearchEngine):
+	"""
+	Document search backed by postgres indexes. Substring matches are ranked
+	exactly like the other engines; the WHERE clause ORs the tier columns so
+	postgres can use their pg_trgm GIN indexes when the extension is installed.
+	Software that only match the query through full text search (stemmed words,
+	e.g. 'modeling' matches 'models') or, with pg_trgm, through words similar
+	to the terms in their name, description or keywords are ranked after every
+	tier by their SearchRank, weighted per tier by SEARCH_TIER_WEIGHTS.
+	"""
+
+	name = "postgres"
+
+	# SearchRank weights for D, C, B, A
+	rank_weights = [0.1, 0.2, 0.4, 1.0]
+	fuzzy_tiers = ["tier_1", "tier_2"]
+
+	def get_search_query(self, terms: list[str]) -> SearchQuery:
+		search_query: SearchQuery = None
+		for term in terms:
+			term_query = SearchQuery(term, config=SEARCH_TEXT_CONFIG)
+			search_query = term_query if search_query is None else search_query | term_query
+		return search_query
+
+	def fuzzy_match(self, terms: list[str], search_query: SearchQuery) -> Q:
+		fuzzy_q = Q(search_vector=search_query)
+		if has_trigram_support():
+			for tier_name in self.fuzzy_tiers:
+				for term in terms:
+					fuzzy_q |= Q(**{f"{tier_name}__trigram_word_similar": term})
+		return fuzzy_q
+
+	def rank(self, base_qs, query, tokens):
+		rank_start = time.monotonic()
+		terms = self.get_terms(query, tokens)
+		search_query = self.get_search_query(terms)
+		fuzzy_q = self.fuzzy_match(terms, search_query)
+		fuzzy_rank = len(SEARCH_TIERS)
+
+		match_q = fuzzy_q
+		for tier_name, _ in SEARCH_TIERS:
+			match_q |= self.tier_match(tier_name, terms)
+
+		ids = list(
+			SoftwareSearchDocument.objects
+				.filter(match_q, software_id__in=base_qs.values("pk"))
+				.annotate(
+					search_rank=Case(
+						*self.tier_whens(terms),
+						When(fuzzy_q, then=Value(fuzzy_rank)),
+						default=None,
+						output_field=IntegerField(),
+					),
+					text_rank=Case(
+						When(search_rank=fuzzy_rank, then=SearchRank(
+							F("search_vector"), search_query, weights=self.rank_weights
+						)),
+						default=Value(0.0),
+						output_field=FloatField(),
+					),
+				)
+				.order_by("search_rank", "-text_rank", "software_name", "software_id")
+				.values_list("software_id", flat=True)
+		)
+		elapsed = time.monotonic() - rank_start
+		print(f"[search] postgres matches={len(ids)} elapsed={elapsed:.3f}s")
+		return [str(uid) for uid in ids]
+
+class IndexSearchEngine(SearchEngine):
+	"""
+	Searches the in-process SearchIndex, so searching only queries the 
+	database for the catalog generation, or to rebuild the index after the
+	catalog has changed.
+	"""
+
+	name = "index"
+
+	def search(self, alias_groups, query, tokens):
+		search_start = time.monotonic()
+		ids = get_search_index().search(alias_groups, query, tokens)
+		elapsed = time.monotonic() - search_start
+		print(f"[search] index matches={len(ids)} elapsed={elapsed:.3f}s")
+		return ids
+
+SEARCH_ENGINES: dict[str, type[SearchEngine]] = {
+	engine.name: engine for engine in (
+		TieredSearchEngine,
+		RankedSearchEngine,
+		DocumentSearchEngine,
+		PostgresSearchEngine,
+		IndexSearchEngine,
+	)
+}
+
+def get_search_engine(name: str | None = None) -> SearchEngine:
+	"""
+	Instantiate the named search engine, or the one configured by
+	settings.HSSI_SEARCH_ENGINE if no name is given.
+	"""
+	if name is None:
+		name = getattr(settings, "HSSI_SEARCH_ENGINE", None) or DEFAULT_SEARCH_ENGINE
+	engine_cls = SEARCH_ENGINES.get(name.lower())
+	if engine_cls is None:
+		valid = ", ".join(SEARCH_ENGINES.keys())
+		raise ImproperlyConfigured(
+			f"Unknown search engine '{name}'. Valid values: {valid}."
+		)
+	return engine_cls()
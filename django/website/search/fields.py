@@ -0,0 +1,181 @@
+"""
+Field definitions shared by every search engine: the user-facing
+field:"value" alias map and the ordered relevance tiers used to rank plain
+text queries against Software.
+"""
+
+import re
+
+# ---------------------------------------------------------------------------
+# Field-search alias map
+# Maps user-facing aliases to lists of ORM icontains lookup paths on Software.
+# A value of None is a sentinel meaning "use build_author_query instead."
+# ---------------------------------------------------------------------------
+
+FIELD_ALIAS_MAP: dict[str, list[str] | None] = {
+	# Direct text / URL fields
+	"name": ["software_name__icontains"],
+	"description": ["description__icontains", "concise_description__icontains"],
+	"repo": ["code_repository_url__icontains"],
+	"docs": ["documentation__icontains"],
+	"pid": ["persistent_identifier__icontains"],
+
+	# Authors — special case (sentinel None)
+	"author": None,
+
+	# FK / M2M fields
+	"publisher": ["publisher__name__icontains"],
+	"keyword": ["keywords__name__icontains"],
+	"lang": ["programming_language__name__icontains"],
+	"license": ["license__name__icontains"],
+	"region": ["related_region__name__icontains"],
+	"phenomena": ["related_phenomena__name__icontains"],
+	"instrument": ["related_instruments__name__icontains", "related_instruments__abbreviation__icontains"],
+	"observatory": ["related_observatories__name__icontains", "related_observatories__abbreviation__icontains"],
+	"funder": ["funder__name__icontains"],
+	"award": ["award__name__icontains"],
+	"status": ["development_status__name__icontains"],
+	"os": ["operating_system__name__icontains"],
+	"cpu": ["cpu_architecture__name__icontains"],
+	"source": ["data_sources__name__icontains"],
+	"function": ["software_functionality__name__icontains"],
+	"input": ["input_formats__name__icontains", "input_formats__extension__icontains"],
+	"output": ["output_formats__name__icontains", "output_formats__extension__icontains"],
+	"publication": ["related_publications__name__icontains", "reference_publication__name__icontains"],
+	"reference_publication": ["reference_publication__name__icontains"],
+	"dataset": ["related_datasets__name__icontains"],
+	"related": ["related_software__name__icontains"],
+	"interoperable": ["interoperable_software__name__icontains"],
+	"version": ["version__number__icontains"],
+}
+
+FIELD_TOKEN_RE = re.compile(r'(\w+):"([^"]*)"')
+WHITESPACE_RE = re.compile(r"\s+")
+
+# ---------------------------------------------------------------------------
+# Relevance tiers
+# A plain text query ranks each match by the first tier that contains it.
+# Tier 4 is split into subtiers which are ranked in the order listed, so the
+# flattened list below is the full rank order (lower index = more relevant).
+# ---------------------------------------------------------------------------
+
+TIER_1_FIELDS: list[str] = [
+	"software_name",
+	"concise_description",
+	"description",
+]
+TIER_2_FIELDS: list[str] = [
+	"keywords__name",
+]
+TIER_3_FIELDS: list[str] = [
+	"related_region__name",
+	"software_functionality__name",
+	"data_sources__name",
+	"related_phenomena__name",
+]
+TIER_4_SUBTIERS: list[list[str]] = [
+	[
+		"publisher__name",
+		"publisher__abbreviation",
+		"authors__given_name",
+		"authors__family_name",
+		"authors__identifier",
+	],
+	[
+		"programming_language__name",
+		"related_instruments__name",
+		"related_instruments__abbreviation",
+		"related_observatories__name",
+	],
+	[
+		"related_observatories__abbreviation",
+		"reference_publication__name",
+		"related_publications__name",
+	],
+	[
+		"related_datasets__name",
+		"related_software__name",
+		"interoperable_software__name",
+	],
+	[
+		"funder__name",
+		"funder__abbreviation",
+		"award__name",
+	],
+	[
+		"award__identifier",
+		"input_formats__name",
+		"input_formats__extension",
+		"output_formats__name",
+		"output_formats__extension",
+	],
+	[
+		"cpu_architecture__name",
+		"development_status__name",
+		"operating_system__name",
+		"license__name",
+	],
+	[
+		"code_repository_url",
+		"documentation",
+	],
+]
+
+SEARCH_TIERS: list[tuple[str, list[str]]] = [
+	("tier_1", TIER_1_FIELDS),
+	("tier_2", TIER_2_FIELDS),
+	("tier_3", TIER_3_FIELDS),
+	*[
+		(f"tier_4_{index}", fields)
+		for index, fields in enumerate(TIER_4_SUBTIERS, start=1)
+	],
+]
+
+# Full text search weights per tier, used by the postgres search engine. Rank
+# weights only go from A (most relevant) to D, so every tier 4 subtier is D.
+SEARCH_TEXT_CONFIG = "english"
+SEARCH_TIER_WEIGHTS: dict[str, str] = {
+	tier_name: {"tier_1": "A", "tier_2": "B", "tier_3": "C"}.get(tier_name, "D")
+	for tier_name, _ in SEARCH_TIERS
+}
+
+def parse_field_queries(raw_query: str) -> tuple[list[tuple[str, str]], str]:
+	"""
+	Extract field:"value" tokens from raw_query.
+	Returns ([(alias, value), ...], remainder) where remainder is the raw
+	query string with all matched tokens stripped out.
+	"""
+	field_queries: list[tuple[str, str]] = []
+
+	def collect(m: re.Match) -> str:
+		field_queries.append((m.group(1).lower(), m.group(2)))
+		return ""
+
+	remainder = FIELD_TOKEN_RE.sub(collect, raw_query).strip()
+	return field_queries, remainder
+
+def group_field_queries(
+	field_queries: list[tuple[str, str]]
+) -> tuple[dict[str, list[str]], list[str]]:
+	"""
+	Collect values per known alias so multiple author:"x" author:"y" tokens
+	OR together. Returns (alias_groups, unknown_tokens) where unknown_tokens
+	are the re-quoted tokens of aliases missing from FIELD_ALIAS_MAP, which
+	callers pass through as plain text.
+	"""
+	all_groups: dict[str, list[str]] = {}
+	for alias, value in field_queries:
+		if value:
+			all_groups.setdefault(alias, []).append(value)
+
+	alias_groups: dict[str, list[str]] = {}
+	unknown_tokens: list[str] = []
+	for alias, values in all_groups.items():
+		if alias in FIELD_ALIAS_MAP:
+			alias_groups[alias] = values
+		else:
+			unknown_tokens.extend(f'{alias}:"{v}"' for v in values)
+	return alias_groups, unknown_tokens
+
+def split_tokens(query: str) -> list[str]:
+	return [token for token in WHITESPACE_RE.split(query) if token]
@@ -0,0 +1,174 @@
+"""
+A per-process inverted index of the visible Software, used by the "index"
+search engine to answer searches without querying the related models. The
+index is built lazily and rebuilt whenever the catalog Generation counter
+changes, so every worker picks up changes made through any other worker.
+"""
+
+import threading, time
+
+from ..models import GENERATION_CATALOG, Generation, Software
+from .documents import build_document, get_path_values, get_software_queryset, get_tier_paths
+from .fields import FIELD_ALIAS_MAP, SEARCH_TIERS
+
+AUTHOR_NAME_PATHS = ["authors__given_name", "authors__family_name"]
+
+# matched terms remembered per text column before the memo is cleared
+MATCH_CACHE_SIZE = 4096
+
+def get_alias_paths() -> list[str]:
+	"""Every field path that field:"value" aliases are matched against."""
+	paths = list(AUTHOR_NAME_PATHS)
+	for lookups in FIELD_ALIAS_MAP.values():
+		for lookup in lookups or []:
+			path = lookup.removesuffix("__icontains")
+			if path not in paths: paths.append(path)
+	return paths
+
+class TextPostings:
+	"""
+	Maps every whitespace separated word in a text column to the sorted
+	positions of the software whose text contains it. A term without
+	whitespace can only occur inside a single word, so its substring matches
+	are the union of the postings of every word containing it.
+	"""
+
+	def __init__(self, texts: list[str]):
+		self.texts = texts
+		postings: dict[str, list[int]] = {}
+		for position, text in enumerate(texts):
+			for word in set(text.split()):
+				postings.setdefault(word, []).append(position)
+		self.postings = postings
+		self.matches: dict[str, frozenset[int]] = {}
+
+	def match(self, term: str) -> frozenset[int]:
+		"""Positions of the texts that contain the lowercase term."""
+		matches = self.matches.get(term)
+		if matches is not None: return matches
+
+		words = term.split()
+		if len(words) == 1 and words[0] == term:
+			found: set[int] = set()
+			for word, positions in self.postings.items():
+				if term in word: found.update(positions)
+			matches = frozenset(found)
+		elif not words:
+			matches = frozenset(
+				position for position, text in enumerate(self.texts) if term in text
+			)
+		else:
+			# every word of a term containing whitespace must be inside a word
+			# of the text, then the candidates are checked against the full term
+			candidates = set.intersection(*(set(self.match(word)) for word in words))
+			matches = frozenset(
+				position for position in candidates if term in self.texts[position]
+			)
+
+		if len(self.matches) >= MATCH_CACHE_SIZE: self.matches.clear()
+		self.matches[term] = matches
+		return matches
+
+class SearchIndex:
+	"""
+	Text of every tier and alias field of the visible Software, stored in
+	the order of the database (by name then id) so the position of each
+	software is also its rank within a tier.
+	"""
+
+	def __init__(self, generation: str, softwares: list[Software]):
+		self.generation = generation
+		self.ids = [str(software.id) for software in softwares]
+
+		alias_paths = get_alias_paths()
+		tier_texts: list[list[str]] = [[] for _ in SEARCH_TIERS]
+		field_texts: dict[str, list[str]] = {path: [] for path in alias_paths}
+		for software in softwares:
+			related_cache = {}
+			document = build_document(software, related_cache)
+			for texts, (tier_name, _) in zip(tier_texts, SEARCH_TIERS):
+				texts.append(getattr(document, tier_name))
+			for path in alias_paths:
+				field_texts[path].append("\n".join(
+					str(value).lower()
+					for value in get_path_values(software, path, related_cache) if value
+				))
+
+		self.tiers = [TextPostings(texts) for texts in tier_texts]
+		self.fields = {path: TextPostings(texts) for path, texts in field_texts.items()}
+
+	@classmethod
+	def build(cls, generation: str) -> 'SearchIndex':
+		build_start = time.monotonic()
+		queryset = get_software_queryset([*get_tier_paths(), *get_alias_paths()])
+		index = cls(generation, list(queryset.order_by("software_name", "id")))
+		elapsed = time.monotonic() - build_start
+		print(f"[search] built index generation={generation} size={len(index.ids)} elapsed={elapsed:.3f}s")
+		return index
+
+	def match_field(self, path: str, value: str) -> frozenset[int]:
+		return self.fields[path].match(value.lower())
+
+	def match_author(self, value: str) -> set[int]:
+		# any token of the value in any author given or family name, which
+		# also covers the same-person match of build_author_query
+		matches: set[int] = set()
+		for token in value.split():
+			for path in AUTHOR_NAME_PATHS:
+				matches.update(self.match_field(path, token))
+		return matches
+
+	def filter(self, alias_groups: dict[str, list[str]]) -> set[int]:
+		"""Positions of the software matching every alias, see build_alias_filter."""
+		candidates = set(range(len(self.ids)))
+		for alias, values in alias_groups.items():
+			lookups = FIELD_ALIAS_MAP.get(alias)
+			alias_matches: set[int] = set()
+			for value in values:
+				if lookups is None:
+					alias_matches.update(self.match_author(value))
+					continue
+				for lookup in lookups:
+					path = lookup.removesuffix("__icontains")
+					alias_matches.update(self.match_field(path, value))
+			candidates &= alias_matches
+		return candidates
+
+	def search(
+		self,
+		alias_groups: dict[str, list[str]],
+		query: str,
+		tokens: list[str],
+	) -> list[str]:
+		"""Ordered ids of the matching software, same as SearchEngine.search."""
+		candidates = self.filter(alias_groups)
+		if not query:
+			return [self.ids[position] for position in sorted(candidates)]
+
+		terms = [term.lower() for term in (query, *tokens) if term]
+		result_ids: list[str] = []
+		for tier in self.tiers:
+			tier_matches: set[int] = set()
+			for term in terms:
+				tier_matches.update(tier.match(term))
+			tier_matches &= candidates
+			candidates -= tier_matches
+			result_ids.extend(self.ids[position] for position in sorted(tier_matches))
+		return result_ids
+
+_index: SearchIndex = None
+_index_lock = threading.Lock()
+
+def get_search_index() -> SearchIndex:
+	"""
+	The search index of this process, rebuilt first if the catalog
+	generation has changed since it was built.
+	"""
+	global _index
+	generation = Generation.get_version(GENERATION_CATALOG)
+	index = _index
+	if index is not None and index.generation == generation: return index
+	with _index_lock:
+		if _index is None or _index.generation != generation:
+			_index = SearchIndex.build(generation)
+		return _index
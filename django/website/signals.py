@@ -0,0 +1,216 @@
+"""
+Signal receivers that keep denormalized data in sync with the models it is
+derived from, and bump the generation counters that invalidate caches. The
+receivers only record the work, which is done once the transaction commits,
+see website.models.pending.
+"""
+
+from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+
+from .models import (
+	GENERATION_CATALOG, 
+	ControlledGraphList, 
+	FunctionCategory, 
+	HssiModel, 
+	Phenomena, 
+	Region, 
+	Software, 
+	VerifiedSoftware,
+)
+from .models.pending import defer_work
+from .models.serializers.software import JSONLD_PREFETCH_RELATED, JSONLD_SELECT_RELATED
+from .search.fields import SEARCH_TIERS
+
+## Catalog generation ---------------------------------------------------------
+
+def on_catalog_changed(sender, instance, **kwargs):
+	"""Bump the catalog generation when any HSSI model data changes."""
+	if isinstance(instance, HssiModel): defer_work(generations=[GENERATION_CATALOG])
+
+def on_catalog_relation_changed(sender, instance, action: str, **kwargs):
+	if action not in ("post_add", "post_remove", "post_clear"): return
+	on_catalog_changed(sender, instance)
+
+post_save.connect(on_catalog_changed, dispatch_uid="catalog_generation")
+post_delete.connect(on_catalog_changed, dispatch_uid="catalog_generation")
+m2m_changed.connect(on_catalog_relation_changed, dispatch_uid="catalog_generation")
+
+## Visible software -----------------------------------------------------------
+
+def on_visible_software_changed(sender, instance: VerifiedSoftware, **kwargs):
+	VerifiedSoftware.invalidate_visible()
+
+post_save.connect(on_visible_software_changed, sender=VerifiedSoftware)
+post_delete.connect(on_visible_software_changed, sender=VerifiedSoftware)
+
+## Graph list paths ----------------------------------------------------------
+
+GRAPH_LIST_MODELS: list[type[ControlledGraphList]] = [FunctionCategory, Phenomena, Region]
+
+def on_graph_list_changed(sender, instance: ControlledGraphList, raw=False, **kwargs):
+	defer_work(graph_models=[sender])
+	if raw: return
+	# the saved instance builds its full name from its parents until reloaded, 
+	# since the stored one changes whenever its parents do
+	instance.full_name = ""
+
+def on_graph_list_children_changed(sender, instance, action: str, model, **kwargs):
+	if action not in ("post_add", "post_remove", "post_clear"): return
+	defer_work(graph_models=[model])
+
+for graph_model in GRAPH_LIST_MODELS:
+	uid = f"graph_path_{graph_model.__name__}"
+	post_save.connect(on_graph_list_changed, sender=graph_model, dispatch_uid=uid)
+	post_delete.connect(on_graph_list_changed, sender=graph_model, dispatch_uid=uid)
+	m2m_changed.connect(
+		on_graph_list_children_changed, 
+		sender=graph_model.children.through, 
+		dispatch_uid=uid,
+	)
+
+## Search documents ------------------------------------------------------------
+
+def get_searched_relations() -> list[models.Field]:
+	"""The Software relation fields whose related values are searched."""
+	relations: list[models.Field] = []
+	for _, fields in SEARCH_TIERS:
+		for path in fields:
+			if "__" not in path: continue
+			field = Software._meta.get_field(path.split("__")[0])
+			if field not in relations: relations.append(field)
+	return relations
+
+SEARCHED_RELATIONS = get_searched_relations()
+
+def get_referencing_software_ids(instance: models.Model) -> set:
+	"""Ids of visible software that reference instance through a searched field."""
+	return get_software_ids_referencing(type(instance), [instance.pk])
+
+def get_software_ids_referencing(model: type[models.Model], pks: list) -> set:
+	"""
+	Ids of visible software that reference any of the objects through a 
+	searched field, for writes that don't send signals such as bulk updates.
+	"""
+	if not pks: return set()
+	query = models.Q()
+	for field in SEARCHED_RELATIONS:
+		if issubclass(model, field.related_model):
+			query |= models.Q(**{f"{field.name}__in": pks})
+	if not query: return set()
+	return set(
+		Software.objects.visible_software().filter(query)
+		.values_list("pk", flat=True)
+	)
+
+def on_software_saved(sender, instance: Software, raw=False, **kwargs):
+	if raw: return
+	defer_work(software_ids=[instance.pk])
+
+def on_verified_software_changed(sender, instance: VerifiedSoftware, raw=False, **kwargs):
+	if raw: return
+	defer_work(software_ids=[instance.pk])
+
+def on_searched_relation_changed(sender, instance, action: str, reverse: bool, pk_set, **kwargs):
+	"""
+	Handles changes of the through tables of searched Software relations, from
+	either side of the relation.
+	"""
+	if action == "pre_clear" and reverse:
+		# the cleared software can't be looked up after the clear is done
+		instance._search_cleared_ids = get_referencing_software_ids(instance)
+		return
+	if action not in ("post_add", "post_remove", "post_clear"): return
+	if not reverse: defer_work(software_ids=[instance.pk])
+	elif action == "post_clear":
+		defer_work(software_ids=getattr(instance, "_search_cleared_ids", ()))
+	else: defer_work(software_ids=pk_set or ())
+
+def on_related_saved(sender, instance, raw=False, **kwargs):
+	if raw: return
+	defer_work(software_ids=get_referencing_software_ids(instance))
+
+def on_related_pre_delete(sender, instance, **kwargs):
+	# references are removed along with the instance, so collect them first
+	instance._search_deleted_ids = get_referencing_software_ids(instance)
+
+def on_related_deleted(sender, instance, **kwargs):
+	defer_work(software_ids=getattr(instance, "_search_deleted_ids", ()))
+
+post_save.connect(on_software_saved, sender=Software)
+post_save.connect(on_verified_software_changed, sender=VerifiedSoftware)
+post_delete.connect(on_verified_software_changed, sender=VerifiedSoftware)
+
+for field in SEARCHED_RELATIONS:
+	if field.many_to_many:
+		m2m_changed.connect(on_searched_relation_changed, sender=field.remote_field.through)
+	related_model = field.related_model
+	uid = f"search_document_{related_model.__name__}"
+	post_save.connect(on_related_saved, sender=related_model, dispatch_uid=uid)
+	pre_delete.connect(on_related_pre_delete, sender=related_model, dispatch_uid=uid)
+	post_delete.connect(on_related_deleted, sender=related_model, dispatch_uid=uid)
+
+## JSON-LD documents ------------------------------------------------------------
+
+def get_jsonld_paths() -> list[tuple[str, type[models.Model]]]:
+	"""The lookups from Software to every model its JSON-LD reads."""
+	paths: list[tuple[str, type[models.Model]]] = []
+	for path in [*JSONLD_SELECT_RELATED, *JSONLD_PREFETCH_RELATED, "submission_info"]:
+		model = Software
+		names = path.split("__")
+		for index, name in enumerate(names):
+			model = model._meta.get_field(name).related_model
+			subpath = "__".join(names[:index + 1])
+			if (subpath, model) not in paths: paths.append((subpath, model))
+	return paths
+
+JSONLD_PATHS = get_jsonld_paths()
+
+def get_jsonld_software_ids(model: type[models.Model], pks: list) -> set:
+	"""
+	Ids of the software whose JSON-LD includes any of the objects, for writes
+	that don't send signals such as bulk updates.
+	"""
+	if not pks: return set()
+	if model in (Software, VerifiedSoftware): return set(pks)
+	queryset: models.QuerySet | None = None
+	for path, related_model in JSONLD_PATHS:
+		if not issubclass(model, related_model): continue
+		if issubclass(model, ControlledGraphList):
+			# full names include every ancestor, so an edit can change any of them
+			lookup = models.Q(**{f"{path}__isnull": False})
+		else: lookup = models.Q(**{f"{path}__in": pks})
+		paths = Software.objects.filter(lookup).values_list("pk", flat=True)
+		queryset = paths if queryset is None else queryset.union(paths)
+	return set(queryset) if queryset is not None else set()
+
+def on_jsonld_object_saved(sender, instance, raw=False, **kwargs):
+	if raw or not isinstance(instance, HssiModel): return
+	defer_work(document_ids=get_jsonld_software_ids(type(instance), [instance.pk]))
+
+def on_jsonld_object_pre_delete(sender, instance, **kwargs):
+	if not isinstance(instance, HssiModel): return
+	instance._jsonld_deleted_ids = get_jsonld_software_ids(type(instance), [instance.pk])
+
+def on_jsonld_object_deleted(sender, instance, **kwargs):
+	defer_work(document_ids=getattr(instance, "_jsonld_deleted_ids", ()))
+
+def on_jsonld_relation_changed(sender, instance, action: str, reverse: bool, model, pk_set, **kwargs):
+	"""
+	A relation only changes the documents of the software that reach it from
+	the side of the relation they read it from.
+	"""
+	if not isinstance(instance, HssiModel): return
+	if action == "pre_clear" and reverse:
+		instance._jsonld_cleared_ids = get_jsonld_software_ids(type(instance), [instance.pk])
+		return
+	if action not in ("post_add", "post_remove", "post_clear"): return
+	if not reverse: ids = get_jsonld_software_ids(type(instance), [instance.pk])
+	elif action == "post_clear": ids = getattr(instance, "_jsonld_cleared_ids", ())
+	else: ids = get_jsonld_software_ids(model, list(pk_set or ()))
+	defer_work(document_ids=ids)
+
+post_save.connect(on_jsonld_object_saved, dispatch_uid="jsonld_documents")
+pre_delete.connect(on_jsonld_object_pre_delete, dispatch_uid="jsonld_documents")
+post_delete.connect(on_jsonld_object_deleted, dispatch_uid="jsonld_documents")
+m2m_changed.connect(on_jsonld_relation_changed, dispatch_uid="jsonld_documents")
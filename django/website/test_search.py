@@ -0,0 +1,247 @@
+"""Tests for /api/search/ ranking and the interchangeable search engines."""
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from .models import (
+	GENERATION_CATALOG,
+	Generation,
+	Keyword,
+	Organization,
+	Person,
+	Region,
+	Software,
+	SoftwareSearchDocument,
+	VerifiedSoftware,
+)
+from .search import SEARCH_ENGINES, get_search_engine
+from .search.index import get_search_index
+from .testing import CommitTestCase
+
+
+class SearchEngineFixtureMixin:
+	"""Visible software that match the query 'solar' at different tiers."""
+
+	@classmethod
+	def setUpTestData(cls):
+		def publish(name: str, **kwargs) -> Software:
+			software = Software.objects.create(software_name=name, **kwargs)
+			VerifiedSoftware.create_verified(software)
+			return software
+
+		cls.by_name = publish("Solar Toolkit")
+		cls.by_description = publish("Alpha", description="Tools for solar wind data")
+		cls.by_keyword = publish("Beta")
+		cls.by_keyword.keywords.add(Keyword.objects.create(name="solar physics"))
+		cls.by_region = publish("Gamma")
+		cls.by_region.related_region.add(Region.objects.create(name="Solar Atmosphere"))
+		cls.by_author = publish("Delta")
+		cls.by_author.authors.add(Person.objects.create(given_name="Sol", family_name="Solarson"))
+		cls.by_funder = publish("Epsilon")
+		cls.by_funder.funder.add(Organization.objects.create(name="Solar Foundation"))
+		cls.by_repo = publish("Zeta", code_repository_url="https://example.com/solar")
+		cls.by_token = publish("Eta", description="wind models")
+
+		# matches both tier 1 and tier 4, so it must rank in tier 1
+		cls.multi_tier = publish("Aardvark Solar", code_repository_url="https://example.com/solar-2")
+
+		# never returned: unpublished or not matching
+		Software.objects.create(software_name="Solar Hidden")
+		publish("Unrelated")
+
+		cls.expected_order = [
+			cls.multi_tier,
+			cls.by_description,
+			cls.by_name,
+			cls.by_keyword,
+			cls.by_region,
+			cls.by_author,
+			cls.by_funder,
+			cls.by_repo,
+		]
+
+class SearchEngineOrderingTests(SearchEngineFixtureMixin, CommitTestCase):
+
+	def _search(self, engine: str, query: str) -> list[str]:
+		tokens = query.split()
+		return get_search_engine(engine).search({}, query, tokens)
+
+	def test_engines_rank_by_tier_then_name(self):
+		expected = [str(s.id) for s in self.expected_order]
+		for name in SEARCH_ENGINES:
+			with self.subTest(engine=name):
+				self.assertEqual(self._search(name, "solar"), expected)
+
+	def test_engines_agree_on_multi_token_queries(self):
+		reference = self._search("tiered", "solar wind")
+		self.assertIn(str(self.by_token.id), reference)
+		for name in SEARCH_ENGINES:
+			with self.subTest(engine=name):
+				self.assertEqual(self._search(name, "solar wind"), reference)
+
+	def test_engines_apply_field_filters_before_ranking(self):
+		expected = [str(self.by_keyword.id)]
+		for name in SEARCH_ENGINES:
+			with self.subTest(engine=name):
+				engine = get_search_engine(name)
+				self.assertEqual(
+					engine.search({"keyword": ["physics"]}, "solar", ["solar"]),
+					expected,
+				)
+				self.assertEqual(engine.search({"keyword": ["physics"]}, "", []), expected)
+
+	def test_postgres_engine_ranks_full_text_matches_after_tiers(self):
+		self.assertEqual(self._search("tiered", "modeling"), [])
+		self.assertEqual(self._search("postgres", "modeling"), [str(self.by_token.id)])
+
+		expected = self._search("tiered", "solar modeling")
+		self.assertNotIn(str(self.by_token.id), expected)
+		self.assertEqual(
+			self._search("postgres", "solar modeling"),
+			expected + [str(self.by_token.id)],
+		)
+
+	def test_ranked_engine_uses_one_query_for_all_tiers(self):
+		engine = get_search_engine("ranked")
+		base_qs = engine.get_base_queryset()
+		with self.assertNumQueries(1):
+			engine.rank(base_qs, "solar", ["solar"])
+
+class SearchDocumentTests(SearchEngineFixtureMixin, CommitTestCase):
+
+	def _document(self, software: Software) -> SoftwareSearchDocument:
+		return SoftwareSearchDocument.objects.get(software=software)
+
+	def test_documents_exist_only_for_visible_software(self):
+		visible_ids = set(VerifiedSoftware.objects.values_list("pk", flat=True))
+		document_ids = set(SoftwareSearchDocument.objects.values_list("software_id", flat=True))
+		self.assertEqual(document_ids, visible_ids)
+
+	def test_document_follows_software_and_relation_changes(self):
+		self.by_name.description = "Heliospheric Models"
+		with self.captureOnCommitCallbacks(execute=True): self.by_name.save()
+		self.assertIn("heliospheric models", self._document(self.by_name).tier_1)
+
+		keyword = self.by_keyword.keywords.get()
+		keyword.name = "Coronal Physics"
+		with self.captureOnCommitCallbacks(execute=True): keyword.save()
+		self.assertEqual(self._document(self.by_keyword).tier_2, "coronal physics")
+
+		with self.captureOnCommitCallbacks(execute=True):
+			self.by_keyword.keywords.remove(keyword)
+		self.assertEqual(self._document(self.by_keyword).tier_2, "")
+
+		with self.captureOnCommitCallbacks(execute=True):
+			keyword.softwares.add(self.by_region)
+		self.assertEqual(self._document(self.by_region).tier_2, "coronal physics")
+		with self.captureOnCommitCallbacks(execute=True): keyword.softwares.clear()
+		self.assertEqual(self._document(self.by_region).tier_2, "")
+
+	def test_deleting_related_object_refreshes_document(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			self.by_funder.funder.get().delete()
+		self.assertEqual(self._document(self.by_funder).tier_4_5, "")
+
+	def test_unpublishing_removes_document(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			VerifiedSoftware.objects.get(pk=self.by_name.pk).delete()
+		self.assertFalse(
+			SoftwareSearchDocument.objects.filter(software=self.by_name).exists()
+		)
+
+	def test_rebuild_command_restores_documents(self):
+		expected = {
+			doc.software_id: doc.tier_3 for doc in SoftwareSearchDocument.objects.all()
+		}
+		SoftwareSearchDocument.objects.all().delete()
+		call_command("rebuild_search_documents", batch_size=3)
+		rebuilt = {
+			doc.software_id: doc.tier_3 for doc in SoftwareSearchDocument.objects.all()
+		}
+		self.assertEqual(rebuilt, expected)
+		self.assertFalse(
+			SoftwareSearchDocument.objects.filter(search_vector__isnull=True).exists()
+		)
+		self.assertEqual(
+			get_search_engine("document").search({}, "solar", ["solar"]),
+			[str(s.id) for s in self.expected_order],
+		)
+
+	def test_transaction_refreshes_documents_once(self):
+		version = Generation.get_value(GENERATION_CATALOG)
+		with self.captureOnCommitCallbacks() as callbacks:
+			for name in ("First", "Second", "Third"):
+				self.by_name.description = name
+				self.by_name.save()
+				self.by_name.keywords.set([Keyword.objects.create(name=name)])
+		self.assertEqual(len(callbacks), 1)
+		self.assertEqual(Generation.get_value(GENERATION_CATALOG), version)
+
+		callbacks[0]()
+		self.assertEqual(Generation.get_value(GENERATION_CATALOG), version + 1)
+		self.assertEqual(self._document(self.by_name).tier_2, "third")
+
+class SearchIndexTests(SearchEngineFixtureMixin, CommitTestCase):
+
+	def test_index_matches_tiered_engine_with_field_filters(self):
+		tiered = get_search_engine("tiered")
+		index = get_search_engine("index")
+		cases = [
+			({"keyword": ["physics"]}, ""),
+			({"author": ["sol solarson"]}, ""),
+			({"repo": ["example.com"]}, "solar"),
+			({"name": ["a"], "description": ["wind"]}, "wind"),
+			({}, "solar wind"),
+			({}, "example.com/solar-2"),
+		]
+		for alias_groups, query in cases:
+			with self.subTest(alias_groups=alias_groups, query=query):
+				tokens = query.split()
+				self.assertEqual(
+					index.search(alias_groups, query, tokens),
+					tiered.search(alias_groups, query, tokens),
+				)
+
+	def test_index_only_checks_generation_once_built(self):
+		get_search_index()
+		with self.assertNumQueries(1):
+			get_search_engine("index").search({}, "solar", ["solar"])
+
+	def test_changes_bump_generation_and_rebuild_index(self):
+		index = get_search_index()
+		version = Generation.get_version(GENERATION_CATALOG)
+
+		with self.captureOnCommitCallbacks(execute=True):
+			self.by_token.keywords.add(Keyword.objects.create(name="solar cycle"))
+		self.assertNotEqual(Generation.get_version(GENERATION_CATALOG), version)
+		self.assertIsNot(get_search_index(), index)
+		self.assertIn(
+			str(self.by_token.id), 
+			get_search_engine("index").search({}, "cycle", ["cycle"]),
+		)
+
+		version = Generation.get_version(GENERATION_CATALOG)
+		self.by_token.software_name = "Theta"
+		with self.captureOnCommitCallbacks(execute=True): self.by_token.save()
+		self.assertNotEqual(Generation.get_version(GENERATION_CATALOG), version)
+		self.assertEqual(
+			get_search_engine("index").search({"name": ["theta"]}, "", []),
+			[str(self.by_token.id)],
+		)
+
+class SearchEndpointTests(SearchEngineFixtureMixin, CommitTestCase):
+
+	def test_endpoint_uses_configured_engine(self):
+		expected = [str(s.id) for s in self.expected_order]
+		for name in SEARCH_ENGINES:
+			with self.subTest(engine=name), override_settings(HSSI_SEARCH_ENGINE=name):
+				response = self.client.get("/api/search/", {"q": "solar", "mode": "id"})
+				self.assertEqual(response.status_code, 200)
+				self.assertEqual(response.json()["results"], expected)
+
+	def test_unknown_alias_is_searched_as_plain_text(self):
+		response = self.client.get(
+			"/api/search/", {"q": 'bogus:"solar"', "mode": "id"}
+		)
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response.json()["results"], [])
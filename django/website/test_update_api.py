@@ -6,21 +6,42 @@ USER view in partial mode. They assume a Postgres test database is
 available (Django creates one automatically via ``manage.py test``).
 """
 
+import json
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from .models import (
+	Award,
+	FunctionCategory,
+	InstrumentObservatory,
 	Keyword,
 	License,
+	Organization,
+	Person,
+	Region,
+	RelatedItem,
 	RepoStatus,
 	Software,
+	SoftwareJsonLd,
+	SoftwareVersion,
 	SubmissionInfo,
 	VerifiedSoftware,
 )
+from .models.serializers.jsonld import (
+	get_software_jsonld, get_versions, invalidate_jsonld, iter_software_jsonld, store_documents,
+)
+from .models.serializers.software import SoftwareSerializer
+from .models.serializers.submission import SubmissionSerializer
+from .models.serializers.submission_batch import save_submissions
+from .models.serializers.util import SerialView
+from .testing import CommitTestCase
 
 
 UPDATE_TOKEN = "test-token-please-ignore"
@@ -295,6 +316,25 @@ class SoftwareListJsonLdDumpTests(TestCase):
 			self.assertIn("@context", entry)
 			self.assertIn("codeRepository", entry)
 
+	def test_jsonld_is_negotiated_as_ld_json(self):
+		expected = self.client.get("/api/list/software/", {"view": "jsonld"})
+		self.assertEqual(expected["Content-Type"], "application/ld+json")
+		for response in (
+			self.client.get("/api/list/software/", HTTP_ACCEPT="application/ld+json"),
+			self.client.get("/api/list/software/", {"format": "jsonld"}),
+		):
+			self.assertEqual(response.status_code, status.HTTP_200_OK)
+			self.assertEqual(response["Content-Type"], "application/ld+json")
+			self.assertEqual(response.json(), expected.json())
+		plain = self.client.get("/api/list/software/")
+		self.assertEqual(plain["Content-Type"], "application/json")
+		self.assertIn("slug", plain.json()["data"][0])
+
+		# both representations share the url, so they can't share a validator
+		self.assertIn("Accept", plain["Vary"])
+		negotiated = self.client.get("/api/list/software/", HTTP_ACCEPT="application/ld+json")
+		self.assertNotEqual(plain["ETag"], negotiated["ETag"])
+
 	def test_jsonld_view_matches_the_detail_endpoint_output(self):
 		"""The dump is the same serialization as /api/view/, just batched."""
 		dump = self.client.get("/api/list/software/", {"view": "jsonld"})
@@ -318,3 +358,374 @@ class SoftwareListJsonLdDumpTests(TestCase):
 			with self.subTest(view=bad):
 				response = self.client.get("/api/list/software/", {"view": bad})
 				self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class SoftwareBulkJsonLdTests(CommitTestCase):
+	"""Bulk JSON-LD output is identical to per-record output, in constant queries."""
+
+	@classmethod
+	def setUpTestData(cls):
+		org = Organization.objects.create(
+			name="Example Org", identifier="https://ror.org/000000000"
+		)
+		parent = FunctionCategory.objects.create(name="Analysis")
+		child = FunctionCategory.objects.create(name="Spectral")
+		parent.children.add(child)
+		license = License.objects.create(name="MIT", url="https://opensource.org/mit")
+		status_ = RepoStatus.objects.create(name="Active", identifier="https://www.repostatus.org/#active")
+		for index in range(4):
+			software = Software.objects.create(
+				software_name=f"Bulk {index}",
+				code_repository_url=f"https://github.com/example/bulk-{index}",
+				license=license,
+				development_status=status_,
+				publisher=org,
+			)
+			author = Person.objects.create(
+				given_name="Ada", 
+				family_name=f"Author{index}",
+				identifier=f"https://orcid.org/0000-0000-0000-000{index}",
+			)
+			author.affiliation.add(org)
+			second_author = Person.objects.create(given_name="Bo", family_name=f"Second{index}")
+			software.authors.add(second_author, author)
+			software.software_functionality.add(parent, child)
+			software.keywords.add(Keyword.objects.create(name=f"keyword {index}"))
+			software.related_region.add(Region.objects.create(name=f"Region {index}"))
+			software.related_instruments.add(InstrumentObservatory.objects.create(
+				name=f"Instrument {index}", identifier=f"spase://instrument/{index}"
+			))
+			software.related_publications.add(RelatedItem.objects.create(
+				name=f"Paper {index}", identifier=f"https://doi.org/10.0/{index}"
+			))
+			software.award.add(Award.objects.create(name=f"Grant {index}", funder=org))
+			software.version.add(
+				SoftwareVersion.objects.create(number="1.0", version_pid="https://doi.org/10.1/1"),
+				SoftwareVersion.objects.create(number="2.0"),
+			)
+			SubmissionInfo.objects.create(software=software, submission_date=timezone.now())
+			VerifiedSoftware.create_verified(software)
+
+	def _serialize_each(self, queryset) -> list:
+		data = []
+		for software in queryset:
+			serializer = SoftwareSerializer(software)
+			serializer._view = SerialView.JSONLD
+			data.append(serializer.data)
+		return data
+
+	def test_bulk_output_is_byte_identical(self):
+		queryset = Software.objects.visible_software().order_by("software_name")
+		self.assertEqual(
+			json.dumps(SoftwareSerializer.serialize_jsonld_many(queryset), cls=DjangoJSONEncoder),
+			json.dumps(self._serialize_each(queryset), cls=DjangoJSONEncoder),
+		)
+
+	def test_bulk_query_count_does_not_grow_with_records(self):
+		queryset = Software.objects.visible_software().order_by("software_name")
+		counts = []
+		for limit in (1, 4):
+			# warm the visible slug cache so both runs read it the same way
+			VerifiedSoftware.get_visible_slugs()
+			with CaptureQueriesContext(connection) as queries:
+				SoftwareSerializer.serialize_jsonld_many(queryset[:limit])
+			counts.append(len(queries))
+		self.assertEqual(counts[0], counts[1])
+
+	def test_list_endpoint_uses_bulk_output(self):
+		response = APIClient().get("/api/list/software/", {"view": "jsonld"})
+		self.assertEqual(response.status_code, status.HTTP_200_OK)
+		data = response.json()["data"]
+		self.assertEqual(len(data), 4)
+		self.assertEqual(
+			data[0]["applicationSubCategory"], ["Analysis: Spectral"]
+		)
+
+
+class SoftwareJsonLdStoreTests(CommitTestCase):
+	"""Stored JSON-LD documents are reused until the catalog changes."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.software = Software.objects.create(
+			software_name="Stored",
+			code_repository_url="https://github.com/example/stored",
+		)
+		cls.author = Person.objects.create(given_name="Ada", family_name="Lovelace")
+		cls.software.authors.add(cls.author)
+		cls.software.keywords.add(Keyword.objects.create(name="stored keyword"))
+		VerifiedSoftware.create_verified(cls.software)
+
+	def test_stored_document_is_reused(self):
+		document = get_software_jsonld(self.software)
+		with self.assertNumQueries(1):
+			self.assertEqual(get_software_jsonld(self.software), document)
+		with self.assertNumQueries(2):
+			self.assertEqual(
+				list(iter_software_jsonld(Software.objects.filter(pk=self.software.pk))),
+				[(self.software.pk, document)],
+			)
+
+	def test_referenced_row_changes_rebuild_document(self):
+		get_software_jsonld(self.software)
+		self.author.family_name = "Byron"
+		with self.captureOnCommitCallbacks(execute=True): self.author.save()
+		self.assertIn(b'"familyName":"Byron"', get_software_jsonld(self.software))
+
+		keyword = self.software.keywords.get()
+		keyword.name = "renamed keyword"
+		with self.captureOnCommitCallbacks(execute=True): keyword.save()
+		self.assertIn(b'"renamed keyword"', get_software_jsonld(self.software))
+
+	def test_edits_only_invalidate_documents_that_include_them(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			other = Software.objects.create(software_name="Other")
+			other.keywords.add(Keyword.objects.create(name="other keyword"))
+		get_software_jsonld(self.software)
+		get_software_jsonld(other)
+
+		with self.captureOnCommitCallbacks(execute=True):
+			self.author.affiliation.add(Organization.objects.create(name="Analytical Society"))
+		self.assertFalse(SoftwareJsonLd.objects.filter(software=self.software).exists())
+		self.assertTrue(SoftwareJsonLd.objects.filter(software=other).exists())
+		self.assertIn(b'"Analytical Society"', get_software_jsonld(self.software))
+
+	def test_documents_rendered_before_a_change_are_not_served(self):
+		versions = get_versions([self.software.pk])
+		invalidate_jsonld([self.software.pk])
+		store_documents({self.software.pk: b"stale"}, versions, "")
+		self.assertNotEqual(get_software_jsonld(self.software), b"stale")
+
+	def test_endpoints_serve_the_same_document(self):
+		client = APIClient()
+		detail = client.get(
+			f"/api/data/software/{self.software.pk}/", {"view": "jsonld"}
+		).content
+		dump = client.get("/api/list/software/", {"view": "jsonld"}).content
+		search = self.client.get("/api/search/", {"q": "stored", "mode": "jsonld"}).content
+		self.assertEqual(dump, b'{"data":[' + detail + b"]}")
+		self.assertEqual(search, b'{"results":[' + detail + b"]}")
+
+
+class SoftwareHarvestStreamTests(CommitTestCase):
+	"""GET /api/harvest/software/ streams the same JSON-LD as the list dump."""
+
+	@classmethod
+	def setUpTestData(cls):
+		for name in ("Harvest A", "Harvest B", "Harvest C"):
+			software = Software.objects.create(
+				software_name=name,
+				code_repository_url=f"https://github.com/example/{name[-1].lower()}",
+			)
+			VerifiedSoftware.create_verified(software)
+		Software.objects.create(software_name="Harvest Hidden")
+
+	def setUp(self):
+		self.client = APIClient()
+
+	def _harvest(self, **params) -> list[dict]:
+		response = self.client.get("/api/harvest/software/", params)
+		self.assertEqual(response.status_code, status.HTTP_200_OK)
+		self.assertTrue(response.streaming)
+		body = b"".join(response.streaming_content)
+		return [json.loads(line) for line in body.splitlines()]
+
+	def test_ndjson_matches_list_dump(self):
+		records = self._harvest()
+		dump = self.client.get("/api/list/software/", {"view": "jsonld"}).json()["data"]
+		self.assertEqual(
+			sorted(json.dumps(record["data"]) for record in records),
+			sorted(json.dumps(entry) for entry in dump),
+		)
+		ids = [record["id"] for record in records]
+		self.assertEqual(ids, sorted(ids))
+
+	def test_json_output_is_a_single_document(self):
+		response = self.client.get("/api/harvest/software/", {"output": "json"})
+		self.assertEqual(response["Content-Type"], "application/json")
+		body = json.loads(b"".join(response.streaming_content))
+		self.assertEqual(body["data"], self._harvest())
+
+	def test_cursor_resumes_after_record(self):
+		records = self._harvest()
+		resumed = self._harvest(cursor=records[0]["id"])
+		self.assertEqual(resumed, records[1:])
+		self.assertEqual(self._harvest(cursor=records[-1]["id"]), [])
+
+	def test_invalid_parameters_return_400(self):
+		for params in ({"cursor": "not-a-uuid"}, {"output": "xml"}):
+			with self.subTest(params=params):
+				response = self.client.get("/api/harvest/software/", params)
+				self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+	def test_if_modified_since_returns_304(self):
+		response = self.client.get("/api/harvest/software/")
+		last_modified = response["Last-Modified"]
+		response = self.client.get(
+			"/api/harvest/software/", HTTP_IF_MODIFIED_SINCE=last_modified
+		)
+		self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+		with self.captureOnCommitCallbacks(execute=True):
+			Software.objects.get(software_name="Harvest A").save()
+		response = self.client.get(
+			"/api/harvest/software/", HTTP_IF_MODIFIED_SINCE="Thu, 01 Jan 2015 00:00:00 GMT"
+		)
+		self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ConditionalGetTests(CommitTestCase):
+	"""The public read endpoints answer 304 until the catalog changes."""
+
+	urls = [
+		"/api/search/?q=conditional",
+		"/api/list/software/",
+		"/api/list/software/?view=jsonld",
+		"/api/models/Keyword/rows/all/",
+		"/api/models/Keyword/choices/",
+		"/api/harvest/software/",
+	]
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.software = Software.objects.create(software_name="Conditional")
+		cls.software.keywords.add(Keyword.objects.create(name="conditional"))
+		VerifiedSoftware.create_verified(cls.software)
+		cls.urls = [*cls.urls, f"/api/data/software/{cls.software.pk}/"]
+
+	def test_matching_etag_returns_304(self):
+		for url in self.urls:
+			with self.subTest(url=url):
+				response = self.client.get(url)
+				self.assertEqual(response.status_code, status.HTTP_200_OK)
+				self.assertIn("no-cache", response["Cache-Control"])
+				self.assertTrue(response.has_header("Last-Modified"))
+				with self.assertNumQueries(1):
+					response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+				self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+	def test_catalog_change_invalidates_etag(self):
+		etags = {url: self.client.get(url)["ETag"] for url in self.urls}
+		self.assertEqual(len(set(etags.values())), len(self.urls))
+		with self.captureOnCommitCallbacks(execute=True):
+			self.software.keywords.get().save()
+		for url, etag in etags.items():
+			with self.subTest(url=url):
+				response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+				self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SubmissionBatchTests(TestCase):
+	"""POST /api/submission/ saves a batch like the per-record path, in bulk."""
+
+	@classmethod
+	def setUpTestData(cls):
+		License.objects.create(name="MIT")
+		RepoStatus.objects.create(name="Active")
+		parent = FunctionCategory.objects.create(name="Analysis")
+		child = FunctionCategory.objects.create(name="Spectral")
+		parent.children.add(child)
+		Region.objects.create(name="Earth")
+		Person.objects.create(identifier="https://orcid.org/0000-0000-0000-0001")
+		Keyword.objects.create(name="Existing")
+
+	def _payload(self, index: int) -> dict:
+		return {
+			"submitter": [{
+				"email": "Submitter@example.com",
+				"person": {"given_name": "Sam", "family_name": "Submitter"},
+			}],
+			"software_name": f"Batch {index}",
+			"code_repository_url": f"https://github.com/example/batch-{index}",
+			"description": "A batch submission.",
+			"license": "mit",
+			"development_status": "Active",
+			"publisher": {"name": "Example Org", "identifier": "https://ror.org/000000000"},
+			"authors": [
+				{
+					"given_name": "Ada",
+					"family_name": "Author",
+					"identifier": "https://orcid.org/0000-0000-0000-0001",
+					"affiliation": [{"name": "example org"}],
+				},
+				{"given_name": "Bo", "family_name": f"Second{index}"},
+			],
+			"software_functionality": ["Analysis: Spectral", "Analysis"],
+			"related_region": ["Earth"],
+			"keywords": ["existing", f"keyword {index}", "shared"],
+			"related_instruments": [{"name": "Imager"}],
+			"related_publications": [f"https://doi.org/10.0/{index}"],
+			"award": [{"name": "Grant", "identifier": "GRANT-1"}],
+			"version": {"number": "1.0", "release_date": "2024-01-01"},
+		}
+
+	def _summarize(self, softwares: list[Software]) -> list:
+		summary = []
+		for software in Software.objects.filter(
+			pk__in=[software.pk for software in softwares]
+		).order_by("software_name"):
+			authors = list(software.authors.all())
+			summary.append([
+				software.software_name,
+				software.license.name,
+				software.development_status.name,
+				software.publisher.name,
+				[(author.given_name, author.family_name) for author in authors],
+				[[org.name for org in author.affiliation.all()] for author in authors],
+				[item.name for item in software.software_functionality.all()],
+				[item.name for item in software.related_region.all()],
+				[item.name for item in software.keywords.all()],
+				[item.name for item in software.related_instruments.all()],
+				[item.identifier for item in software.related_publications.all()],
+				[item.identifier for item in software.award.all()],
+				[version.number for version in software.version.all()],
+				[
+					submitter.email for info in software.submission_info.all()
+					for submitter in info.submitter.all()
+				],
+			])
+		counts = [
+			model.objects.count() 
+			for model in (Keyword, Person, Organization, InstrumentObservatory, Award, RelatedItem)
+		]
+		return [summary, counts]
+
+	def test_batch_matches_single_path(self):
+		payload = [self._payload(index) for index in range(3)]
+		with transaction.atomic():
+			softwares = []
+			for item in payload:
+				serializer = SubmissionSerializer(data=item)
+				serializer._view = SerialView.USER
+				serializer.is_valid(raise_exception=True)
+				softwares.append(serializer.save())
+			expected = self._summarize(softwares)
+			transaction.set_rollback(True)
+
+		response = APIClient().post("/api/submission/", payload, format="json")
+		self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+		ids = [result["softwareId"] for result in response.json()["results"]]
+		self.assertEqual(
+			self._summarize(list(Software.objects.filter(pk__in=ids))), expected
+		)
+		self.assertEqual(
+			Person.objects.get(identifier="https://orcid.org/0000-0000-0000-0001").family_name,
+			"Author",
+		)
+
+	def test_invalid_item_saves_nothing(self):
+		payload = [self._payload(0), {**self._payload(1), "license": "Unknown"}]
+		response = APIClient().post("/api/submission/", payload, format="json")
+		self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+		self.assertFalse(Software.objects.exists())
+
+	def test_query_count_does_not_grow_with_records(self):
+		# the first batch also fills in the name of the existing author
+		save_submissions([self._payload(0)])
+		counts = []
+		for offset, size in ((1, 10), (11, 100)):
+			payload = [self._payload(offset + index) for index in range(size)]
+			with CaptureQueriesContext(connection) as queries:
+				save_submissions(payload)
+			counts.append(len(queries))
+		self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,14 @@
+"""Shared helpers of the website test modules."""
+
+from django.test import TestCase
+
+class CommitTestCase(TestCase):
+	"""
+	A TestCase that runs the work the signal receivers defer to the end of the
+	transaction once setUpTestData is done, since TestCase never commits. Tests
+	wrap their own writes in captureOnCommitCallbacks(execute=True).
+	"""
+
+	@classmethod
+	def setUpClass(cls):
+		with cls.captureOnCommitCallbacks(execute=True): super().setUpClass()
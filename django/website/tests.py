@@ -1,21 +1,81 @@
 import datetime
+import hashlib
 import json
 import re
+import threading
+import time
 import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from unittest import mock
 
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.mail.backends import locmem
+from django.core.serializers import serialize
 from django.urls import reverse
-from django.test import SimpleTestCase, TestCase
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from .models import (
+	BackgroundJob,
+	BackgroundJobStatus,
 	DataInput,
+	Organization,
+	Person,
 	FunctionCategory,
+	GENERATION_CATALOG,
+	Generation,
+	InstrObsType,
+	InstrumentObservatory,
+	Keyword,
+	License,
+	OutboundEmail,
+	OutboundEmailStatus,
 	ProgrammingLanguage,
 	Region,
+	RelatedItem,
+	RepoApiResponse,
 	Software,
 	SoftwareVersion,
+	SubmissionInfo,
+	Submitter,
 	VerifiedSoftware,
 )
-from .util import build_software_filter_query, shorten_software_filter_value
+from .data_parser import apply_function_category
+from . import metadata
+from .metadata import (
+	GithubClient, GitlabClient, RepoApiClient, get_metadata, get_metadata_client,
+)
+from .repo_refresh import refresh_repo_metadata
+from . import describe
+from .describe import (
+	DESCRIBE_CACHE, DescribeError, describe_repository, describe_repository_async, get_head_commit,
+)
+from .forms.names import FIELD_SOFTWARENAME
+from .forms.payload import get_structure_payload, get_structures_url
+from .models.structurizer import registered_structures
+from .models.expansion import SerializedDataExpander
+from .admin.hssi_admin_site import admin_site
+from .admin import fetch_vocab
+from .crawler import HttpCrawler
+from .admin.fetch_vocab import fetch_heliophysnet_vocab
+from .admin.model_admin import SoftwareAdmin
+from .jobs import (
+	JOB_DESCRIBE_REPOSITORY, JOB_FETCH_HELIOPHYSICS_API, JOB_FETCH_VOCAB, JOB_FUNCTIONS,
+	JOB_STALE_AFTER, claim_next_job, enqueue_job, run_queued_jobs,
+)
+from .outbox import (
+	OUTBOX_MAX_ATTEMPTS, OUTBOX_RETRY_DELAY, get_retry_delay, send_all_queued_emails,
+	send_queued_emails,
+)
+from .views.edit_submission import email_edit_link
+from .util import AccessLevel, build_software_filter_query, shorten_software_filter_value
+from .testing import CommitTestCase
 
 FILTER_CASES = [
 	("data_sources",           DataInput,            "a1f8de3a-1bde-4995-94e5-e88e841a62a6", "ofjeOhvds"),
@@ -272,3 +332,1063 @@ class SoftwareApiViewParamTests(TestCase):
 					f"/api/view/software/{self.software.pk}/?view={viewstr}"
 				)
 				self.assertEqual(response.status_code, 200)
+
+
+class VisibleSoftwareCacheTests(TestCase):
+	"""The cached visible set follows publishing and unpublishing."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.software = Software.objects.create(software_name="Cached Visible")
+		VerifiedSoftware.create_verified(cls.software)
+		cls.hidden = Software.objects.create(software_name="Cached Hidden")
+
+	def test_visible_slugs_are_cached(self):
+		self.assertEqual(
+			VerifiedSoftware.get_visible_slugs(),
+			{self.software.pk: "cached-visible"},
+		)
+		# only the generation is read once the set is cached
+		with self.assertNumQueries(1):
+			self.assertIn(self.software.pk, VerifiedSoftware.get_visible_ids())
+
+	def test_visible_software_filters_with_a_subquery(self):
+		queryset = Software.objects.visible_software()
+		self.assertIn("IN (SELECT", str(queryset.query))
+		self.assertEqual(list(queryset), [self.software])
+
+	def test_unpublishing_invalidates_cache(self):
+		path = f"/api/data/software/{self.software.pk}/"
+		self.assertEqual(self.client.get(path).status_code, 200)
+		VerifiedSoftware.objects.filter(pk=self.software.pk).delete()
+		self.assertNotIn(self.software.pk, VerifiedSoftware.get_visible_ids())
+		self.assertEqual(self.client.get(path).status_code, 404)
+
+	def test_mark_visible_action_invalidates_cache(self):
+		self.assertNotIn(self.hidden.pk, VerifiedSoftware.get_visible_ids())
+		request = RequestFactory().post("/admin/")
+		request.user = User.objects.create_superuser("admin", "admin@example.com", "pwd")
+		SoftwareAdmin(Software, admin_site).mark_visible(
+			request, Software.objects.filter(pk=self.hidden.pk)
+		)
+		self.assertIn(self.hidden.pk, VerifiedSoftware.get_visible_ids())
+		response = self.client.get("/api/list/software/")
+		self.assertIn(
+			"cached-hidden", 
+			[entry["slug"] for entry in response.json()["data"]],
+		)
+
+
+class ModelRowsPaginationTests(TestCase):
+	"""GET /api/models/<model>/rows/all/ pages rows by id with ?limit=."""
+
+	path = "/api/models/Keyword/rows/all/"
+
+	@classmethod
+	def setUpTestData(cls):
+		for index in range(5):
+			Keyword.objects.create(name=f"keyword {index}")
+		cls.ids = sorted(str(pk) for pk in Keyword.objects.values_list("pk", flat=True))
+
+	def test_pages_follow_next_cursor(self):
+		ids: list[str] = []
+		params = {"limit": 2, "columns": "id,name"}
+		while True:
+			body = self.client.get(self.path, params).json()
+			self.assertLessEqual(len(body["data"]), 2)
+			self.assertTrue(all(set(row) == {"id", "name"} for row in body["data"]))
+			ids.extend(row["id"] for row in body["data"])
+			if body["next"] is None: break
+			params["cursor"] = body["next"]
+		self.assertEqual(ids, self.ids)
+
+	def test_exact_last_page_has_no_next(self):
+		body = self.client.get(self.path, {"limit": 5}).json()
+		self.assertEqual(len(body["data"]), 5)
+		self.assertIsNone(body["next"])
+
+	def test_unpaged_request_returns_every_row(self):
+		body = self.client.get(self.path).json()
+		self.assertEqual(sorted(row["id"] for row in body["data"]), self.ids)
+		self.assertIsNone(body["next"])
+
+	def test_invalid_page_params_return_400(self):
+		for params in ({"limit": 0}, {"limit": "ten"}, {"limit": 100000}, {"cursor": "nope"}):
+			with self.subTest(params=params):
+				self.assertEqual(self.client.get(self.path, params).status_code, 400)
+
+
+class ModelChoicesTests(CommitTestCase):
+	"""GET /api/models/<model>/choices/ serves cached choices built in bulk."""
+
+	@classmethod
+	def setUpTestData(cls):
+		for index in range(3):
+			software = Software.objects.create(software_name=f"Choice {index}")
+			VerifiedSoftware.create_verified(software)
+		RelatedItem.objects.create(name="Software", type=1)
+		RelatedItem.objects.create(name="Dataset", type=2)
+
+	def setUp(self):
+		# the generation is rolled back between tests but stored choices aren't
+		cache.clear()
+
+	def get_choices(self, model_name: str, params: dict = None) -> list:
+		return self.client.get(f"/api/models/{model_name}/choices/", params).json()["data"]
+
+	def test_choices_match_each_object_choice(self):
+		for model in (VerifiedSoftware, RelatedItem):
+			with self.subTest(model=model.__name__):
+				expected = json.loads(json.dumps([obj.get_choice() for obj in model.objects.all()]))
+				self.assertEqual(self.get_choices(model.__name__), expected)
+
+	def test_set_choices_are_fetched_in_bulk(self):
+		# the generation, the set ids and the targets
+		with self.assertNumQueries(3):
+			self.assertEqual(len(self.get_choices("VerifiedSoftware")), 3)
+		# the generation only, once cached
+		with self.assertNumQueries(1):
+			self.get_choices("VerifiedSoftware")
+
+	def test_model_change_invalidates_choices(self):
+		self.get_choices("VerifiedSoftware")
+		software = Software.objects.get(software_name="Choice 0")
+		software.software_name = "Renamed Choice"
+		with self.captureOnCommitCallbacks(execute=True): software.save()
+		names = [choice[1] for choice in self.get_choices("VerifiedSoftware")]
+		self.assertIn("Renamed Choice", names)
+
+	def test_filters_are_parsed_as_literals(self):
+		names = [choice[1] for choice in self.get_choices("RelatedItem", {"type": "2"})]
+		self.assertEqual(len(names), 1)
+		self.assertIn("Dataset", names[0])
+
+	def test_invalid_filters_return_400(self):
+		for params in (
+			{"nope": "1"},
+			{"software__software_name": "Choice 0"},
+			{"type__regex": ".*"},
+			{"type__in": "1"},
+			{"type": "__import__('os')"},
+		):
+			with self.subTest(params=params):
+				response = self.client.get("/api/models/RelatedItem/choices/", params)
+				self.assertEqual(response.status_code, 400)
+
+
+class ModelBootstrapTests(CommitTestCase):
+	"""GET /api/models/bootstrap/ combines the structures with their choices."""
+
+	path = "/api/models/bootstrap/"
+
+	@classmethod
+	def setUpTestData(cls):
+		Keyword.objects.create(name="bootstrap")
+
+	def setUp(self):
+		cache.clear()
+
+	def test_bootstrap_matches_separate_endpoints(self):
+		body = self.client.get(self.path).json()
+		self.assertEqual(body["structures"], self.client.get("/api/models/structures/").json())
+		self.assertIn("Keyword", body["choices"])
+		self.assertIn("InstrumentObservatory|type=1", body["choices"])
+		for key, choices in body["choices"].items():
+			with self.subTest(key=key):
+				model_name, _, model_filter = key.partition("|")
+				path = f"/api/models/{model_name}/choices/?{model_filter}"
+				self.assertEqual(choices, self.client.get(path).json())
+
+	def test_versioned_url_is_immutable(self):
+		response = self.client.get("/submit/")
+		url = response.context["bootstrap_url"]
+		self.assertContains(response, url.replace("&", "&amp;"))
+		response = self.client.get(url)
+		self.assertIn("immutable", response["Cache-Control"])
+		self.assertNotIn("no-cache", response["Cache-Control"])
+
+		# a stale version is served fresh data that has to be revalidated
+		with self.captureOnCommitCallbacks(execute=True):
+			Keyword.objects.create(name="bootstrap 2")
+		response = self.client.get(url)
+		self.assertIn("no-cache", response["Cache-Control"])
+		names = [choice[1] for choice in response.json()["choices"]["Keyword"]["data"]]
+		self.assertIn("Bootstrap 2", names)
+
+	def test_unknown_structure_returns_400(self):
+		response = self.client.get(self.path, {"structures": "SubmissionForm_1,Nope"})
+		self.assertEqual(response.status_code, 400)
+
+
+class ModelStructurePayloadTests(TestCase):
+	"""GET /api/models/structures/ serves the payload encoded at startup."""
+
+	path = "/api/models/structures/"
+
+	def test_payload_is_served_unchanged(self):
+		payload = get_structure_payload()
+		with self.assertNumQueries(0):
+			response = self.client.get(self.path)
+		self.assertEqual(response.content, payload.content)
+		self.assertEqual(response.json()["data"][0], next(iter(registered_structures.values())).serialized())
+		self.assertIn("no-cache", response["Cache-Control"])
+		response = self.client.get(self.path, HTTP_IF_NONE_MATCH=response["ETag"])
+		self.assertEqual(response.status_code, 304)
+
+	def test_release_url_is_immutable(self):
+		url = get_structures_url()
+		self.assertContains(self.client.get("/api/models/Software/form/"), url)
+		response = self.client.get(url)
+		self.assertIn("immutable", response["Cache-Control"])
+		self.assertNotIn("no-cache", response["Cache-Control"])
+
+
+class SerializedDataTests(TestCase):
+	"""get_serialized_data reads the same values the django serializers write."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.region = Region.objects.create(name="Heliosphere")
+		cls.region.children.add(Region.objects.create(name="Inner"))
+		for index in range(3):
+			software = Software.objects.create(
+				software_name=f"Serialized {index}",
+				publication_date=datetime.date(2024, 1, index + 1),
+			)
+			software.related_region.add(cls.region)
+			software.keywords.add(Keyword.objects.create(name=f"serialized {index}"))
+			VerifiedSoftware.create_verified(software)
+
+	def test_matches_django_serializer(self):
+		for software in Software.objects.all():
+			expected = json.loads(serialize("json", [software]))[0]["fields"]
+			data = software.get_serialized_data(AccessLevel.ADMIN)
+			self.assertEqual(data.pop("id"), str(software.id))
+			self.assertEqual(data.pop("scix_url"), None)
+			self.assertEqual(data, expected)
+
+	def test_fields_restrict_the_data(self):
+		software = Software.objects.first()
+		self.assertEqual(
+			software.get_serialized_data(AccessLevel.ADMIN, fields=["software_name", "keywords"]),
+			{
+				"software_name": software.software_name, 
+				"keywords": [str(software.keywords.get().pk)],
+				"scix_url": None,
+			},
+		)
+
+	def test_many_uses_constant_queries(self):
+		fields = ["software_name", "keywords", "related_region"]
+		with self.assertNumQueries(3):
+			data = Software.get_serialized_data_many(
+				Software.objects.all(), AccessLevel.ADMIN, fields=fields
+			)
+		self.assertEqual(len(data), 3)
+		with self.assertNumQueries(4):
+			data = VerifiedSoftware.get_serialized_data_many(
+				VerifiedSoftware.objects.all(), AccessLevel.ADMIN, fields=fields
+			)
+		self.assertEqual(len(data), 3)
+		with self.assertNumQueries(3):
+			data = Region.get_serialized_data_many(Region.objects.all(), AccessLevel.ADMIN)
+		self.assertEqual(data[0]["children"], [self.region.children.get().pk])
+
+
+class SerializedDataExpansionTests(TestCase):
+	"""Recursive serialized data fetches each model once per level."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.softwares: list[Software] = []
+		for index in range(4):
+			software = Software.objects.create(software_name=f"Expanded {index}")
+			author = Person.objects.create(given_name="Ada", family_name=f"Expanded{index}")
+			author.affiliation.add(Organization.objects.create(name=f"Org {index}"))
+			software.authors.add(author)
+			cls.softwares.append(software)
+
+	def _count_queries(self, count: int) -> int:
+		with CaptureQueriesContext(connection) as queries:
+			data = Software.get_serialized_data_many(
+				Software.objects.filter(pk__in=[s.pk for s in self.softwares[:count]]),
+				AccessLevel.ADMIN,
+				recursive=True,
+			)
+		self.assertEqual(len(data), count)
+		return len(queries)
+
+	def test_expands_nested_references(self):
+		software = self.softwares[0]
+		data = software.get_serialized_data(AccessLevel.ADMIN, True)
+		author = software.authors.get()
+		self.assertEqual(data["authors"][0]["id"], str(author.id))
+		self.assertEqual(
+			data["authors"][0]["affiliation"][0]["name"], 
+			author.affiliation.get().name,
+		)
+
+	def test_query_count_does_not_grow_with_rows(self):
+		self.assertEqual(self._count_queries(1), self._count_queries(4))
+
+	def test_cycles_are_left_as_ids(self):
+		region = Region.objects.create(name="Looped")
+		data = {"id": str(region.pk), "children": [str(region.pk)]}
+		expanded = SerializedDataExpander(AccessLevel.ADMIN).expand([(Region, region.pk, data)])
+		self.assertEqual(expanded[0]["children"], [str(region.pk)])
+
+
+class GraphListFullNameTests(CommitTestCase):
+	"""Full names of graph lists are stored and follow parent changes."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.root = FunctionCategory.objects.create(name="Data Processing")
+		cls.child = FunctionCategory.objects.create(name="Calibration")
+		cls.leaf = FunctionCategory.objects.create(name="Flat Field")
+		cls.root.children.add(cls.child)
+		cls.child.children.add(cls.leaf)
+
+	def _stored(self, obj) -> str:
+		return type(obj).objects.values_list("full_name", flat=True).get(pk=obj.pk)
+
+	def test_full_names_are_read_without_queries(self):
+		leaf = FunctionCategory.objects.get(pk=self.leaf.pk)
+		with self.assertNumQueries(0):
+			self.assertEqual(str(leaf), "Data Processing: Calibration: Flat Field")
+			self.assertEqual(leaf.get_choice().name, "Data Processing: Calibration: Flat Field")
+
+	def test_renaming_and_moving_update_descendants(self):
+		root = FunctionCategory.objects.get(pk=self.root.pk)
+		root.name = "Processing"
+		with self.captureOnCommitCallbacks(execute=True): root.save()
+		self.assertEqual(self._stored(self.leaf), "Processing: Calibration: Flat Field")
+
+		with self.captureOnCommitCallbacks(execute=True):
+			self.root.children.remove(self.child)
+		self.assertEqual(self._stored(self.leaf), "Calibration: Flat Field")
+		self.assertEqual(FunctionCategory.update_full_names(), 0)
+
+	def test_full_names_are_not_exposed(self):
+		rows = self.client.get("/api/models/FunctionCategory/rows/all/").json()["data"]
+		self.assertTrue(rows)
+		self.assertTrue(all("full_name" not in row for row in rows))
+		self.assertNotIn(
+			"full_name", [field.name for field in FunctionCategory.get_subfields()]
+		)
+
+	def test_region_full_names_drop_repeated_parent_name(self):
+		with self.captureOnCommitCallbacks(execute=True):
+			sun = Region.objects.create(name="Sun")
+			interior = Region.objects.create(name="Sun Interior")
+			sun.children.add(interior)
+		self.assertEqual(self._stored(interior), "Sun: Interior")
+		self.assertEqual(Region.build_full_names()[interior.pk], "Sun: Interior")
+
+
+class GraphPathResolverTests(TestCase):
+	"""Full name paths resolve from a cached index of each graph list."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.root = FunctionCategory.objects.create(name="Data Processing")
+		cls.child = FunctionCategory.objects.create(name="Calibration")
+		cls.other_root = FunctionCategory.objects.create(name="Modeling")
+		cls.other_child = FunctionCategory.objects.create(name="Calibration")
+		cls.root.children.add(cls.child)
+		cls.other_root.children.add(cls.other_child)
+
+	def test_paths_resolve_with_constant_queries(self):
+		FunctionCategory.get_object_with_full_name("Data Processing")
+		with self.assertNumQueries(2):
+			self.assertEqual(
+				FunctionCategory.get_object_with_full_name("Modeling: Calibration"),
+				self.other_child,
+			)
+		self.assertIsNone(FunctionCategory.get_object_with_full_name("Unknown"))
+		with self.assertRaises(Exception):
+			FunctionCategory.get_object_with_full_name("Data Processing: Unknown")
+
+	def test_graph_edits_invalidate_index(self):
+		FunctionCategory.get_object_with_full_name("Data Processing")
+		leaf = FunctionCategory.objects.create(name="Flat Field")
+		self.child.children.add(leaf)
+		self.assertEqual(
+			FunctionCategory.get_object_with_full_name("Data Processing: Calibration: Flat Field"),
+			leaf,
+		)
+
+	def test_apply_function_category_resolves_names(self):
+		software = Software.objects.create(software_name="Categorized")
+		apply_function_category(
+			software, ["Modeling: Calibration", "Data Processing", str(self.child.pk)]
+		)
+		self.assertEqual(
+			set(software.software_functionality.all()),
+			{self.other_child, self.root, self.child},
+		)
+		with self.assertRaises(Exception):
+			apply_function_category(software, ["Modeling: Unknown"])
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+	def send_messages(self, messages):
+		raise ConnectionError("smtp unavailable")
+
+
+class OutboundEmailTests(TestCase):
+	"""Edit link emails are queued and sent by the outbox worker."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.software = Software.objects.create(software_name="Outbox")
+		person = Person.objects.create(given_name="Ada", family_name="Outbox")
+		submitter = Submitter.objects.create(email="ada@example.com", person=person)
+		cls.info = SubmissionInfo.objects.create(software=cls.software)
+		cls.info.submitter.set([submitter])
+
+	def test_edit_link_is_queued_then_sent(self):
+		for _ in range(3): email_edit_link(self.info)
+		self.assertEqual(len(mail.outbox), 0)
+		self.assertEqual(OutboundEmail.objects.count(), 3)
+
+		self.assertEqual(send_all_queued_emails(batch_size=2), (3, 0))
+		self.assertEqual(len(mail.outbox), 3)
+		self.assertEqual(mail.outbox[0].to, ["ada@example.com"])
+		self.assertIn("Outbox", mail.outbox[0].subject)
+		self.assertFalse(
+			OutboundEmail.objects.exclude(status=OutboundEmailStatus.SENT).exists()
+		)
+		# nothing is sent twice
+		self.assertEqual(send_all_queued_emails(), (0, 0))
+
+	@override_settings(EMAIL_BACKEND="website.tests.FailingEmailBackend")
+	def test_failures_back_off_until_given_up(self):
+		email = OutboundEmail.enqueue("subject", "body", None, ["ada@example.com"])
+		self.assertEqual(send_all_queued_emails(), (0, 1))
+		email.refresh_from_db()
+		self.assertEqual(email.status, OutboundEmailStatus.PENDING)
+		self.assertEqual(email.attempts, 1)
+		self.assertIn("smtp unavailable", email.last_error)
+		self.assertGreater(email.next_attempt, timezone.now())
+		# not due again until the backoff passes
+		self.assertEqual(send_all_queued_emails(), (0, 0))
+
+		for _ in range(2, OUTBOX_MAX_ATTEMPTS + 1):
+			OutboundEmail.objects.filter(pk=email.pk).update(next_attempt=timezone.now())
+			send_all_queued_emails()
+		email.refresh_from_db()
+		self.assertEqual(email.status, OutboundEmailStatus.FAILED)
+		self.assertEqual(email.attempts, OUTBOX_MAX_ATTEMPTS)
+		self.assertEqual(get_retry_delay(1), OUTBOX_RETRY_DELAY)
+		self.assertEqual(get_retry_delay(2), OUTBOX_RETRY_DELAY * 2)
+
+	def test_claim_is_committed_before_sending(self):
+		for _ in range(2): OutboundEmail.enqueue("subject", "body", None, ["ada@example.com"])
+		# the worker loses the database after sending the first email
+		with mock.patch.object(OutboundEmail, "save", side_effect=ConnectionError("db gone")):
+			with self.assertRaises(ConnectionError): send_queued_emails()
+		self.assertEqual(len(mail.outbox), 1)
+
+		# the claimed emails aren't sent again until their lease runs out
+		self.assertEqual(send_all_queued_emails(), (0, 0))
+		self.assertEqual(len(mail.outbox), 1)
+		OutboundEmail.objects.update(next_attempt=timezone.now())
+		self.assertEqual(send_all_queued_emails(), (2, 0))
+		self.assertEqual(
+			list(OutboundEmail.objects.values_list("attempts", flat=True)), [2, 2]
+		)
+
+
+def sample_job(job: BackgroundJob, count: int) -> dict:
+	for index in range(count): job.report(f"item {index}", index + 1, count)
+	return {"count": count}
+
+
+def failing_job(job: BackgroundJob) -> None:
+	job.report("starting")
+	raise RuntimeError("fetch failed")
+
+
+@mock.patch.dict(JOB_FUNCTIONS, {
+	"sample": "website.tests.sample_job",
+	"failing": "website.tests.failing_job",
+})
+class BackgroundJobTests(TestCase):
+	"""Admin fetches are queued as jobs and run by the job worker."""
+
+	def setUp(self):
+		self.user = User.objects.create_superuser("admin", "admin@example.com", "pwd")
+		self.client.force_login(self.user)
+
+	def test_admin_fetch_is_queued_once(self):
+		response = self.client.post("/admin/fetch_vocab/")
+		self.assertEqual(response.status_code, 302)
+		self.client.post("/admin/fetch_vocab/")
+		job = BackgroundJob.objects.get()
+		self.assertEqual(job.kind, JOB_FETCH_VOCAB)
+		self.assertEqual(job.status, BackgroundJobStatus.QUEUED)
+
+		status = self.client.get("/admin/job_status/").json()
+		self.assertTrue(status[JOB_FETCH_VOCAB]["active"])
+		self.assertIsNone(status[JOB_FETCH_HELIOPHYSICS_API])
+		self.assertContains(self.client.get("/admin/"), "data-hssi-job-active")
+
+	def test_worker_runs_jobs_with_progress(self):
+		job = enqueue_job("sample", count=3)
+		failed = enqueue_job("failing")
+		self.assertEqual(run_queued_jobs(), 2)
+
+		job.refresh_from_db()
+		self.assertEqual(job.status, BackgroundJobStatus.SUCCEEDED)
+		self.assertEqual(job.result, {"count": 3})
+		self.assertEqual((job.progress_current, job.progress_total), (3, 3))
+		self.assertEqual(
+			list(job.progress.values_list("message", flat=True)), 
+			["item 0", "item 1", "item 2"],
+		)
+		self.assertIsNotNone(job.finished)
+
+		failed.refresh_from_db()
+		self.assertEqual(failed.status, BackgroundJobStatus.FAILED)
+		self.assertIn("fetch failed", failed.error)
+		self.assertEqual(failed.message, "starting")
+
+		# finished jobs are not reused by new requests
+		self.assertNotEqual(enqueue_job("sample", count=3).pk, job.pk)
+
+	def test_jobs_of_dead_workers_are_failed(self):
+		# the worker claims the job and is killed before it finishes
+		job = enqueue_job("sample", count=1)
+		self.assertEqual(claim_next_job().pk, job.pk)
+		self.assertEqual(enqueue_job("sample", count=1).pk, job.pk)
+
+		# jobs that are still reporting progress are left running
+		long_ago = timezone.now() - JOB_STALE_AFTER * 2
+		BackgroundJob.objects.filter(pk=job.pk).update(started=long_ago)
+		job.report("still working")
+		self.assertEqual(enqueue_job("sample", count=1).pk, job.pk)
+		self.assertIsNone(claim_next_job())
+
+		job.progress.update(created=long_ago)
+		retry = enqueue_job("sample", count=1)
+		self.assertNotEqual(retry.pk, job.pk)
+		self.assertEqual(claim_next_job().pk, retry.pk)
+		job.refresh_from_db()
+		self.assertEqual(job.status, BackgroundJobStatus.FAILED)
+		self.assertIn("worker stopped", job.error)
+		self.assertIsNotNone(job.finished)
+
+	def test_job_status_requires_superuser(self):
+		self.client.logout()
+		self.assertEqual(self.client.get("/admin/job_status/").status_code, 403)
+		self.client.post("/admin/fetch_heliophys_api/")
+		self.assertFalse(BackgroundJob.objects.exists())
+
+
+class HeliophysicsStubHandler(BaseHTTPRequestHandler):
+	"""A stand in for the heliophysics.net and HelioData APIs."""
+
+	requests: list[str] = []
+
+	def do_GET(self):
+		self.requests.append(self.path)
+		parts = [part for part in self.path.split("/") if part]
+		body: Any = None
+		status = 200
+		if parts == ["api", "observatories"]:
+			body = [{"id": f"obs{index}"} for index in range(20)] + [{"name": "no id"}]
+		elif parts[:2] == ["api", "observatories"]:
+			index = int(parts[2][3:])
+			# the first request for one of the items fails
+			if index == 7 and self.requests.count(self.path) == 1: status = 503
+			body = {
+				"long_name": f"Stub Observatory {index} (SO{index})",
+				"short_name": f"SO{index}",
+				"description": f"observatory {index}",
+				"spase_id": None if index == 3 else f"spase://SMWG/Observatory/Stub{index}",
+			}
+		elif parts[0] == "heliodata":
+			body = {"datasetCount": int(parts[1][3:]) % 2}
+		else: status = 404
+		content = json.dumps(body).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(content)))
+		self.end_headers()
+		self.wfile.write(content)
+
+	def log_message(self, *args): pass
+
+
+class HeliophysicsCrawlerTests(TestCase):
+	"""The heliophysics.net vocab is crawled concurrently and saved in bulk."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.server = ThreadingHTTPServer(("127.0.0.1", 0), HeliophysicsStubHandler)
+		threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+		cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/"
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+		super().tearDownClass()
+
+	def setUp(self):
+		HeliophysicsStubHandler.requests = []
+		patcher = mock.patch.multiple(
+			fetch_vocab,
+			HELIOPHYS_API_URL=self.base_url + "api/",
+			HELIODATA_LOAD_MISSION_URL=self.base_url + "heliodata/",
+		)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_crawl_creates_and_updates_entries(self):
+		existing = InstrumentObservatory.objects.create(
+			name="Old name", 
+			identifier="https://spase-metadata.org/SMWG/Observatory/Stub1",
+			landing_url="https://example.com/kept",
+		)
+		reports: list[tuple[int, int]] = []
+		with HttpCrawler(workers=4, host_interval=0) as crawler:
+			saved = fetch_heliophysnet_vocab(
+				InstrumentObservatory, "observatories", 
+				lambda current, total: reports.append((current, total)), crawler,
+			)
+
+		# one item has no id and one has no spase id
+		self.assertEqual(saved, 19)
+		self.assertEqual(InstrumentObservatory.objects.count(), 19)
+		self.assertEqual(reports[-1], (20, 20))
+
+		existing.refresh_from_db()
+		self.assertEqual(existing.name, "Stub Observatory 1")
+		self.assertEqual(existing.abbreviation, "SO1")
+		self.assertEqual(existing.type, InstrObsType.OBSERVATORY)
+		self.assertEqual(existing.landing_url, "https://helio.data.nasa.gov/mission/obs1")
+
+		sparse = InstrumentObservatory.objects.get(name="Stub Observatory 2")
+		self.assertIsNone(sparse.landing_url)
+
+		# the failed request was retried
+		self.assertTrue(InstrumentObservatory.objects.filter(name="Stub Observatory 7").exists())
+		self.assertEqual(HeliophysicsStubHandler.requests.count("/api/observatories/obs7/"), 2)
+
+	def test_unchanged_entries_are_not_written(self):
+		with HttpCrawler(workers=4, host_interval=0) as crawler:
+			fetch_heliophysnet_vocab(InstrumentObservatory, "observatories", crawler=crawler)
+		version = Generation.get_version(GENERATION_CATALOG)
+		with HttpCrawler(workers=4, host_interval=0) as crawler:
+			self.assertEqual(
+				fetch_heliophysnet_vocab(InstrumentObservatory, "observatories", crawler=crawler), 
+				19,
+			)
+		self.assertEqual(Generation.get_version(GENERATION_CATALOG), version)
+
+
+class DescribeServiceTests(TestCase):
+	"""somef runs are cached by repository commit and shared between requests."""
+
+	target = "https://github.com/example/repo"
+
+	def setUp(self):
+		caches[DESCRIBE_CACHE].clear()
+		self.commit = "a" * 40
+		patcher = mock.patch.object(describe, "get_head_commit", lambda target: self.commit)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_results_are_cached_by_commit(self):
+		with mock.patch.object(describe, "run_somef", return_value={"name": []}) as run:
+			describe_repository(self.target, timeout=5)
+			describe_repository(self.target, timeout=5)
+			self.assertEqual(run.call_count, 1)
+
+			self.commit = "b" * 40
+			describe_repository(self.target, timeout=5)
+			self.assertEqual(run.call_count, 2)
+
+	def test_concurrent_requests_share_a_run(self):
+		started = threading.Event()
+		release = threading.Event()
+		def run_somef(target: str, fmt: str) -> dict:
+			started.set()
+			release.wait(5)
+			return {"name": []}
+
+		with mock.patch.object(describe, "run_somef", side_effect=run_somef) as run:
+			first = describe_repository_async(self.target)
+			self.assertTrue(started.wait(5))
+			second = describe_repository_async(self.target)
+			self.assertIs(first, second)
+			release.set()
+			self.assertEqual(first.result(5), second.result(5))
+			self.assertEqual(run.call_count, 1)
+
+	def test_failures_are_not_cached(self):
+		with mock.patch.object(describe, "run_somef", side_effect=DescribeError("failed")):
+			with self.assertRaises(DescribeError): describe_repository(self.target, timeout=5)
+		with mock.patch.object(describe, "run_somef", return_value={"name": []}) as run:
+			self.assertEqual(describe_repository(self.target, timeout=5), {"name": []})
+			self.assertEqual(run.call_count, 1)
+
+	def test_head_commit_is_cached(self):
+		with mock.patch.object(describe, "ls_remote_head", return_value=None) as ls_remote:
+			self.assertIsNone(get_head_commit(self.target))
+			self.assertIsNone(get_head_commit(self.target))
+			ls_remote.assert_called_once()
+
+	def test_rejects_non_http_targets(self):
+		with mock.patch.object(describe, "run_somef") as run:
+			response = self.client.get("/api/describe", {"target": "--upload-pack=touch /tmp/x"})
+			self.assertEqual(response.status_code, 400)
+			response = self.client.get("/api/describe", {"target": self.target, "fmt": "g"})
+			self.assertEqual(response.status_code, 400)
+			run.assert_not_called()
+
+
+class DescribeJobTests(TestCase):
+	"""Repository autofills are queued as jobs and polled for their result."""
+
+	target = "https://github.com/example/repo"
+
+	def setUp(self):
+		caches[DESCRIBE_CACHE].clear()
+		patcher = mock.patch.object(describe, "get_head_commit", return_value="a" * 40)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_submit_and_poll(self):
+		response = self.client.post("/api/describe_form/jobs/", {"target": self.target})
+		self.assertEqual(response.status_code, 202)
+		job = response.json()
+		self.assertTrue(job["active"])
+		self.assertEqual(
+			self.client.post("/api/describe_form/jobs/", {"target": self.target}).json()["id"], 
+			job["id"],
+		)
+
+		data = {"name": [{"result": {"value": "Repo"}, "confidence": 1}]}
+		with mock.patch.object(describe, "run_somef", return_value=data):
+			self.assertEqual(run_queued_jobs([JOB_DESCRIBE_REPOSITORY]), 1)
+
+		job = self.client.get(job["url"]).json()
+		self.assertFalse(job["active"])
+		self.assertEqual(job["result"], {FIELD_SOFTWARENAME: "Repo"})
+
+	def test_sync_endpoints_queue_a_job_until_cached(self):
+		response = self.client.get("/api/describe_form", {"target": self.target})
+		self.assertEqual(response.status_code, 202)
+		job = response.json()
+		response = self.client.get("/api/describe", {"target": self.target})
+		self.assertEqual(response.json()["id"], job["id"])
+
+		data = {"name": [{"result": {"value": "Repo"}, "confidence": 1}]}
+		with mock.patch.object(describe, "run_somef", return_value=data) as run:
+			self.assertEqual(run_queued_jobs([JOB_DESCRIBE_REPOSITORY]), 1)
+			response = self.client.get("/api/describe_form", {"target": self.target})
+			self.assertEqual(response.status_code, 200)
+			self.assertEqual(response.json(), {FIELD_SOFTWARENAME: "Repo"})
+			response = self.client.get("/api/describe", {"target": self.target})
+			self.assertEqual(response.json(), data)
+			self.assertEqual(run.call_count, 1)
+
+	def test_failed_job_reports_error(self):
+		job = self.client.post("/api/describe_form/jobs/", {"target": self.target}).json()
+		with mock.patch.object(describe, "run_somef", side_effect=DescribeError("no repo")):
+			run_queued_jobs()
+		job = self.client.get(job["url"]).json()
+		self.assertEqual(job["status"], "Failed")
+		self.assertIn("no repo", job["error"])
+
+	def test_invalid_requests(self):
+		response = self.client.post("/api/describe_form/jobs/", {"target": "file:///etc/passwd"})
+		self.assertEqual(response.status_code, 400)
+		self.assertFalse(BackgroundJob.objects.exists())
+
+		# only autofill jobs can be polled, and only by their token
+		other = enqueue_job(JOB_FETCH_VOCAB)
+		self.assertEqual(self.client.get(f"/api/describe_form/jobs/{other.token}/").status_code, 404)
+		job = enqueue_job(JOB_DESCRIBE_REPOSITORY, target=self.target, fmt="o")
+		self.assertEqual(self.client.get(f"/api/describe_form/jobs/{job.id}/").status_code, 404)
+		self.assertEqual(self.client.get(f"/api/describe_form/jobs/{job.token}/").status_code, 200)
+
+	def test_worker_kinds(self):
+		vocab = enqueue_job(JOB_FETCH_VOCAB)
+		self.assertIsNone(claim_next_job([JOB_DESCRIBE_REPOSITORY]))
+		self.assertEqual(claim_next_job().pk, vocab.pk)
+
+		# the admin job worker leaves autofills to their own worker
+		enqueue_job(JOB_DESCRIBE_REPOSITORY, target=self.target, fmt="o")
+		self.assertIsNone(claim_next_job(exclude_kinds=[JOB_DESCRIBE_REPOSITORY]))
+		call_command("run_jobs", exclude_kinds=[JOB_DESCRIBE_REPOSITORY])
+		self.assertEqual(
+			BackgroundJob.objects.get(kind=JOB_DESCRIBE_REPOSITORY).status,
+			BackgroundJobStatus.QUEUED,
+		)
+
+
+class RepoApiStubHandler(BaseHTTPRequestHandler):
+	"""A stand in for the GitHub and GitLab APIs that supports ETags."""
+
+	routes: dict[str, Any] = {}
+	requests: list[tuple[str, str | None]] = []
+	rate_limit_remaining = 100
+
+	def do_GET(self):
+		self.requests.append((self.path, self.headers.get("If-None-Match")))
+		if self.path not in self.routes:
+			self.send_response(404)
+			self.end_headers()
+			return
+		content = json.dumps(self.routes[self.path]).encode()
+		etag = f'"{hashlib.sha1(content).hexdigest()}"'
+		status = 304 if self.headers.get("If-None-Match") == etag else 200
+		self.send_response(status)
+		self.send_header("ETag", etag)
+		self.send_header("X-RateLimit-Remaining", str(self.rate_limit_remaining))
+		self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+		self.send_header("Content-Length", str(len(content) if status == 200 else 0))
+		self.end_headers()
+		if status == 200: self.wfile.write(content)
+
+	def log_message(self, *args): pass
+
+
+class RepoMetadataTests(TestCase):
+	"""Repository metadata is fetched concurrently and revalidated with ETags."""
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RepoApiStubHandler)
+		threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+		cls.base_url = f"http://127.0.0.1:{cls.server.server_port}"
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+		super().tearDownClass()
+
+	def setUp(self):
+		RepoApiStubHandler.requests = []
+		RepoApiStubHandler.rate_limit_remaining = 100
+		metadata._rate_limited_hosts.clear()
+		self.crawler = HttpCrawler(workers=4, host_interval=0)
+		self.addCleanup(self.crawler.close)
+		patcher = mock.patch.object(GithubClient, "api_url", self.base_url)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		owner = {"login": "ada", "id": 1, "type": "User"}
+		RepoApiStubHandler.routes = {
+			"/repos/ada/engine": {
+				"id": 1, "name": "engine", "full_name": "ada/engine", "private": False,
+				"owner": owner, "html_url": "https://github.com/ada/engine",
+				"description": "An engine", "collaborators_url": "", "teams_url": "",
+				"git_commits_url": "", "downloads_url": "", "releases_url": "",
+				"deployments_url": "", "created_at": "2020-01-01T00:00:00Z",
+				"updated_at": "2024-01-01T00:00:00Z", "pushed_at": "2024-01-01T00:00:00Z",
+				"homepage": None, "language": "Python",
+				"license": {"key": "mit", "name": "MIT License", "spdx_id": "MIT", "url": ""},
+			},
+			"/repos/ada/engine/contributors?per_page=100": [
+				owner, {"login": "charles", "type": "User"}, {"login": "ci[bot]", "type": "Bot"},
+			],
+			"/repos/ada/engine/languages": {"C": 10, "Python": 500},
+			"/repos/ada/engine/releases/latest": {
+				"tag_name": "v2.0", "published_at": "2024-02-01T00:00:00Z",
+			},
+			"/api/v4/projects/group%2Fsub%2Fcodes?license=true": {
+				"name": "codes", "description": None, 
+				"web_url": "https://gitlab.example/group/sub/codes",
+				"namespace": {"full_path": "group/sub"},
+				"license": {"key": "mit", "name": "MIT License", "nickname": None},
+				"created_at": "2021-01-01T00:00:00.000Z",
+				"last_activity_at": "2024-01-01T00:00:00.000Z",
+			},
+			"/api/v4/projects/group%2Fsub%2Fcodes/repository/contributors?per_page=100": [
+				{"name": "Ann", "commits": 2}, {"name": "Bob", "commits": 9},
+			],
+			"/api/v4/projects/group%2Fsub%2Fcodes/languages": {"Fortran": 80.5, "Python": 19.5},
+			"/api/v4/projects/group%2Fsub%2Fcodes/releases?per_page=1": [],
+		}
+
+	def test_github_metadata(self):
+		data = get_metadata("https://github.com/ada/engine.git", self.crawler)
+		self.assertEqual(data.name, "engine")
+		self.assertEqual(data.credits, ["ada", "charles"])
+		self.assertEqual(data.languages, ["Python", "C"])
+		self.assertEqual(data.version, "v2.0")
+		self.assertEqual(data.publish_date.year, 2024)
+		self.assertEqual(RepoApiResponse.objects.count(), 4)
+		self.assertTrue(all(etag is None for _, etag in RepoApiStubHandler.requests))
+
+		# a second lookup only revalidates the stored responses
+		RepoApiStubHandler.requests = []
+		again = get_metadata("https://github.com/ada/engine", self.crawler)
+		self.assertEqual(again.__dict__, data.__dict__)
+		self.assertEqual(len(RepoApiStubHandler.requests), 4)
+		self.assertTrue(all(etag for _, etag in RepoApiStubHandler.requests))
+
+	def test_rate_limit_serves_stored_responses(self):
+		get_metadata("https://github.com/ada/engine", self.crawler)
+		RepoApiStubHandler.rate_limit_remaining = 0
+		get_metadata("https://github.com/ada/engine", self.crawler)
+		RepoApiStubHandler.requests = []
+		data = get_metadata("https://github.com/ada/engine", self.crawler)
+		self.assertEqual(RepoApiStubHandler.requests, [])
+		self.assertEqual(data.version, "v2.0")
+
+	def test_bulk_refresh_applies_changes(self):
+		mit = License.objects.create(name="MIT License", url="https://spdx.org/licenses/MIT.html")
+		apache = License.objects.create(name="Apache License 2.0")
+		engine = Software.objects.create(
+			software_name="Engine", code_repository_url="https://github.com/ada/engine",
+		)
+		engine.version.add(
+			SoftwareVersion.objects.create(number="9.0", release_date=datetime.date(2020, 1, 1)),
+			SoftwareVersion.objects.create(number="10.0", release_date=datetime.date(2023, 1, 1)),
+		)
+		curated = Software.objects.create(
+			software_name="Curated", description="Curated text", license=apache,
+			code_repository_url="https://github.com/ada/engine",
+		)
+		curated.version.add(SoftwareVersion.objects.create(number="2.0"))
+		missing = Software.objects.create(
+			software_name="Missing", code_repository_url="https://github.com/ada/missing",
+		)
+		malformed = Software.objects.create(
+			software_name="Malformed", code_repository_url="https://github.com/heliophysics",
+		)
+		other = Software.objects.create(
+			software_name="Other", code_repository_url="https://example.com/ada/other",
+		)
+		for software in (engine, curated, missing, malformed, other):
+			VerifiedSoftware.create_verified(software)
+
+		report = refresh_repo_metadata(batch_size=2, workers=4, dry_run=True)
+		self.assertEqual(len(report["changes"]), 3)
+		self.assertEqual(SoftwareVersion.objects.count(), 3)
+
+		# curated licenses are only replaced when asked to
+		report = refresh_repo_metadata(
+			batch_size=2, workers=4, dry_run=True, overwrite_licenses=True
+		)
+		self.assertIn(("Curated", "license"), [
+			(change["name"], change["field"]) for change in report["changes"]
+		])
+
+		report = refresh_repo_metadata(batch_size=2, workers=4)
+		self.assertEqual(report["checked"], 3)
+		self.assertEqual(
+			sorted(report["failed"]), 
+			["https://github.com/ada/missing", "https://github.com/heliophysics"],
+		)
+		self.assertEqual(report["unsupported"], ["https://example.com/ada/other"])
+		self.assertEqual(
+			sorted((change["name"], change["field"]) for change in report["changes"]),
+			[("Engine", "description"), ("Engine", "license"), ("Engine", "version")],
+		)
+		# the old version is the latest release, not the greatest string
+		self.assertEqual(
+			[change["old"] for change in report["changes"] if change["field"] == "version"],
+			["10.0"],
+		)
+
+		engine.refresh_from_db()
+		self.assertEqual(engine.description, "An engine")
+		self.assertEqual(engine.license, mit)
+		version = engine.version.get(number="v2.0")
+		self.assertEqual(version.release_date, datetime.date(2024, 2, 1))
+		curated.refresh_from_db()
+		self.assertEqual(curated.description, "Curated text")
+		self.assertEqual(curated.license, apache)
+		self.assertEqual(curated.version.count(), 1)
+
+		# nothing changes when the repositories haven't changed
+		self.assertEqual(refresh_repo_metadata(workers=4)["changes"], [])
+
+	def test_older_releases_are_not_added(self):
+		# the repository's latest release (v2.0, 2024-02-01) is a backport
+		dated = Software.objects.create(
+			software_name="Dated", code_repository_url="https://github.com/ada/engine",
+		)
+		dated.version.add(
+			SoftwareVersion.objects.create(number="3.0", release_date=datetime.date(2025, 1, 1))
+		)
+		undated = Software.objects.create(
+			software_name="Undated", code_repository_url="https://github.com/ada/engine",
+		)
+		undated.version.add(SoftwareVersion.objects.create(number="2.1"))
+		behind = Software.objects.create(
+			software_name="Behind", code_repository_url="https://github.com/ada/engine",
+		)
+		behind.version.add(SoftwareVersion.objects.create(number="1.9"))
+		for software in (dated, undated, behind):
+			VerifiedSoftware.create_verified(software)
+
+		report = refresh_repo_metadata(workers=4, dry_run=True)
+		self.assertEqual(
+			[
+				(change["name"], change["old"]) 
+				for change in report["changes"] if change["field"] == "version"
+			],
+			[("Behind", "1.9")],
+		)
+
+	def test_oversized_tags_are_rejected(self):
+		tag = "v" + "1" * 200
+		release = RepoApiStubHandler.routes["/repos/ada/engine/releases/latest"]
+		self.addCleanup(release.__setitem__, "tag_name", release["tag_name"])
+		release["tag_name"] = tag
+		engine = Software.objects.create(
+			software_name="Engine", code_repository_url="https://github.com/ada/engine",
+		)
+		VerifiedSoftware.create_verified(engine)
+
+		report = refresh_repo_metadata(workers=4)
+		self.assertEqual([change["new"] for change in report["rejected"]], [tag])
+		self.assertIn("longer than", report["rejected"][0]["reason"])
+		# the rest of the software's changes are still made
+		self.assertEqual([change["field"] for change in report["changes"]], ["description"])
+		self.assertFalse(engine.version.exists())
+
+	def test_gitlab_metadata(self):
+		client = GitlabClient("gitlab.example", self.crawler)
+		client.api_url = self.base_url + "/api/v4"
+		data = client.get_repo_data("https://gitlab.example/group/sub/codes/-/tree/main")
+		self.assertEqual(data.owner, "group/sub")
+		self.assertEqual(data.credits, ["Bob", "Ann"])
+		self.assertEqual(data.languages, ["Fortran", "Python"])
+		self.assertEqual(data.version, "")
+		self.assertEqual(data.license, "MIT License")
+		self.assertIsNone(get_metadata("https://example.com/ada/engine"))
+
+	def test_clients_must_implement_the_repository_methods(self):
+		class PartialClient(RepoApiClient):
+			host = "git.example"
+			def get_repo_urls(self, repo_url: str) -> list[str]: return [repo_url]
+		with self.assertRaises(TypeError): PartialClient(self.crawler)
+
+	@override_settings(GITLAB_TOKEN="secret", GITLAB_TOKEN_HOSTS=["gitlab.com"])
+	def test_gitlab_token_is_only_sent_to_trusted_hosts(self):
+		client = get_metadata_client("https://gitlab.com/group/codes")
+		self.assertEqual(client.get_headers()["PRIVATE-TOKEN"], "secret")
+		for url in (
+			"https://gitlab.attacker.example/group/codes",
+			"https://gitlab.com.attacker.example/group/codes",
+			"https://gitlab.com@attacker.example/group/codes",
+		):
+			client = get_metadata_client(url)
+			self.assertIsInstance(client, GitlabClient)
+			self.assertNotIn("PRIVATE-TOKEN", client.get_headers())
+
+		self.assertIsInstance(get_metadata_client("https://github.com/ada/engine"), GithubClient)
+		self.assertIsNone(get_metadata_client("https://notgithub.com/ada/engine"))
+		self.assertIsNone(get_metadata_client("https://github.com.attacker.example/ada/engine"))
@@ -20,18 +20,22 @@ urlpatterns = [
     path('curate/edit_submission/submit_data/<str:uid>/', views.submit_edits),
     path('sapi/software_edit_data/<str:uid>/', views.get_submission_data),
 	path('api/models/structures/', views.exposed_models.get_model_structure),
+	path('api/models/bootstrap/', views.exposed_models.get_model_bootstrap),
 	path('api/models/<str:model_name>/choices/', views.exposed_models.get_model_choices),
 	path('api/models/<str:model_name>/form/', views.exposed_models.model_form),
 	path('api/models/<str:model_name>/rows/all/', views.model_rows.get_model_rows_all),
 	path('api/models/<str:model_name>/rows/<str:uid>/', views.model_rows.get_model_row),
 	path('api/describe', views.somef.describe_view),
 	path('api/describe_form', views.somef.form_fill_view),
+	path('api/describe_form/jobs/', views.somef.describe_form_job_view),
+	path('api/describe_form/jobs/<uuid:token>/', views.somef.describe_form_job_status_view),
 	path('api/citation/', views.get_citation, name='get_citation'),
 	path('api/search/', views.search_visible_software, name='search_visible_software'),
 
 	# DRF api views
 	path('api/submission/', views.api.SubmissionAPI.as_view()),
 	path('api/list/software/', views.api.SoftwareListAPI.as_view()),
+	path('api/harvest/software/', views.api.SoftwareHarvestAPI.as_view()),
 	path('api/view/software/<uuid:uid>/', views.api.SoftwareViewAPI.as_view()),
 	path('api/view/software/<str:uid>/', views.api.SoftwareViewAPI.as_view()),
 	path('api/data/software/<uuid:uid>/', views.api.SoftwareDetailAPI.as_view()),
@@ -1,10 +1,10 @@
 """API views for Software JSON responses and optional relation expansion."""
 
-from typing import Any
+from typing import Any, Iterator
 import datetime
 import uuid
 
-from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
@@ -15,11 +15,20 @@ from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework import serializers
 from rest_framework.generics import GenericAPIView
+from rest_framework.renderers import BrowsableAPIRenderer
 
-from ...models import Software, VerifiedSoftware, SoftwareEditQueue, SubmissionInfo
+from hssi.camel_case_renderer import CamelCaseJSONRenderer, JsonLdRenderer
+
+from ...models import (
+	Software, VerifiedSoftware, 
+	SoftwareEditQueue, SubmissionInfo,
+)
+from ...models.serializers.jsonld import get_software_jsonld, iter_software_jsonld
 from ...models.serializers.software import SoftwareSerializer
 from ...models.serializers.submission import SubmissionSerializer
+from ...models.serializers.submission_batch import save_submissions
 from ...models.serializers.util import Q_VIEW, SerialView
+from ..conditional import catalog_conditional
 from ..edit_submission import email_existing_edit_link
 from .permissions import HasUpdateToken
 
@@ -64,15 +73,22 @@ class SoftwareDetailAPI(HSSIGenericAPIView):
 			if verified is None:
 				return None
 			return Software.objects.filter(pk=verified.pk).first()
-		visible_ids = VerifiedSoftware.objects.values_list("id", flat=True)
-		return Software.objects.filter(pk=uid_or_slug, pk__in=visible_ids).first()
+		if uid_or_slug not in VerifiedSoftware.get_visible_ids():
+			return None
+		return Software.objects.filter(pk=uid_or_slug).first()
 
+	@method_decorator(catalog_conditional)
 	def get(self, request: HttpRequest, uid: str | uuid.UUID) -> Response:
 		software = self._get_visible_software(uid)
 		if software is None:
 			return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
 		serializer: SoftwareSerializer = self.get_serializer(software)
 		serializer.default_view = self.default_view
+		if serializer.view() == SerialView.JSONLD and request.accepted_renderer.format == "json":
+			return HttpResponse(
+				get_software_jsonld(software, request), 
+				content_type="application/json",
+			)
 		return Response(serializer.data)
 
 	def patch(self, request: HttpRequest, uid: str | uuid.UUID) -> Response:
@@ -112,33 +128,42 @@ class SoftwareListAPI(APIView):
 	``?view=jsonld`` returns the full JSON-LD serialization of every
 	listed record instead of the id/name/slug entries, so harvesters
 	like SciX can pull all metadata in one request rather than one
-	request per record.
+	request per record. The same is returned for ``?format=jsonld`` or
+	an ``Accept: application/ld+json`` header, as ``application/ld+json``.
 	"""
 
 	authentication_classes = []
 	permission_classes = [AllowAny]
+	renderer_classes = [CamelCaseJSONRenderer, JsonLdRenderer, BrowsableAPIRenderer]
+
+	def perform_content_negotiation(self, request: HttpRequest, force: bool = False):
+		# ?view=jsonld asks for the JSON-LD renderer whatever the Accept header
+		view = request.query_params.get(Q_VIEW)
+		if view is not None and view.lower() == JsonLdRenderer.format:
+			renderer = JsonLdRenderer()
+			return (renderer, renderer.media_type)
+		return super().perform_content_negotiation(request, force)
 
+	@method_decorator(catalog_conditional)
 	def get(self, request: HttpRequest) -> Response:
-		slugs = dict(VerifiedSoftware.objects.values_list("id", "slug"))
-		queryset = Software.objects.filter(pk__in=slugs.keys())
+		slugs = VerifiedSoftware.get_visible_slugs()
+		queryset = Software.objects.visible_software()
 
 		repo_url = request.query_params.get("repo_url")
 		if repo_url:
 			queryset = queryset.filter(code_repository_url__iexact=repo_url.strip())
 
 		view = request.query_params.get(Q_VIEW)
-		if view is not None and view.lower() != "jsonld":
+		if view is not None and view.lower() != JsonLdRenderer.format:
 			return Response(
 				{"detail": f"Unsupported view '{view}'. This endpoint supports view=jsonld."},
 				status=status.HTTP_400_BAD_REQUEST,
 			)
-		if view:
-			data = []
-			for software in queryset.order_by("software_name"):
-				serializer = SoftwareSerializer(software, context={"request": request})
-				serializer._view = SerialView.JSONLD
-				data.append(serializer.data)
-			return Response({"data": data})
+		if request.accepted_renderer.format == JsonLdRenderer.format:
+			documents = iter_software_jsonld(queryset.order_by("software_name", "id"), request)
+			return Response(
+				b'{"data":[' + b",".join(document for _, document in documents) + b"]}"
+			)
 
 		entries = queryset.values("id", "software_name").order_by("software_name")
 		data = [
@@ -151,6 +176,77 @@ class SoftwareListAPI(APIView):
 		]
 		return Response({"data": data})
 
+class SoftwareHarvestAPI(APIView):
+	"""Stream the JSON-LD of every visible Software for harvesters.
+
+	Unlike ``SoftwareListAPI?view=jsonld`` the records are serialized in 
+	chunks of ``chunk_size`` while the response is written, so the first 
+	bytes are sent immediately and worker memory stays flat however large
+	the catalog is. Each record is ``{"id": ..., "data": <JSON-LD>}`` and
+	records are ordered by id.
+
+	``?output=ndjson`` (the default) writes one record per line, and
+	``?output=json`` writes a single ``{"data": [...]}`` document. An
+	interrupted harvest resumes with ``?cursor=<id>``, which skips every 
+	record up to and including that id. ``?repo_url=`` filters the same
+	way as ``SoftwareListAPI``.
+
+	``Last-Modified`` is the time of the last catalog change, so a
+	harvester sending it back as ``If-Modified-Since`` (or the ``ETag`` as
+	``If-None-Match``) gets a 304 when nothing changed since its last 
+	harvest.
+	"""
+
+	authentication_classes = []
+	permission_classes = [AllowAny]
+	chunk_size: int = 100
+	content_types = {
+		"ndjson": "application/x-ndjson",
+		"json": "application/json",
+	}
+
+	@method_decorator(catalog_conditional)
+	def get(self, request: HttpRequest) -> Response | StreamingHttpResponse:
+		output = request.query_params.get("output", "ndjson").lower()
+		if output not in self.content_types:
+			valid = ", ".join(self.content_types.keys())
+			return Response(
+				{"detail": f"Unsupported output '{output}'. Valid values: {valid}."},
+				status=status.HTTP_400_BAD_REQUEST,
+			)
+
+		queryset = Software.objects.visible_software().order_by("pk")
+		cursor = request.query_params.get("cursor")
+		if cursor:
+			try: queryset = queryset.filter(pk__gt=uuid.UUID(cursor))
+			except ValueError:
+				return Response(
+					{"detail": f"Invalid cursor '{cursor}'."},
+					status=status.HTTP_400_BAD_REQUEST,
+				)
+
+		repo_url = request.query_params.get("repo_url")
+		if repo_url:
+			queryset = queryset.filter(code_repository_url__iexact=repo_url.strip())
+
+		records = self.render_records(queryset, request)
+		if output == "json":
+			records = self.render_array(records)
+		else:
+			records = (record + b"\n" for record in records)
+
+		return StreamingHttpResponse(records, content_type=self.content_types[output])
+
+	def render_records(self, queryset, request: HttpRequest) -> Iterator[bytes]:
+		for software_id, document in iter_software_jsonld(queryset, request, self.chunk_size):
+			yield b'{"id":"' + str(software_id).encode() + b'","data":' + document + b"}"
+
+	def render_array(self, records: Iterator[bytes]) -> Iterator[bytes]:
+		yield b'{"data":['
+		for index, record in enumerate(records):
+			yield record if index == 0 else b"," + record
+		yield b"]}"
+
 @method_decorator(csrf_exempt, name="dispatch")
 class SubmissionAPI(APIView):
 	"""Allow submission POST requests with valid JSON data."""
@@ -165,30 +261,21 @@ class SubmissionAPI(APIView):
 				status=status.HTTP_400_BAD_REQUEST,
 			)
 
-		results: list[dict[str, Any]] = []
-		submissions: list[Software] = []
-		try:
-			with transaction.atomic():
-				for idx, item in enumerate(request.data):
-					serializer = SubmissionSerializer(
-						data=item,
-						context={"request": request},
-					)
-					serializer._view = SerialView.USER
-					serializer.is_valid(raise_exception=True)
-					software = serializer.save()
-					results.append({
-						"index": idx,
-						"softwareId": str(software.id),
-					})
-					submissions.append(software)
+		try: submissions = save_submissions(request.data, {"request": request})
 		except serializers.ValidationError as exc:
 			return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
-		
+		results: list[dict[str, Any]] = [
+			{"index": idx, "softwareId": str(software.id)}
+			for idx, software in enumerate(submissions)
+		]
+
+		submission_infos = {
+			info.software_id: info for info in
+			SubmissionInfo.objects.filter(software__in=submissions)
+		}
 		for submission in submissions:
 			SoftwareEditQueue.create(submission, timezone.now() + datetime.timedelta(days=90))
-			submission_info = SubmissionInfo.objects.get(software=submission)
-			email_existing_edit_link(submission_info)
+			email_existing_edit_link(submission_infos[submission.pk])
 
 		return Response(
 			{"status": "ok", "count": len(results), "results": results},
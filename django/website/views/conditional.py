@@ -0,0 +1,68 @@
+"""
+Conditional GET support for the public read endpoints. Their responses only
+change when the catalog does, so the catalog generation serves as the
+validator: clients sending back the ETag or Last-Modified of a previous
+response get a 304 without the response being built again.
+"""
+
+import datetime, hashlib
+from functools import wraps
+from typing import Callable
+
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from ..models import GENERATION_CATALOG, Generation
+from ..util import AccessLevel
+
+CATALOG_STATE_ATTR = "_catalog_state"
+
+def get_catalog_state(request: HttpRequest) -> tuple[str, datetime.datetime | None]:
+	"""The catalog version and modification time, read once per request."""
+	state = getattr(request, CATALOG_STATE_ATTR, None)
+	if state is None:
+		state = Generation.get_state(GENERATION_CATALOG)
+		setattr(request, CATALOG_STATE_ATTR, state)
+	return state
+
+def catalog_etag(request: HttpRequest, *args, **kwargs) -> str:
+	"""
+	Responses also vary with the query, the negotiated format, the host that 
+	absolute urls are built from, and the access level of the user, so those
+	are hashed in.
+	"""
+	version, _ = get_catalog_state(request)
+	key = "\n".join((
+		version,
+		request.get_host(),
+		request.get_full_path(),
+		request.META.get("HTTP_ACCEPT", ""),
+		str(AccessLevel.from_user(request.user).value),
+	))
+	return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+def catalog_last_modified(request: HttpRequest, *args, **kwargs) -> datetime.datetime | None:
+	return get_catalog_state(request)[1]
+
+def catalog_conditional(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+	"""
+	Decorate a view whose output only depends on the catalog to answer
+	conditional requests. Responses must be revalidated before reuse so
+	clients never keep showing data from before a catalog change, unless the
+	view sets its own caching, as for urls that carry the catalog version.
+	"""
+	conditional_view = condition(
+		etag_func=catalog_etag, 
+		last_modified_func=catalog_last_modified,
+	)(view)
+
+	@wraps(view)
+	def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+		response = conditional_view(request, *args, **kwargs)
+		if not response.has_header("Cache-Control"):
+			patch_cache_control(response, no_cache=True)
+		patch_vary_headers(response, ["Accept"])
+		return response
+
+	return wrapper
@@ -1,11 +1,11 @@
 import json, uuid, enum
 
-from django.core.mail import send_mail
 from django.http import *
 from django.shortcuts import render
 from datetime import timedelta
 
 from ..data_parser import handle_submission_data
+from .exposed_models import get_bootstrap_url
 from ..util import *
 from ..models import *
 from ..models.serializers.util import get_registered_serializer, serialize_obj_userfriendly
@@ -13,7 +13,8 @@ from ..models.serializers.util import get_registered_serializer, serialize_obj_u
 from ..forms import (
 	SUBMISSION_FORM_FIELDS_1,
 	SUBMISSION_FORM_FIELDS_2,
-	SUBMISSION_FORM_FIELDS_3
+	SUBMISSION_FORM_FIELDS_3,
+	SUBMISSION_STRUCTURE_NAMES,
 )
 
 def _mask_email(email: str) -> str:
@@ -91,11 +92,8 @@ def edit_submission(request: HttpRequest) -> HttpResponse:
 		request, 
 		"pages/edit_submission.html", 
 		{
-			"structure_names": [
-				SUBMISSION_FORM_FIELDS_1.type_name,
-				SUBMISSION_FORM_FIELDS_2.type_name,
-				SUBMISSION_FORM_FIELDS_3.type_name
-			],
+			"structure_names": SUBMISSION_STRUCTURE_NAMES,
+			"bootstrap_url": get_bootstrap_url(SUBMISSION_STRUCTURE_NAMES),
 		}
 	)
 
@@ -151,8 +149,8 @@ def email_existing_edit_link(submission: SubmissionInfo) -> bool:
 		f"UTC {item.expiration.strftime("%Y-%m-%d %H:%M")}."
 	)
 
-	print(f"Sending edit link for {item.id} to {emails}")
-	send_mail(
+	print(f"Queueing edit link for {item.id} to {emails}")
+	OutboundEmail.enqueue(
 		f"[HSSI] '{software.software_name}' Submission Confirmed!", 
 		message, 
 		None, 
@@ -185,8 +183,8 @@ def email_edit_link(submission: SubmissionInfo, expire_time: timedelta = timedel
 	emails = []
 	for submitter in submission.submitter.all():
 		emails += submitter.email_list()
-	print(f"Creating and sending edit link for {queue_item.id} to {emails}...")
-	send_mail(
+	print(f"Creating and queueing edit link for {queue_item.id} to {emails}...")
+	OutboundEmail.enqueue(
 		f"[HSSI] Link to edit '{software.software_name}' submission", 
 		message, 
 		None, 
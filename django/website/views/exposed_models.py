@@ -1,43 +1,157 @@
-import ast, json
+import hashlib, json
+from typing import Iterable
+from urllib.parse import urlencode
 
 from django.apps import apps
-from django.http import JsonResponse, HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, HttpRequest, HttpResponse, HttpResponseBadRequest, QueryDict
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 from ..forms import *
-from ..models import HssiModel, Software
+from ..forms.payload import get_structure_payload
+from ..models import HssiModel, Software, GENERATION_CATALOG, Generation
+from ..models.choices import get_choices_json, parse_choice_filters
+from .conditional import catalog_conditional, get_catalog_state
 
-def get_model_structure(request: HttpRequest) -> JsonResponse:
-	structures = { "data": [
-		*[x.serialized() for x in registered_structures.values()],
-	], "fieldMap": MODEL_FIELD_MAP }
-	return JsonResponse(structures)
+BOOTSTRAP_URL = "/api/models/bootstrap/"
+BOOTSTRAP_CACHE_PREFIX = "model_bootstrap"
 
+# urls that carry the version of their content never change responses
+VERSIONED_MAX_AGE = 60 * 60 * 24 * 365
+
+def patch_versioned_cache(response: HttpResponse) -> None:
+	patch_cache_control(response, public=True, max_age=VERSIONED_MAX_AGE, immutable=True)
+
+def structure_etag(request: HttpRequest, *args, **kwargs) -> str:
+	return f'"{get_structure_payload().hash}"'
+
+@gzip_page
+@condition(etag_func=structure_etag)
+def get_model_structure(request: HttpRequest) -> HttpResponse:
+	"""
+	The structures encoded when the app started. Requests with the hash of 
+	the current release in ?v= can be cached indefinitely.
+	"""
+	payload = get_structure_payload()
+	response = HttpResponse(payload.content, content_type="application/json")
+	if request.GET.get("v") == payload.hash: patch_versioned_cache(response)
+	else: patch_cache_control(response, no_cache=True)
+	return response
+
+def get_structure_choices(structure_names: Iterable[str]) -> list[tuple[str, str]]:
+	"""
+	The target model and model filter of every model box in the named 
+	structures and in the structures nested in their fields
+	"""
+	choices: list[tuple[str, str]] = []
+	pending = list(structure_names)
+	visited: set[str] = set()
+	while pending:
+		name = pending.pop(0)
+		if name in visited: continue
+		visited.add(name)
+		structure = registered_structures.get(name)
+		if structure is None: continue
+		for subfield in structure:
+			if subfield is None: continue
+			if subfield.type in registered_structures: pending.append(subfield.type)
+			widget_properties: dict = subfield.properties.get(PROP_WIDGET_PROPS, {})
+			target_model = widget_properties.get(WPROP_TARGETMODEL)
+			if not target_model: continue
+			choice = (target_model, widget_properties.get(WPROP_MODELFILTER, ""))
+			if choice not in choices: choices.append(choice)
+	return choices
+
+def get_choice_key(model_name: str, model_filter: str) -> str:
+	"""The key that model boxes on the frontend store a choice list under"""
+	return f"{model_name}|{model_filter}" if model_filter else model_name
+
+def encode_bootstrap(structure_names: list[str], version: str) -> bytes:
+	"""
+	The structures and the choices referenced by the named structures, joined 
+	from the stored choice lists instead of decoding and encoding them again
+	"""
+	encode = lambda value: json.dumps(value, cls=DjangoJSONEncoder).encode("utf-8")
+	choices: list[bytes] = []
+	for model_name, model_filter in get_structure_choices(structure_names):
+		try: model = apps.get_model(Software._meta.app_label, model_name)
+		except LookupError: continue
+		filters = parse_choice_filters(model, QueryDict(model_filter).dict())
+		content = get_choices_json(model, filters, version)
+		choices.append(encode(get_choice_key(model_name, model_filter)) + b":" + content)
+	return b"".join([
+		b'{"version":', encode(version),
+		b',"structures":', get_structure_payload().content,
+		b',"choices":{', b",".join(choices), b"}}",
+	])
+
+def get_bootstrap_json(structure_names: list[str], version: str) -> bytes:
+	names_hash = hashlib.sha1(",".join(structure_names).encode()).hexdigest()
+	key = f"{BOOTSTRAP_CACHE_PREFIX}:{version}:{names_hash}"
+	content: bytes | None = cache.get(key)
+	if content is None:
+		content = encode_bootstrap(structure_names, version)
+		cache.set(key, content)
+	return content
+
+def get_bootstrap_version(catalog_version: str) -> str:
+	"""Bootstraps change with the catalog and with the structures"""
+	return f"{catalog_version}.{get_structure_payload().hash}"
+
+def get_bootstrap_url(structure_names: list[str]) -> str:
+	"""The bootstrap url of a form page, for the current version"""
+	return BOOTSTRAP_URL + "?" + urlencode({
+		"structures": ",".join(structure_names),
+		"v": get_bootstrap_version(Generation.get_version(GENERATION_CATALOG)),
+	})
+
+@gzip_page
+@catalog_conditional
+def get_model_bootstrap(request: HttpRequest) -> HttpResponse | HttpResponseBadRequest:
+	"""
+	Everything a generated form needs before it's interactive in a single
+	response: the model structures, and the choices of every model box in 
+	the structures listed in ?structures=, by default all of them. Requests 
+	for the current version with ?v= can be cached indefinitely.
+	"""
+	structure_names = [
+		name for name in request.GET.get("structures", "").split(",") if name
+	] or list(registered_structures)
+	for name in structure_names:
+		if name not in registered_structures:
+			return HttpResponseBadRequest(f"Unknown structure '{name}'")
+
+	version = get_bootstrap_version(get_catalog_state(request)[0])
+	response = HttpResponse(
+		get_bootstrap_json(structure_names, version), 
+		content_type="application/json"
+	)
+	if request.GET.get("v") == version: patch_versioned_cache(response)
+	return response
+
+@catalog_conditional
 def get_model_choices(
 		request: HttpRequest, 
 		model_name: str
-	) -> JsonResponse | HttpResponseBadRequest:
-
-	filter_dict = request.GET.dict()
-	for key, val in filter_dict.items():
-		filter_dict[key] = ast.literal_eval(val)
+	) -> HttpResponse | HttpResponseBadRequest:
 
 	app_label = Software._meta.app_label
-	model = apps.get_model(app_label, model_name)
-	if issubclass(model, HssiModel):
-		if filter_dict:
-			objs = model.objects.filter(**filter_dict)
-		else:
-			objs = model.objects.all()
-		data = {
-			"data": [
-				obj.get_choice()
-				for obj in objs
-			]
-		}
-		return JsonResponse(data)
-		
-	return HttpResponseBadRequest(
-		f"Target model must inherit from {HssiModel.__name__}"
+	try: model = apps.get_model(app_label, model_name)
+	except LookupError: model = None
+	if model is None or not issubclass(model, HssiModel):
+		return HttpResponseBadRequest(
+			f"Target model must inherit from {HssiModel.__name__}"
+		)
+
+	try: filters = parse_choice_filters(model, request.GET.dict())
+	except ValueError as e: return HttpResponseBadRequest(str(e))
+
+	return HttpResponse(
+		get_choices_json(model, filters, get_catalog_state(request)[0]), 
+		content_type="application/json"
 	)
 
 def model_form(request: HttpRequest, model_name: str) -> HttpResponse:
@@ -5,7 +5,12 @@ from django.http import *
 
 from ..util import *
 from ..models import *
+from ..models.expansion import SerializedDataExpander
 from ..forms.submission_data import *
+from .conditional import catalog_conditional
+
+# largest page of rows that can be requested with ?limit=
+MODEL_ROWS_MAX_LIMIT = 1000
 
 def get_fields_param(get: QueryDict) -> list[str] | None:
 	fields: list[str] | None = None
@@ -17,10 +22,30 @@ def get_fields_param(get: QueryDict) -> list[str] | None:
 def get_recursive_param(get: QueryDict) -> bool:
 	return get.get("recursive", "false").lower() == "true"
 
+def get_page_params(get: QueryDict) -> tuple[int | None, uuid.UUID | None]:
+	"""
+	parses the ?limit= page size and ?cursor= id of the last row of the 
+	previous page, raises ValueError if either is invalid
+	"""
+	limit: int | None = None
+	limit_param: str = get.get("limit")
+	if limit_param:
+		limit = int(limit_param)
+		if not (0 < limit <= MODEL_ROWS_MAX_LIMIT):
+			raise ValueError(f"limit must be between 1 and {MODEL_ROWS_MAX_LIMIT}")
+	cursor: uuid.UUID | None = None
+	cursor_param: str = get.get("cursor")
+	if cursor_param:
+		cursor = uuid.UUID(cursor_param)
+	return limit, cursor
+
+@catalog_conditional
 def get_model_rows_all(request: HttpRequest, model_name: str) -> JsonResponse:
 	"""
 	serializes (non-recursively) all objects in a specified model into json and 
-	responds to the client with the result
+	responds to the client with the result. With ?limit= the rows are paged by 
+	id, and the "next" value of the response is the ?cursor= of the next page, 
+	or null on the last page
 	"""
 	app_label = Software._meta.app_label
 	model = django.apps.apps.get_model(app_label, model_name)
@@ -30,22 +55,44 @@ def get_model_rows_all(request: HttpRequest, model_name: str) -> JsonResponse:
 	access = AccessLevel.from_user(request.user)
 	if access < model.access:
 		raise Exception(f"Unauthorized access, {access} < {model.access}")
-		
+	
+	try: limit, cursor = get_page_params(request.GET)
+	except ValueError as e: return HttpResponseBadRequest(f"Invalid page: {e}")
+
 	objects = model.objects.all()
+	next_cursor: str | None = None
+	if limit or cursor:
+		objects = objects.order_by("pk")
+		if cursor: objects = objects.filter(pk__gt=cursor)
+	if limit:
+		# fetch one extra row to know whether there is a next page
+		objects = list(objects[:limit + 1])
+		if len(objects) > limit:
+			objects = objects[:limit]
+			next_cursor = str(objects[-1].pk)
 	arr: list[dict[str, Any]] = []
 
 	fields = get_fields_param(request.GET)
 	recurse = get_recursive_param(request.GET)
 
+	# the rows are expanded together so each referenced object is fetched once
+	objects = model.prefetch_serialized_data(objects, fields)
+	serialized: list[HssiModel] = []
 	for object in objects:
 		try:
-			objdata = object.get_serialized_data(access, recurse, fields=fields)
+			objdata = object.get_serialized_data(access, fields=fields)
 			arr.append(objdata)
+			serialized.append(object)
 		except Exception as e:
 			print(e)
 			continue
 	
-	return JsonResponse({"data": arr})
+	if recurse:
+		arr = SerializedDataExpander(access).expand(
+			(type(object), object.pk, objdata) for object, objdata in zip(serialized, arr)
+		)
+	
+	return JsonResponse({"data": arr, "next": next_cursor})
 
 def get_model_row(request: HttpRequest, model_name: str, uid: str) -> JsonResponse:
 	""" 
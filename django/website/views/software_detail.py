@@ -1,9 +1,7 @@
 """Views for Software detail pages."""
 
-import json
 from typing import Any, Optional
 
-from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import QuerySet
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -11,8 +9,7 @@ from django.views import generic
 from django.http import Http404, HttpResponseRedirect
 
 from ..models import Software, VerifiedSoftware, SoftwareVersion
-from ..models.serializers.software import SoftwareSerializer
-from ..models.serializers.util import SerialView
+from ..models.serializers.jsonld import get_software_jsonld
 
 
 class SoftwareDetailView(generic.DetailView):
@@ -38,8 +35,7 @@ class SoftwareDetailView(generic.DetailView):
 
     def get_queryset(self) -> QuerySet[Software]:
         """Return only visible (published) software records."""
-        visible_ids = VerifiedSoftware.objects.values_list('id', flat=True)
-        return Software.objects.filter(pk__in=visible_ids)
+        return Software.objects.visible_software()
 
     def get_object(self, queryset = None):
         if not queryset:
@@ -68,12 +64,7 @@ class SoftwareDetailView(generic.DetailView):
                 .first()
             )
             functionality_tags = software.get_ordered_software_functionality()
-            serializer = SoftwareSerializer(
-                software,
-                context={"request": self.request},
-            )
-            serializer._view = SerialView.JSONLD
-            jsonld = json.dumps(serializer.data, cls=DjangoJSONEncoder).translate({
+            jsonld = get_software_jsonld(software, self.request).decode().translate({
                 ord("<"): "\\u003C",
                 ord(">"): "\\u003E",
                 ord("&"): "\\u0026",
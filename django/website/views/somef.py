@@ -1,4 +1,4 @@
-import subprocess, json, uuid, urllib.parse
+import json, urllib.parse, uuid
 import dateutil.parser
 import re
 from functools import reduce
@@ -6,44 +6,85 @@ from difflib import SequenceMatcher
 from packaging import version
 
 from django.http import response, request
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST
 
+from ..describe import (
+	describe_repository, get_cached_description, validate_format, validate_target
+)
+from ..jobs import JOB_DESCRIBE_REPOSITORY, enqueue_job, serialize_job
+from ..models import BackgroundJob
 from ..forms import names, submission_data
 
-def describe_view(req: request.HttpRequest) -> response.JsonResponse:
-	
-	tempfname = "/" + str(uuid.uuid4()) + ".json"
-	output_fmt = "-" + req.GET.get("fmt", "o")
-	target = req.GET.get(
-		"target", 
-		"https://github.com/Heliophysics-Software-Search-Interface/hssi-website"
-	)
-	target = urllib.parse.unquote(target)
+DEFAULT_DESCRIBE_TARGET = "https://github.com/Heliophysics-Software-Search-Interface/hssi-website"
 
-	# run the somef command to extract metadata
-	process = subprocess.run(
-		["somef", "describe", "-t", "0.7", "-r", target, output_fmt, tempfname],
-		stdout=subprocess.PIPE,
-	)
+def get_describe_job_url(job: BackgroundJob) -> str:
+	# the unguessable token keeps other requesters from reading the job
+	return f"/api/describe_form/jobs/{job.token}/"
 
-	# parse the data from somef to JSON data
-	process = subprocess.run(["cat", tempfname], stdout=subprocess.PIPE)
-	data = json.loads(process.stdout.decode('utf-8'))
+def queue_describe_job(target: str, fmt: str) -> response.JsonResponse:
+	"""Queue the analysis of the repository and respond with its job to poll"""
+	job = enqueue_job(JOB_DESCRIBE_REPOSITORY, target=target, fmt=fmt)
+	data = serialize_job(job)
+	data["url"] = get_describe_job_url(job)
+	return response.JsonResponse(data, status=202)
 
-	# remove the temporary file
-	subprocess.run(["rm", tempfname])
+def get_describe_data(req: request.HttpRequest) -> dict | response.JsonResponse:
+	"""
+	The cached somef data of the repository in the request's 'target' 
+	parameter. If it hasn't been analyzed yet, the analysis is queued and its
+	job is returned with a 202 response, the request can be repeated once the
+	job is done.
+	"""
+	target = urllib.parse.unquote(req.GET.get("target", DEFAULT_DESCRIBE_TARGET))
+	fmt = req.GET.get("fmt", "o")
+	try: 
+		target = validate_target(target)
+		data = get_cached_description(target, validate_format(fmt))
+	except ValueError as e: return response.JsonResponse({"error": str(e)}, status=400)
+	if data is None: return queue_describe_job(target, fmt)
+	return data
 
+def describe_view(req: request.HttpRequest) -> response.JsonResponse:
+	data = get_describe_data(req)
+	if isinstance(data, response.HttpResponse): return data
 	return response.JsonResponse(data, content_type="application/ld+json")
 
 def form_fill_view(req: request.HttpRequest) -> response.HttpResponse:
+	data = get_describe_data(req)
+	if isinstance(data, response.HttpResponse): return data
 	return response.HttpResponse(
-		json.dumps(
-			somef_to_formdict(
-				json.loads(describe_view(req).content.decode('utf-8'))
-			)
-		),
+		json.dumps(somef_to_formdict(data)),
 		content_type="application/json"
 	)
 
+@require_POST
+def describe_form_job_view(req: request.HttpRequest) -> response.JsonResponse:
+	"""
+	Queue the form autofill of the repository in the 'target' parameter, the 
+	result is polled from the returned job url
+	"""
+	try: 
+		target = validate_target(req.POST.get("target", ""))
+		fmt = validate_format(req.POST.get("fmt", "o"))
+	except ValueError as e: return response.JsonResponse({"error": str(e)}, status=400)
+	return queue_describe_job(target, fmt)
+
+@require_GET
+@never_cache
+def describe_form_job_status_view(req: request.HttpRequest, token: uuid.UUID) -> response.JsonResponse:
+	"""The status of a queued form autofill, with the form data once it's done"""
+	job = BackgroundJob.objects.filter(token=token, kind=JOB_DESCRIBE_REPOSITORY).first()
+	if job is None: return response.JsonResponse({"error": "Job not found"}, status=404)
+	data = serialize_job(job)
+	data["url"] = get_describe_job_url(job)
+	return response.JsonResponse(data)
+
+def run_describe_form(job: BackgroundJob, target: str, fmt: str = "o") -> dict:
+	"""Job that analyzes a repository and converts the result to form data"""
+	job.report(f"Analyzing {target}")
+	return somef_to_formdict(describe_repository(target, fmt))
+
 def somef_to_formdict(data: dict) -> dict:
 	"""
 	converts all fields in the specified codemeta json ld dict, to a dict
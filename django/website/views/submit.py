@@ -12,12 +12,14 @@ from django.http import (
 from ..forms import (
 	SUBMISSION_FORM_FIELDS_1,
 	SUBMISSION_FORM_FIELDS_2,
-	SUBMISSION_FORM_FIELDS_3
+	SUBMISSION_FORM_FIELDS_3,
+	SUBMISSION_STRUCTURE_NAMES,
 )
 from ..models import *
 from ..forms.names import *
 from ..util import *
 from ..data_parser import handle_submission_data
+from .exposed_models import get_bootstrap_url
 from .edit_submission import email_existing_edit_link
 
 def view_form(request: HttpRequest) -> HttpResponse:
@@ -25,11 +27,8 @@ def view_form(request: HttpRequest) -> HttpResponse:
 		request, 
 		"pages/submit.html", 
 		{ 
-			"structure_names": [
-				SUBMISSION_FORM_FIELDS_1.type_name,
-				SUBMISSION_FORM_FIELDS_2.type_name,
-				SUBMISSION_FORM_FIELDS_3.type_name
-			],
+			"structure_names": SUBMISSION_STRUCTURE_NAMES,
+			"bootstrap_url": get_bootstrap_url(SUBMISSION_STRUCTURE_NAMES),
 		}
 	)
 
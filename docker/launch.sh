@@ -64,6 +64,9 @@ if [ $DO_MIGRATIONS -gt 0 ]; then
 	python manage.py migrate --no-input --verbosity 1
 fi
 
+echo "Creating cache tables ..."
+python manage.py createcachetable
+
 echo "Checking for post-migration scripts in /extensions/django/post-migration-scripts ..." 
 for file in /extensions/django/post-migration-scripts/*; do 
 	[ -f "$file" ] && [ -x "$file" ] && echo "Running script $file ..." && sleep 5 && "$file"
@@ -79,6 +82,9 @@ done
 
 cd /django
 
+# The workers that handle queued work outside of requests, emails and
+# background jobs, run as their own services in docker-compose.yml
+
 # Start the project app server via Gunicorn
 echo "Starting Gunicorn ..."
 exec gunicorn --config /config/django/gunicorn.conf.py --log-config /config/django/logging.conf $PROJECT_NAME.wsgi
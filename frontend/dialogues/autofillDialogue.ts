@@ -1,6 +1,6 @@
 import {
 	AutofillDataciteWidget,
-	DataciteDoiWidget, describeApiEndpoint, DoiDataciteFinder, faMagicIcon, FormGenerator, PopupDialogue, propResultFilters, Spinner, UrlWidget,
+	DataciteDoiWidget, describeRepository, DoiDataciteFinder, faMagicIcon, FormGenerator, PopupDialogue, propResultFilters, Spinner, UrlWidget,
 	type AnyInputElement,
 	type JSONObject,
 } from "../loader";
@@ -37,8 +37,7 @@ export class AutofillDialoge extends PopupDialogue {
 		if(repoUrlVal){
 			Spinner.showSpinner("Fetching metadata from repository, this may take a moment");
 			try{
-				const requestUrl = describeApiEndpoint + `?target=${repoUrlVal}`
-				const data = await (await fetch(requestUrl)).json();
+				const data = await describeRepository(repoUrlVal);
 				console.log(`described repo at ${repoUrlVal}`, data);
 				FormGenerator.fillForm(data);
 			}
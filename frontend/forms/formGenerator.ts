@@ -8,6 +8,8 @@ import {
 	EmailWidget,
 	PopupDialogue,
 	trackEvent,
+	ModelBox,
+	type ChoicesJsonStructure,
 } from "../loader";
 
 const generatedFormType = "generated-form";
@@ -16,6 +18,8 @@ const structureNameData = "fields-structure-name";
 const csrfTokenName = "csrfmiddlewaretoken"
 
 const modelStructureUrl = "/api/models/structures/";
+const bootstrapAttribute = "data-hssi-bootstrap";
+const structuresAttribute = "data-hssi-structures";
 
 export const formRowStyle = "form-row";
 export const formSeparatorStyle = "form-separator"
@@ -25,6 +29,12 @@ type ModelStructureData = {
 	fieldMap: JSONObject,
 }
 
+type BootstrapData = {
+	version: string,
+	structures: ModelStructureData,
+	choices: { [key: string]: ChoicesJsonStructure },
+}
+
 export class FormGenerator {
 
 	private formElement: HTMLFormElement = null;
@@ -433,11 +443,24 @@ export class FormGenerator {
 		form.style.minHeight = "100px";
 		Spinner.showSpinner(null, form);
 
-		// load structure data
+		// load structure data, along with the model choices of the form if the
+		// page specifies a bootstrap url
 		if(this.structureData == null) {
-			const response = await fetchTimeout(modelStructureUrl);
-			const data = await response.json();
-			const structureData = data as ModelStructureData;
+			let structureData: ModelStructureData = null;
+			const bootstrapUrl = form.getAttribute(bootstrapAttribute);
+			if(bootstrapUrl) {
+				const response = await fetchTimeout(bootstrapUrl);
+				const data = await response.json() as BootstrapData;
+				structureData = data.structures;
+				for(const key in data.choices) {
+					ModelBox.setChoiceData(key, data.choices[key]);
+				}
+			}
+			else {
+				const structuresUrl = form.getAttribute(structuresAttribute) || modelStructureUrl;
+				const response = await fetchTimeout(structuresUrl);
+				structureData = await response.json() as ModelStructureData;
+			}
 			this.structureData = structureData;
 			this.fieldMap = structureData.fieldMap;
 			ModelFieldStructure.parseBasicWidgetModels();
@@ -1,5 +1,5 @@
 import {
-	AutofillSomefWidget, describeApiEndpoint, ConfirmDialogue,
+	AutofillSomefWidget, describeRepository, showDescribeError, ConfirmDialogue,
 	DataciteDoiWidget, extractDoi, faMagicIcon, fetchTimeout, 
 	FindIdWidget, FormGenerator, PopupDialogue, Spinner,
 	type DataciteItem, type JSONArray, type JSONObject, type SubmissionFormData,
@@ -100,14 +100,16 @@ export class AutofillDataciteWidget extends DataciteDoiWidget {
 				repoUrlVal = repoUrlVal.substring(0, repoUrlVal.length - 4);
 			}
 			try{
-				const requestUrl = describeApiEndpoint + `?target=${repoUrlVal}`
-				const data = await (await fetch(requestUrl)).json();
+				const data = await describeRepository(repoUrlVal);
 				console.log(`described repo at ${repoUrlVal}`, data);
 				FormGenerator.fillForm(data);
 				FormGenerator.markAutofilledRepo();
+				Spinner.hideSpinner();
+			}
+			catch(e){ 
+				Spinner.hideSpinner();
+				showDescribeError(repoUrlVal, e);
 			}
-			catch(e){ console.error(e); }
-			Spinner.hideSpinner();
 		}
 	}
 
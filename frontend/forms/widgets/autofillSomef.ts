@@ -1,10 +1,60 @@
 import { 
-	FormGenerator, Spinner, ConfirmDialogue, UrlWidget
+	FormGenerator, Spinner, ConfirmDialogue, UrlWidget, getCsrfTokenValue,
+	type JSONObject,
 } from "../../loader";
 
 export const describeApiEndpoint = "/api/describe_form";
+export const describeJobsApiEndpoint = "/api/describe_form/jobs/";
 export const faMagicIcon = "<i class='fa fa-magic'></i>";
 
+/** seconds between polls of a queued repository description */
+const describePollInterval = 2;
+
+/** 
+ * seconds to wait for a repository description before giving up, somef runs 
+ * time out after 300 seconds on the server but the job may be queued first
+ */
+const describeTimeout = 600;
+
+/** 
+ * queue the analysis of the specified repository and wait for the job to 
+ * finish, resolves to the data to fill the form with
+ */
+export async function describeRepository(targetUrl: string): Promise<JSONObject> {
+	const response = await fetch(describeJobsApiEndpoint, {
+		method: "POST",
+		headers: { "X-CSRFToken": getCsrfTokenValue() },
+		body: new URLSearchParams({ target: targetUrl }),
+	});
+	let job = await response.json();
+	if(!response.ok) throw new Error(job.error);
+	
+	const deadline = Date.now() + describeTimeout * 1000;
+	while(job.active){
+		if(Date.now() >= deadline) {
+			throw new Error("Timed out waiting for the repository to be analyzed");
+		}
+		await new Promise(x => setTimeout(x, describePollInterval * 1000));
+		const poll = await fetch(job.url);
+		job = await poll.json();
+		if(!poll.ok) throw new Error(job.error);
+	}
+	if(job.error) throw new Error(job.error);
+	return job.result;
+}
+
+/** tell the user that the repository couldn't be used to fill the form */
+export function showDescribeError(targetUrl: string, error: any): void {
+	console.error(`Error fetching metadata from ${targetUrl}:`, error);
+	ConfirmDialogue.getConfirmation(
+		`The form could not be auto-filled from '${targetUrl}'.\n` +
+		(error instanceof Error ? error.message : String(error)),
+		"Auto-Fill Failed",
+		"ok",
+		null,
+	);
+}
+
 export class AutofillSomefWidget extends UrlWidget {
 
 	public getInputType(): string { return "url"; }
@@ -46,11 +96,10 @@ export class AutofillSomefWidget extends UrlWidget {
 		}
 		
 		const targetUrl = this.inputElement.value.trim();
-		const requestUrl = describeApiEndpoint + `?target=${targetUrl}`;
 
 		try {
 			Spinner.showSpinner("Fetching metadata from repository, this may take a moment");
-			const data = await (await fetch(requestUrl)).json();
+			const data = await describeRepository(targetUrl);
 			console.log(`described repo at ${this.inputElement.value}`, data);
 			FormGenerator.fillForm(data);
 			FormGenerator.markAutofilledRepo();
@@ -59,7 +108,7 @@ export class AutofillSomefWidget extends UrlWidget {
 
 		catch (e) {
 			Spinner.hideSpinner();
-			console.error(`Error fetching metadata from ${targetUrl}:`, e);
+			showDescribeError(targetUrl, e);
 		}
 	}
 }
\ No newline at end of file
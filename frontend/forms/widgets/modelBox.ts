@@ -23,7 +23,7 @@ const modelsUrl = "/api/models/";
 const modelChoicesSlug = "/choices/";
 const modelRowSlug = "/rows/";
 
-type ChoicesJsonStructure = { data: [string, string, string[], string?, string?][] }
+export type ChoicesJsonStructure = { data: [string, string, string[], string?, string?][] }
 
 export interface ModelBoxProperties extends BaseProperties {
 	targetModel?: ModelName,
@@ -369,20 +369,29 @@ export class ModelBox extends Widget {
 			const data: ChoicesJsonStructure = await (
 				await fetchTimeout(modelsUrl + modelName + modelChoicesSlug + queryString)
 			).json();
-			optionData = data.data.map(x => {
-				if(x == null) return null;
-				return {
-					id: x[0],
-					name: x[1],
-					keywords: x[2],
-					tooltip: x[3],
-					identifier: x[4],
-				}
-			});
-			ModelBox.optionMap.set(cacheKey, optionData);
+			optionData = ModelBox.setChoiceData(cacheKey, data);
 		}
 		this.buildOptions(optionData);
 	}
+
+	/**
+	 * stores the options of the choice data under the specified key, which is
+	 * the model name, followed by "|" and the model filter if there is one
+	 */
+	public static setChoiceData(cacheKey: string, data: ChoicesJsonStructure): Option[] {
+		const optionData: Option[] = data.data.map(x => {
+			if(x == null) return null;
+			return {
+				id: x[0],
+				name: x[1],
+				keywords: x[2],
+				tooltip: x[3],
+				identifier: x[4],
+			}
+		});
+		this.optionMap.set(cacheKey, optionData);
+		return optionData;
+	}
 	
 	/// Event listeners --------------------------------------------------------
 
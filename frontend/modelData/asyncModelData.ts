@@ -17,6 +17,8 @@ import {
 
 export const apiModel = "/api/models/";
 export const apiSlugRowsAll = "/rows/all/";
+/** number of rows requested per page when fetching all rows of a model */
+export const apiRowsPageLimit = 500;
 
 export interface HssiDataAsync<T extends HSSIModelData> {
 	get id(): string;
@@ -14,6 +14,7 @@ import {
 	type VersionData,
 	apiModel, 
 	apiSlugRowsAll, 
+	apiRowsPageLimit,
 	createAsyncPersonData, 
 	createAsyncSoftwareData, 
 	fetchTimeout,
@@ -147,10 +148,18 @@ export class ModelDataCache<T extends HSSIModelData>{
 		if(this.promiseAll) await this.promiseAll;
 		if(this.allDataFetched) return;
 
-		// fetch the data and parse it int
-		const result = await fetchTimeout(apiModel + this.targetModel + apiSlugRowsAll);
-		const data: JSONArrayData = await result.json();
-		for(const obj of data.data) this.storeModelObjectData(obj as any);
+		// fetch the data page by page, following the cursor of each page
+		let cursor: string = null;
+		do {
+			const params = new URLSearchParams({ limit: String(apiRowsPageLimit) });
+			if(cursor) params.set("cursor", cursor);
+			const result = await fetchTimeout(
+				apiModel + this.targetModel + apiSlugRowsAll + "?" + params.toString()
+			);
+			const data: JSONArrayData = await result.json();
+			for(const obj of data.data) this.storeModelObjectData(obj as any);
+			cursor = data.next ?? null;
+		} while(cursor);
 
 		// reset the promise
 		this.allDataFetched = true;
@@ -13,6 +13,7 @@ export interface JSONObject { [key: string]: JSONValue }
 export interface JSONArray<T = JSONValue> extends Array<T> { }
 export interface JSONArrayData extends JSONObject {
 	data: JSONArray,
+	next?: string | null,
 }
 
 /** like 'keyof' but recursively includes keys of nested types */